@@ -1,52 +1,270 @@
-from groq import Groq
 import os
-from typing import List, Dict
+import threading
+from typing import AsyncIterator, Callable, List, Dict, Optional, Tuple
 from dotenv import load_dotenv
 import json
 import re
+from llm_cache import cache
+from llm_guard import CircuitOpenError, GuardedAsyncClient, GuardedClient, LLMGuard, estimate_tokens
+import metrics
+from profiler import hot_path
+from skill_extractor import extract_skills, extract_skills_async
+from roadmap_stream import RoadmapStreamParser
+from skill_embeddings import resolve_match_mode, semantic_matches
+from workers import run_blocking
 
 load_dotenv()
 
-api_key = os.getenv("GROQ_API_KEY")
-if not api_key:
-    raise ValueError("GROQ_API_KEY not found in .env")
+# Both clients share one guard: the provider's quotas and health are per account
+llm_guard = LLMGuard()
 
-client = Groq(api_key=api_key)
+# Built on first use, so importing the app needs neither the groq SDK nor an API key
+client: Optional[GuardedClient] = None
+async_client: Optional[GuardedAsyncClient] = None
+http_pool = None
+_client_lock = threading.Lock()
 
-def extract_skills_from_job(job_description: str) -> List[str]:
-    """Extract required skills from a job description using Groq AI"""
-    prompt = f"""Extract all technical skills, qualifications, and requirements from this job description.
+def _api_key() -> str:
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        raise ValueError("GROQ_API_KEY not found in .env")
+    return api_key
+
+def get_client() -> GuardedClient:
+    """Create the shared sync LLM client on first use"""
+    global client
+    if client is None:
+        with _client_lock:
+            if client is None:
+                from groq import Groq
+                client = GuardedClient(Groq(api_key=_api_key()), llm_guard)
+    return client
+
+def get_async_client() -> GuardedAsyncClient:
+    """
+    Create the shared async LLM client on first use. One pooled HTTP client
+    serves every async call, so concurrent requests reuse keep-alive
+    connections instead of opening new ones.
+    """
+    global async_client, http_pool
+    if async_client is None:
+        with _client_lock:
+            if async_client is None:
+                import httpx
+                from groq import AsyncGroq
+                api_key = _api_key()
+                http_pool = httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", 20)),
+                        max_keepalive_connections=int(os.getenv("LLM_MAX_KEEPALIVE", 10))
+                    ),
+                    timeout=httpx.Timeout(float(os.getenv("LLM_TIMEOUT_SECONDS", 60)), connect=10.0)
+                )
+                async_client = GuardedAsyncClient(AsyncGroq(api_key=api_key, http_client=http_pool), llm_guard)
+    return async_client
+
+async def close_async_client():
+    """Release pooled connections on application shutdown"""
+    if http_pool is not None:
+        await http_pool.aclose()
+
+MODEL = "llama-3.1-8b-instant"
+
+def _strip_code_fences(content: str) -> str:
+    return re.sub(r'```json\n?|\n?```', '', content.strip())
+
+def parse_skills_response(content: str) -> List[str]:
+    """Parse a JSON array of skills out of an LLM reply (raises on malformed JSON)"""
+    skills = json.loads(_strip_code_fences(content))
+    return skills if isinstance(skills, list) else []
+
+def parse_roadmap_response(content: str) -> Dict:
+    """Parse a roadmap JSON object out of an LLM reply (raises on malformed JSON)"""
+    roadmap = json.loads(_strip_code_fences(content))
+    if not isinstance(roadmap, dict):
+        raise ValueError("Roadmap response is not a JSON object")
+    return roadmap
+
+def _record_usage(function: str, prompt: str, response=None, completion: str = ""):
+    """Token usage as reported by the provider, estimated for streams that report none"""
+    usage = getattr(response, "usage", None)
+    prompt_tokens = getattr(usage, "prompt_tokens", None)
+    completion_tokens = getattr(usage, "completion_tokens", None)
+    metrics.record_llm_usage(
+        function,
+        prompt_tokens if prompt_tokens is not None else estimate_tokens(prompt),
+        completion_tokens if completion_tokens is not None else estimate_tokens(completion)
+    )
+
+def _parse(function: str, parse: Callable[[str], object], content: str):
+    with metrics.stage("parse", metrics.llm_parse_latency, function=function):
+        return parse(content)
+
+def cached_completion(prompt: str, temperature: float, parse: Callable[[str], object], llm_client=None, function: str = "completion"):
+    """
+    Run a chat completion through the shared response cache.
+    Only replies that `parse` accepts are cached, so a malformed answer is retried next time.
+    `function` labels the call in the LLM metrics.
+    """
+    key = cache.make_key(MODEL, prompt, temperature)
+    content = cache.get(key)
+    metrics.llm_cache_lookups.inc(function=function, result="miss" if content is None else "hit")
+    if content is not None:
+        return _parse(function, parse, content)
+
+    with metrics.llm_call(function):
+        response = (llm_client or get_client()).chat.completions.create(
+            messages=[{"role": "user", "content": prompt}],
+            model=MODEL,
+            temperature=temperature
+        )
+    _record_usage(function, prompt, response)
+    content = response.choices[0].message.content
+    result = _parse(function, parse, content)
+    cache.set(key, content)
+    return result
+
+async def cached_completion_async(prompt: str, temperature: float, parse: Callable[[str], object], llm_client=None, function: str = "completion"):
+    """Async counterpart of cached_completion; cache reads and writes run in a worker thread"""
+    key = cache.make_key(MODEL, prompt, temperature)
+    content = await run_blocking(cache.get, key)
+    metrics.llm_cache_lookups.inc(function=function, result="miss" if content is None else "hit")
+    if content is not None:
+        return _parse(function, parse, content)
+
+    with metrics.llm_call(function):
+        response = await (llm_client or get_async_client()).chat.completions.create(
+            messages=[{"role": "user", "content": prompt}],
+            model=MODEL,
+            temperature=temperature
+        )
+    _record_usage(function, prompt, response)
+    content = response.choices[0].message.content
+    result = _parse(function, parse, content)
+    await run_blocking(cache.set, key, content)
+    return result
+
+async def stream_completion_async(
+    prompt: str,
+    temperature: float,
+    validate: Callable[[str], object],
+    llm_client=None,
+    function: str = "completion"
+) -> AsyncIterator[str]:
+    """
+    Yield a chat completion as text deltas while the model generates it.
+    Shares the cache with cached_completion: a cached reply is replayed as one
+    chunk, and a fresh one is cached once complete if `validate` accepts it.
+    """
+    key = cache.make_key(MODEL, prompt, temperature)
+    content = await run_blocking(cache.get, key)
+    metrics.llm_cache_lookups.inc(function=function, result="miss" if content is None else "hit")
+    if content is not None:
+        yield content
+        return
+
+    parts = []
+    with metrics.llm_call(function):
+        stream = await (llm_client or get_async_client()).chat.completions.create(
+            messages=[{"role": "user", "content": prompt}],
+            model=MODEL,
+            temperature=temperature,
+            stream=True
+        )
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                parts.append(delta)
+                yield delta
+
+    content = "".join(parts)
+    _record_usage(function, prompt, completion=content)
+    try:
+        _parse(function, validate, content)
+    except Exception:
+        return
+    await run_blocking(cache.set, key, content)
+
+def build_job_skills_prompt(job_description: str) -> str:
+    """Build the skill-extraction prompt for a job description"""
+    return f"""Extract all technical skills, qualifications, and requirements from this job description.
 Return ONLY a JSON array of skills, nothing else.
 
 Job Description:
 {job_description}
 
 Return format: ["skill1", "skill2", "skill3"]"""
-    
+
+def build_roadmap_prompt(user_skills: List[str], missing_skills: List[str], job_title: str) -> str:
+    """Build the upskilling-roadmap prompt"""
+    return f"""Create a learning roadmap for someone who wants to become a {job_title}.
+They already have these skills: {', '.join(user_skills)}
+They need to learn: {', '.join(missing_skills)}
+
+Return ONLY a JSON object with this exact structure:
+{{
+  "roadmap": [
+    {{"skill": "skill_name", "priority": "High/Medium/Low", "estimated_time": "X weeks", "resources": ["resource1", "resource2"]}}
+  ],
+  "projects": ["project1", "project2"]
+}}"""
+
+def build_resume_skills_prompt(resume_text: str) -> str:
+    """Build the skill-extraction prompt for a resume"""
+    return f"""Extract all technical skills, tools, and technologies mentioned in this resume.
+Return ONLY a JSON array of skills, nothing else.
+
+Resume:
+{resume_text}
+
+Return format: ["skill1", "skill2", "skill3"]"""
+
+def extract_skills_from_job(job_description: str, mode: Optional[str] = None) -> List[str]:
+    """Extract required skills from a job description (skill dictionary and/or Groq AI, see skill_extractor)"""
+    def llm_extract(text):
+        return cached_completion(build_job_skills_prompt(text), 0.3, parse_skills_response, function="extract_job_skills")
+
     try:
-        response = client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
-            model="llama-3.1-8b-instant",
-            temperature=0.3
-        )
-        content = response.choices[0].message.content.strip()
-        content = re.sub(r'```json\n?|\n?```', '', content)
-        skills = json.loads(content)
-        return skills if isinstance(skills, list) else []
+        return extract_skills(job_description, llm_extract, mode)
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"Error extracting skills: {e}")
         return []
 
-def calculate_skill_match(user_skills: List[str], job_skills: List[str]) -> Dict:
-    """Calculate match percentage between user skills and job requirements"""
+async def request_job_skills(job_description: str, llm_client=None, mode: Optional[str] = None) -> List[str]:
+    """
+    Async variant of extract_skills_from_job for batch pipelines.
+    Unlike the sync helper, API errors are raised so callers can retry.
+    """
+    async def llm_extract(text):
+        try:
+            return await cached_completion_async(
+                build_job_skills_prompt(text), 0.3, parse_skills_response, llm_client=llm_client, function="extract_job_skills"
+            )
+        except ValueError as e:
+            print(f"Error parsing extracted skills: {e}")
+            return []
+
+    return await extract_skills_async(job_description, llm_extract, mode, fallback_on_error=False)
+
+@hot_path("calculate_skill_match")
+def calculate_skill_match(user_skills: List[str], job_skills: List[str], mode: Optional[str] = None) -> Dict:
+    """
+    Calculate match percentage between user skills and job requirements.
+    `mode` (default SKILL_MATCH_MODE) is "exact" or "semantic", see skill_embeddings.
+    """
     if not job_skills:
         return {"match_percentage": 0, "matched_skills": [], "missing_skills": []}
     
-    user_skills_lower = [s.lower() for s in user_skills]
-    job_skills_lower = [s.lower() for s in job_skills]
+    if resolve_match_mode(mode) == "semantic":
+        found = semantic_matches(job_skills, user_skills)
+    else:
+        user_skills_lower = {s.lower() for s in user_skills}
+        found = [skill.lower() in user_skills_lower for skill in job_skills]
     
-    matched = [skill for skill in job_skills if skill.lower() in user_skills_lower]
-    missing = [skill for skill in job_skills if skill.lower() not in user_skills_lower]
+    matched = [skill for skill, hit in zip(job_skills, found) if hit]
+    missing = [skill for skill, hit in zip(job_skills, found) if not hit]
     
     match_percentage = (len(matched) / len(job_skills)) * 100 if job_skills else 0
     
@@ -58,52 +276,100 @@ def calculate_skill_match(user_skills: List[str], job_skills: List[str]) -> Dict
 
 def generate_upskilling_roadmap(user_skills: List[str], missing_skills: List[str], job_title: str) -> Dict:
     """Generate a personalized learning roadmap using Groq AI"""
-    prompt = f"""Create a learning roadmap for someone who wants to become a {job_title}.
-They already have these skills: {', '.join(user_skills)}
-They need to learn: {', '.join(missing_skills)}
+    prompt = build_roadmap_prompt(user_skills, missing_skills, job_title)
 
-Return ONLY a JSON object with this exact structure:
-{{
-  "roadmap": [
-    {{"skill": "skill_name", "priority": "High/Medium/Low", "estimated_time": "X weeks", "resources": ["resource1", "resource2"]}}
-  ],
-  "projects": ["project1", "project2"]
-}}"""
-    
     try:
-        response = client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
-            model="llama-3.1-8b-instant",
-            temperature=0.5
-        )
-        content = response.choices[0].message.content.strip()
-        content = re.sub(r'```json\n?|\n?```', '', content)
-        roadmap = json.loads(content)
-        return roadmap
+        return cached_completion(prompt, 0.5, parse_roadmap_response, function="generate_roadmap")
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"Error generating roadmap: {e}")
         return {"roadmap": [], "projects": []}
 
-def extract_skills_from_resume(resume_text: str) -> List[str]:
-    """Extract skills from a resume text using Groq AI"""
-    prompt = f"""Extract all technical skills, tools, and technologies mentioned in this resume.
-Return ONLY a JSON array of skills, nothing else.
+def extract_skills_from_resume(resume_text: str, mode: Optional[str] = None) -> List[str]:
+    """Extract skills from a resume text (skill dictionary and/or Groq AI, see skill_extractor)"""
+    def llm_extract(text):
+        return cached_completion(build_resume_skills_prompt(text), 0.3, parse_skills_response, function="extract_resume_skills")
 
-Resume:
-{resume_text}
+    try:
+        return extract_skills(resume_text, llm_extract, mode)
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        print(f"Error extracting resume skills: {e}")
+        return []
+
+async def extract_skills_from_job_async(job_description: str, mode: Optional[str] = None) -> List[str]:
+    """Non-blocking variant of extract_skills_from_job"""
+    async def llm_extract(text):
+        return await cached_completion_async(build_job_skills_prompt(text), 0.3, parse_skills_response, function="extract_job_skills")
 
-Return format: ["skill1", "skill2", "skill3"]"""
-    
     try:
-        response = client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
-            model="llama-3.1-8b-instant",
-            temperature=0.3
-        )
-        content = response.choices[0].message.content.strip()
-        content = re.sub(r'```json\n?|\n?```', '', content)
-        skills = json.loads(content)
-        return skills if isinstance(skills, list) else []
+        return await extract_skills_async(job_description, llm_extract, mode)
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        print(f"Error extracting skills: {e}")
+        return []
+
+async def generate_upskilling_roadmap_async(user_skills: List[str], missing_skills: List[str], job_title: str) -> Dict:
+    """Non-blocking variant of generate_upskilling_roadmap"""
+    prompt = build_roadmap_prompt(user_skills, missing_skills, job_title)
+
+    try:
+        return await cached_completion_async(prompt, 0.5, parse_roadmap_response, function="generate_roadmap")
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        print(f"Error generating roadmap: {e}")
+        return {"roadmap": [], "projects": []}
+
+async def stream_upskilling_roadmap_async(
+    user_skills: List[str],
+    missing_skills: List[str],
+    job_title: str,
+    llm_client=None
+) -> AsyncIterator[Tuple[str, object]]:
+    """
+    Streaming variant of generate_upskilling_roadmap_async. Yields ("start", None)
+    once the reply begins, ("item", entry) as each roadmap entry is completed by
+    the model, ("projects", [...]) when the project list is, and finally
+    ("done", roadmap) with the whole roadmap. CircuitOpenError is raised rather
+    than reported as an "error" event, before anything else is yielded.
+    """
+    prompt = build_roadmap_prompt(user_skills, missing_skills, job_title)
+    parser = RoadmapStreamParser()
+
+    try:
+        started = False
+        async for delta in stream_completion_async(prompt, 0.5, parse_roadmap_response, llm_client, function="stream_roadmap"):
+            if not started:
+                started = True
+                yield "start", None
+            for event in parser.feed(delta):
+                yield event
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        print(f"Error generating roadmap: {e}")
+        yield "error", str(e)
+
+    try:
+        roadmap = _parse("stream_roadmap", parse_roadmap_response, parser.text)
+    except Exception:
+        # Truncated or malformed reply: keep the entries that did complete
+        roadmap = parser.result()
+    yield "done", roadmap
+
+async def extract_skills_from_resume_async(resume_text: str, mode: Optional[str] = None) -> List[str]:
+    """Non-blocking variant of extract_skills_from_resume"""
+    async def llm_extract(text):
+        return await cached_completion_async(build_resume_skills_prompt(text), 0.3, parse_skills_response, function="extract_resume_skills")
+
+    try:
+        return await extract_skills_async(resume_text, llm_extract, mode)
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"Error extracting resume skills: {e}")
-        return []
\ No newline at end of file
+        return []
@@ -0,0 +1,92 @@
+"""
+Cold-start cost of the API process: time to `import main` in a fresh
+interpreter (no GROQ_API_KEY, no database), which heavy modules that import
+pulled in, whether it touched the disk, and how long the startup step
+(migrations) takes afterwards.
+
+    python benchmarks/bench_import_time.py [--runs 5] [--top 10]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Only needed by particular requests, so they must not load with the app
+DEFERRED_MODULES = ["groq", "PyPDF2", "pandas"]
+
+PROBE = """
+import json, os, sys, tempfile, time
+sys.path.insert(0, {backend!r})
+started = time.perf_counter()
+import main
+imported = time.perf_counter() - started
+loaded = [name for name in {deferred!r} if name in sys.modules]
+# The working directory holds jobs.db and llm_cache.db; TMPDIR is private to this run
+created = sorted(os.listdir(".")) + sorted(os.listdir(tempfile.gettempdir()))
+from fastapi.testclient import TestClient
+started = time.perf_counter()
+with TestClient(main.app):
+    startup = time.perf_counter() - started
+print(json.dumps({{"import": imported, "startup": startup, "loaded": loaded, "created": created}}))
+"""
+
+def run_probe(workdir: str) -> dict:
+    env = {key: value for key, value in os.environ.items() if key not in ("GROQ_API_KEY", "DATABASE_URL", "READ_DATABASE_URL")}
+    probe = PROBE.format(backend=BACKEND_DIR, deferred=DEFERRED_MODULES)
+    # A fresh working directory each run, so startup always migrates an empty database
+    cwd = tempfile.mkdtemp(dir=workdir)
+    env["LLM_CACHE_PATH"] = os.path.join(cwd, "llm_cache.db")
+    env["TMPDIR"] = tempfile.mkdtemp(dir=workdir)
+    output = subprocess.run([sys.executable, "-c", probe], cwd=cwd, env=env, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+def slowest_imports(workdir: str, top: int):
+    """Cumulative -X importtime of the backend's own modules and their heaviest dependencies"""
+    env = {key: value for key, value in os.environ.items() if key != "GROQ_API_KEY"}
+    env["LLM_CACHE_PATH"] = os.path.join(workdir, "llm_cache.db")
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import sys; sys.path.insert(0, {BACKEND_DIR!r}); import main"],
+        cwd=tempfile.mkdtemp(dir=workdir), env=env, capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in output.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        # Top-level packages only; submodules are already counted in their parent
+        if "." not in name.strip():
+            rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_import_time_")
+    results = [run_probe(workdir) for _ in range(args.runs)]
+    imports = [result["import"] for result in results]
+    startups = [result["startup"] for result in results]
+    loaded = sorted({name for result in results for name in result["loaded"]})
+    created = sorted({name for result in results for name in result["created"]})
+
+    print(f"{args.runs} cold starts without GROQ_API_KEY")
+    print(f"  import main   : median {statistics.median(imports) * 1000:7.1f} ms  (min {min(imports) * 1000:.1f})")
+    print(f"  startup step  : median {statistics.median(startups) * 1000:7.1f} ms  (migrations on an empty database)")
+    print("\nSlowest top-level imports (cumulative):")
+    for cumulative, name in slowest_imports(workdir, args.top):
+        print(f"  {cumulative / 1000:7.1f} ms  {name}")
+
+    ok = not loaded and not created
+    print(f"\n{'✅' if not loaded else '❌'} deferred modules loaded by `import main`: {', '.join(loaded) or 'none'}")
+    print(f"{'✅' if not created else '❌'} files created by `import main` (databases, LLM cache, temp dirs): {', '.join(created) or 'none'}")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Exercises the LLM guard against fake_llm clients: duplicate requests
+coalescing into one provider call, the token bucket pacing a burst, and the
+circuit breaker failing fast during an outage and recovering afterwards.
+
+    python benchmarks/bench_llm_guard.py [--duplicates 20] [--burst 12] [--rpm 600]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+class FakeOutage(Exception):
+    status_code = 503
+
+def messages(text: str):
+    return [{"role": "user", "content": text}]
+
+async def coalescing(llm_guard, fake_llm, duplicates: int) -> bool:
+    fake = fake_llm.FakeAsyncLLMClient(lambda prompt: json.dumps(["Python"]), latency=0.2)
+    guard = llm_guard.LLMGuard(requests_per_minute=0, tokens_per_minute=0)
+    client = llm_guard.GuardedAsyncClient(fake, guard)
+
+    started = time.perf_counter()
+    replies = await asyncio.gather(*(
+        client.chat.completions.create(messages=messages("same job description"), model="m", temperature=0.3)
+        for _ in range(duplicates)
+    ))
+    elapsed = time.perf_counter() - started
+    contents = {reply.choices[0].message.content for reply in replies}
+
+    sync_fake = fake_llm.FakeLLMClient(lambda prompt: time.sleep(0.2) or "[]")
+    sync_client = llm_guard.GuardedClient(sync_fake, guard)
+    threads = [
+        threading.Thread(target=sync_client.chat.completions.create, kwargs={"messages": messages("same resume"), "model": "m"})
+        for _ in range(duplicates)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    ok = fake.calls == 1 and len(contents) == 1 and sync_fake.calls == 1
+    print(f"{'✅' if ok else '❌'} {duplicates} identical requests: {fake.calls} async provider call in {elapsed * 1000:.0f} ms, "
+          f"{sync_fake.calls} sync provider call from {duplicates} threads, {guard.metrics.coalesced} coalesced")
+    return ok
+
+async def pacing(llm_guard, fake_llm, burst: int, rpm: float) -> bool:
+    fake = fake_llm.FakeAsyncLLMClient(lambda prompt: "[]")
+    guard = llm_guard.LLMGuard(requests_per_minute=rpm, tokens_per_minute=0)
+    # Start with an empty bucket so the burst is paced from the first call
+    guard.requests.tokens = 0
+    client = llm_guard.GuardedAsyncClient(fake, guard)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        client.chat.completions.create(messages=messages(f"distinct prompt {i}"), model="m")
+        for i in range(burst)
+    ))
+    elapsed = time.perf_counter() - started
+    expected = burst * 60 / rpm
+    wait = guard.metrics.queue_wait.snapshot()
+    ok = expected * 0.9 <= elapsed <= expected * 1.5
+    print(f"{'✅' if ok else '❌'} {burst} calls at {rpm:g}/min took {elapsed:.2f}s (expected ~{expected:.2f}s); "
+          f"queue wait p50 {wait['p50_ms']} ms, max {wait['max_ms']} ms")
+    return ok
+
+async def breaker(llm_guard, fake_llm) -> bool:
+    down = {"value": True}
+
+    def responder(prompt):
+        if down["value"]:
+            raise FakeOutage("provider unavailable")
+        return "[]"
+
+    fake = fake_llm.FakeAsyncLLMClient(responder)
+    guard = llm_guard.LLMGuard(
+        requests_per_minute=0, tokens_per_minute=0,
+        breaker=llm_guard.CircuitBreaker(failure_threshold=3, reset_timeout=0.3)
+    )
+    client = llm_guard.GuardedAsyncClient(fake, guard)
+
+    async def attempt(i):
+        try:
+            await client.chat.completions.create(messages=messages(f"prompt {i}"), model="m")
+            return "ok"
+        except llm_guard.CircuitOpenError:
+            return "rejected"
+        except FakeOutage:
+            return "failed"
+
+    outcomes = [await attempt(i) for i in range(10)]
+    calls_while_down = fake.calls
+    down["value"] = False
+    await asyncio.sleep(0.35)
+    recovered = await attempt(100)
+
+    ok = outcomes.count("failed") == 3 and outcomes.count("rejected") == 7 and recovered == "ok" and guard.breaker.state == "closed"
+    print(f"{'✅' if ok else '❌'} outage: {outcomes.count('failed')} failed, {outcomes.count('rejected')} rejected without calling "
+          f"({calls_while_down} provider calls); after reset: {recovered}, breaker {guard.breaker.state}")
+    return ok
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--duplicates", type=int, default=20)
+    parser.add_argument("--burst", type=int, default=12)
+    parser.add_argument("--rpm", type=float, default=600)
+    args = parser.parse_args()
+
+    import fake_llm
+    import llm_guard
+
+    results = [
+        await coalescing(llm_guard, fake_llm, args.duplicates),
+        await pacing(llm_guard, fake_llm, args.burst, args.rpm),
+        await breaker(llm_guard, fake_llm),
+    ]
+    sys.exit(0 if all(results) else 1)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,138 @@
+"""
+Checks the metrics subsystem end to end and measures what it costs.
+
+Drives the app with fake_llm clients, then checks the Server-Timing breakdown
+of a roadmap request (database, LLM, parsing), that /metrics labels requests
+by route template, and the per-function LLM series. Also times the middleware
+against a bare ASGI app, and samples a hot path with the profiler.
+
+    python benchmarks/bench_metrics.py [--requests 2000] [--llm-latency 0.05]
+"""
+import argparse
+import asyncio
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+ROADMAP_REPLY = '{"roadmap": [{"skill": "Docker", "priority": "High", "estimated_time": "2 weeks", "resources": ["Docs"]}], "projects": ["Ship it"]}'
+
+def server_timing(header: str) -> dict:
+    return {name: float(duration) for name, duration in re.findall(r"(\w+);dur=([\d.]+)", header or "")}
+
+def sample_value(text: str, name: str, **labels) -> float:
+    """Value of the sample `name{labels...}` in a Prometheus scrape (0 if absent)"""
+    for line in text.splitlines():
+        if line.startswith(name + "{") and all(f'{key}="{value}"' in line for key, value in labels.items()):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+async def middleware_overhead(metrics, requests: int) -> float:
+    """Microseconds the middleware adds to one request"""
+    async def bare(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "method": "GET", "path": "/bench", "headers": []}
+    timings = {}
+    for name, app in (("bare", bare), ("instrumented", metrics.RequestMetricsMiddleware(bare))):
+        started = time.perf_counter()
+        for _ in range(requests):
+            await app(dict(scope), receive, send)
+        timings[name] = (time.perf_counter() - started) / requests
+    return (timings["instrumented"] - timings["bare"]) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_metrics_")
+    os.chdir(workdir)  # database.py resolves ./jobs.db relative to the working directory
+    os.environ.setdefault("GROQ_API_KEY", "benchmark")
+    os.environ.setdefault("LLM_CACHE_PATH", os.path.join(workdir, "llm_cache.db"))
+
+    from fastapi.testclient import TestClient
+    import ai_service
+    import main as app_module
+    import metrics
+    import models
+    from database import SessionLocal
+    from fake_llm import FakeAsyncLLMClient
+    from match_engine import SkillMatchIndex
+    from profiler import SamplingProfiler
+    from skill_dictionary import CURATED_SKILLS
+
+    ai_service.async_client = FakeAsyncLLMClient(lambda prompt: ROADMAP_REPLY, latency=args.llm_latency)
+
+    with TestClient(app_module.app) as client:
+        db = SessionLocal()
+        user = models.User(email="bench@example.com", name="bench", skills=["Python"])
+        job = models.Job(title="Backend Engineer", company="Acme", location="Singapore", required_skills=["Python", "Docker"])
+        db.add_all([user, job])
+        db.commit()
+        params = {"user_id": user.id, "job_id": job.id}
+        db.close()
+
+        roadmap = client.post("/api/ai/generate-roadmap", params=params)
+        cached = client.post("/api/ai/generate-roadmap", params=params)
+        for job_id in (job.id, job.id, 999999):
+            client.get(f"/api/jobs/{job_id}")
+        scrape = client.get("/metrics")
+
+    stages = server_timing(roadmap.headers.get("server-timing"))
+    cached_stages = server_timing(cached.headers.get("server-timing"))
+    timing_ok = (
+        {"db", "llm", "parse", "total"} <= set(stages)
+        and stages["llm"] >= args.llm_latency * 1000 * 0.9
+        and "llm" not in cached_stages
+    )
+    print(f"{'✅' if timing_ok else '❌'} Server-Timing, fresh roadmap : {roadmap.headers.get('server-timing')}")
+    print(f"   Server-Timing, cached roadmap: {cached.headers.get('server-timing')}")
+
+    text = scrape.text
+    job_route = "/api/jobs/{job_id}"
+    scrape_ok = (
+        scrape.headers["content-type"].startswith("text/plain; version=0.0.4")
+        and sample_value(text, "http_requests_total", route=job_route, status="200") == 2
+        and sample_value(text, "http_requests_total", route=job_route, status="404") == 1
+        and f'route="/api/jobs/{job.id}"' not in text
+        and sample_value(text, "http_request_db_queries_count", route="/api/ai/generate-roadmap") == 2
+        and sample_value(text, "llm_call_duration_seconds_count", function="generate_roadmap", outcome="ok") == 1
+        and sample_value(text, "llm_cache_lookups_total", function="generate_roadmap", result="hit") == 1
+        and sample_value(text, "llm_tokens_total", function="generate_roadmap", kind="completion") > 0
+    )
+    print(f"{'✅' if scrape_ok else '❌'} /metrics: {len(text.splitlines())} lines, requests labelled by route template, "
+          f"LLM calls, cache lookups and tokens per function")
+
+    overhead = asyncio.run(middleware_overhead(metrics, args.requests))
+    print(f"   middleware overhead: {overhead:.1f} µs per request")
+
+    rng = random.Random(3)
+    skills = list(CURATED_SKILLS)
+    index = SkillMatchIndex((job_id, rng.sample(skills, 8)) for job_id in range(1, 20001))
+    with SamplingProfiler(interval=0.002, hot_paths_only=True) as profiler:
+        deadline = time.perf_counter() + 1.0
+        while time.perf_counter() < deadline:
+            index.top_k(rng.sample(skills, 10), 10)
+    roots = {stack.split(";", 1)[0] for stack in profiler.samples}
+    profile_ok = profiler.ticks > 0 and roots and roots <= {"[match_engine.score]", "[match_engine.top_k]"}
+    print(f"{'✅' if profile_ok else '❌'} hot-path profile: {sum(profiler.samples.values())} samples in {profiler.ticks} ticks, "
+          f"hottest {profiler.top(1)[0]['function'] if profiler.samples else '-'}")
+
+    sys.exit(0 if timing_ok and scrape_ok and profile_ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Time to first roadmap item with the SSE endpoint versus the full roadmap.
+
+Runs both roadmap endpoints against fake_llm.FakeAsyncLLMClient streaming a
+canned roadmap with per-chunk latency, checks that the streamed events add up
+to the same roadmap the blocking endpoint returns, and times the streaming
+generator directly (TestClient only hands back a response once it is complete).
+
+    python benchmarks/bench_roadmap_stream.py [--items 6] [--chunk-size 8] [--chunk-latency 0.01]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+def canned_roadmap(items: int) -> str:
+    roadmap = {
+        "roadmap": [
+            {
+                "skill": f"Skill {i}",
+                "priority": "High" if i < 2 else "Medium",
+                "estimated_time": f"{i + 1} weeks",
+                "resources": [f"Course {i} \"Basics\"", f"Docs {i}: {{advanced}} [guide]"],
+            }
+            for i in range(items)
+        ],
+        "projects": ["Build a REST API", "Deploy a containerised app"],
+    }
+    return "```json\n" + json.dumps(roadmap, indent=2) + "\n```"
+
+def parse_sse(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+async def time_stream(ai_service, client) -> dict:
+    started = time.perf_counter()
+    first_item = None
+    items = 0
+    async for event, _ in ai_service.stream_upskilling_roadmap_async(["Python"], ["Docker"], "Backend Engineer", client):
+        if event == "item":
+            items += 1
+            if first_item is None:
+                first_item = time.perf_counter() - started
+    return {"first_item": first_item, "total": time.perf_counter() - started, "items": items}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=6)
+    parser.add_argument("--chunk-size", type=int, default=8, help="Characters per streamed chunk")
+    parser.add_argument("--chunk-latency", type=float, default=0.01, help="Seconds between chunks")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_roadmap_stream_")
+    os.chdir(workdir)  # database.py resolves ./jobs.db relative to the working directory
+    os.environ.setdefault("GROQ_API_KEY", "benchmark")
+    os.environ.setdefault("LLM_CACHE_PATH", os.path.join(workdir, "llm_cache.db"))
+
+    from fastapi.testclient import TestClient
+    import ai_service
+    import main as app_module
+    import models
+    from database import SessionLocal
+    from fake_llm import FakeAsyncLLMClient
+    from llm_cache import cache
+
+    reply = canned_roadmap(args.items)
+    fake = FakeAsyncLLMClient(lambda prompt: reply, chunk_size=args.chunk_size, chunk_latency=args.chunk_latency)
+    ai_service.async_client = fake
+
+    with TestClient(app_module.app) as client:
+        db = SessionLocal()
+        user = models.User(email="bench@example.com", name="bench", skills=["Python"])
+        job = models.Job(title="Backend Engineer", company="Acme", location="Singapore", required_skills=["Python", "Docker"])
+        db.add_all([user, job])
+        db.commit()
+        params = {"user_id": user.id, "job_id": job.id}
+        db.close()
+
+        expected = client.post("/api/ai/generate-roadmap", params=params).json()
+        cache.clear()
+        response = client.get("/api/ai/generate-roadmap/stream", params=params, headers={"Accept-Encoding": "gzip"})
+        events = parse_sse(response.text)
+
+    names = [event for event, _ in events]
+    done = events[-1][1]
+    streamed_items = [data for event, data in events if event == "item"]
+    ok = (
+        response.headers.get("content-encoding") == "identity"
+        and names[0] == "meta" and names[-1] == "done"
+        and names.count("item") == args.items
+        and streamed_items == expected["roadmap"] == done["roadmap"]
+        and done == expected
+    )
+    print(f"{'✅' if ok else '❌'} SSE events: {', '.join(dict.fromkeys(names))} ({names.count('item')} items), "
+          f"same roadmap as the blocking endpoint: {done == expected}")
+
+    cache.clear()
+    timing = asyncio.run(time_stream(ai_service, fake))
+    print(f"{len(reply)} characters in {args.chunk_size}-char chunks every {args.chunk_latency * 1000:g} ms")
+    print(f"  first roadmap item : {timing['first_item'] * 1000:8.1f} ms")
+    print(f"  whole roadmap      : {timing['total'] * 1000:8.1f} ms  ({timing['first_item'] / timing['total']:.0%} of total)")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Exact vs semantic skill matching: example pairs, agreement between the
+per-job and batch paths, and batch scoring time over a synthetic catalogue.
+
+    python benchmarks/bench_semantic_match.py [--jobs 20000] [--skills-per-job 8] [--users 50]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+EXAMPLE_PAIRS = [
+    ("PostgreSQL", "Postgres"),
+    ("Machine Learning", "ML"),
+    ("Python", "Python 3.11"),
+    ("Kubernetes", "Kubernetes (K8s)"),
+    ("TensorFlow", "TensorFlow 2"),
+    ("Java", "JavaScript"),
+    ("React", "React Native"),
+    ("SQL", "NoSQL"),
+]
+
+# Variants a resume or an LLM might produce for the same skill
+VARIANTS = ["{}", "{} ", "{} 3", "{}.js", "{} (advanced)", "{} development"]
+
+def synthetic_catalogue(skills, jobs: int, per_job: int, rng: random.Random):
+    for job_id in range(1, jobs + 1):
+        picked = rng.sample(skills, per_job)
+        yield job_id, [rng.choice(VARIANTS).format(skill).strip() for skill in picked]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=20000)
+    parser.add_argument("--skills-per-job", type=int, default=8)
+    parser.add_argument("--users", type=int, default=50)
+    args = parser.parse_args()
+
+    from ai_service import calculate_skill_match
+    from match_engine import SkillMatchIndex
+    from skill_dictionary import CURATED_SKILLS
+    from skill_embeddings import MATCH_THRESHOLD, embedder
+
+    print(f"Similarity threshold {MATCH_THRESHOLD}")
+    for job_skill, user_skill in EXAMPLE_PAIRS:
+        exact = calculate_skill_match([user_skill], [job_skill], "exact")["match_percentage"] > 0
+        semantic = calculate_skill_match([user_skill], [job_skill], "semantic")["match_percentage"] > 0
+        similarity = float(embedder.embed(job_skill) @ embedder.embed(user_skill))
+        print(f"  {job_skill:18s} ~ {user_skill:18s} similarity {similarity:4.2f}  exact {'✅' if exact else '❌'}  semantic {'✅' if semantic else '❌'}")
+
+    rng = random.Random(7)
+    skills = list(CURATED_SKILLS)
+    catalogue = list(synthetic_catalogue(skills, args.jobs, args.skills_per_job, rng))
+    users = [[rng.choice(VARIANTS).format(skill).strip() for skill in rng.sample(skills, 10)] for _ in range(args.users)]
+
+    started = time.perf_counter()
+    index = SkillMatchIndex(catalogue)
+    build = time.perf_counter() - started
+    started = time.perf_counter()
+    index.vocabulary_index
+    embed = time.perf_counter() - started
+
+    timings = {}
+    for mode in ("exact", "semantic"):
+        started = time.perf_counter()
+        for user_skills in users:
+            index.score(user_skills, mode=mode)
+        timings[mode] = (time.perf_counter() - started) / len(users)
+
+    # The batch path must agree with calculate_skill_match job by job
+    sample = rng.sample(range(len(catalogue)), 200)
+    mismatches = 0
+    for user_skills in users[:5]:
+        scores = index.score(user_skills, mode="semantic")
+        for row in sample:
+            expected = calculate_skill_match(user_skills, catalogue[row][1], "semantic")["match_percentage"]
+            mismatches += abs(expected - scores[row]) > 0.01
+
+    print(f"\n{args.jobs} jobs, {len(index.vocabulary)} distinct job skills, {args.users} users")
+    print(f"  build CSR index          : {build * 1000:8.1f} ms")
+    print(f"  embed vocabulary (once)  : {embed * 1000:8.1f} ms")
+    print(f"  score one user, exact    : {timings['exact'] * 1000:8.2f} ms")
+    print(f"  score one user, semantic : {timings['semantic'] * 1000:8.2f} ms")
+    print(f"{'✅' if not mismatches else '❌'} batch and per-job semantic scores agree ({mismatches} mismatches)")
+    sys.exit(1 if mismatches else 0)
+
+if __name__ == "__main__":
+    main()
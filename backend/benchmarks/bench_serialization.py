@@ -0,0 +1,114 @@
+"""
+Requests/sec of the job listing before and after the orjson fast path.
+
+Builds a throwaway SQLite database with a 10k-job fixture, then calls
+GET /api/jobs on the real app and on handlers that undo one part of it at a
+time. The fast path skips response_model validation, so its isolated gain is
+the same selected columns served through response_model vs. through orjson;
+jsonable_encoder without a response_model is shown too, since it is slower
+than pydantic's own serialiser.
+
+    python benchmarks/bench_serialization.py [--jobs 10000] [--requests 20] [--limit 1000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+def build_fixture(db, models, count: int):
+    from sqlalchemy import insert
+    description = "We are hiring an engineer with Python, SQL and cloud experience. " * 40
+    db.execute(insert(models.Job), [
+        {
+            "title": f"Software Engineer {i}",
+            "company": f"Company {i % 500}",
+            "location": "Singapore",
+            "posted": "1 day ago",
+            "workplace_model": "Hybrid",
+            "employment_type": "Full Time",
+            "salary": "$5,000 - $7,000",
+            "job_description": description,
+            "job_id": f"bench-{i}",
+            "url": f"https://example.com/jobs/{i}",
+            "required_skills": ["Python", "SQL", "Docker", "AWS"],
+        }
+        for i in range(count)
+    ])
+    db.commit()
+
+def measure(client, path: str, params: dict, requests: int) -> float:
+    client.get(path, params=params)  # warm-up
+    started = time.perf_counter()
+    for _ in range(requests):
+        response = client.get(path, params=params)
+        response.raise_for_status()
+    return requests / (time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=1000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_serialization_")
+    os.chdir(workdir)  # database.py resolves ./jobs.db relative to the working directory
+    os.environ.setdefault("GROQ_API_KEY", "benchmark")
+    os.environ.setdefault("LLM_CACHE_PATH", os.path.join(workdir, "llm_cache.db"))
+
+    from typing import List
+    from fastapi import Depends, FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy.orm import Session
+    import main as app_module
+    import models
+    import schemas
+    from database import SessionLocal, get_db
+    from migrations import run_migrations
+
+    run_migrations()
+    db = SessionLocal()
+    build_fixture(db, models, args.jobs)
+    db.close()
+
+    legacy = FastAPI()
+
+    def detail_rows(db, skip, limit):
+        columns = [getattr(models.Job, name) for name in schemas.JOB_DETAIL_FIELDS]
+        return [row._asdict() for row in db.query(*columns).order_by(models.Job.id).offset(skip).limit(limit)]
+
+    @legacy.get("/orm")
+    def orm_rows(skip: int = 0, limit: int = 349, db: Session = Depends(get_db)):
+        return db.query(models.Job).order_by(models.Job.id).offset(skip).limit(limit).all()
+
+    @legacy.get("/validated", response_model=List[schemas.JobDetail])
+    def validated_columns(skip: int = 0, limit: int = 349, db: Session = Depends(get_db)):
+        return detail_rows(db, skip, limit)
+
+    @legacy.get("/encoded")
+    def encoded_columns(skip: int = 0, limit: int = 349, db: Session = Depends(get_db)):
+        return detail_rows(db, skip, limit)
+
+    params = {"limit": args.limit}
+    with TestClient(legacy) as client:
+        orm = measure(client, "/orm", params, args.requests)
+        validated = measure(client, "/validated", params, args.requests)
+        encoded = measure(client, "/encoded", params, args.requests)
+    with TestClient(app_module.app) as client:
+        after_full = measure(client, "/api/jobs", params, args.requests)
+        after_summary = measure(client, "/api/jobs", {**params, "fields": "summary"}, args.requests)
+
+    print(f"{args.jobs} jobs in fixture, {args.limit} per page, {args.requests} requests each")
+    print(f"  ORM rows + jsonable_encoder (old)        : {orm:8.1f} req/s")
+    print(f"  columns + jsonable_encoder               : {encoded:8.1f} req/s")
+    print(f"  columns + response_model validation      : {validated:8.1f} req/s")
+    print(f"  columns + orjson, no validation (full)   : {after_full:8.1f} req/s  "
+          f"({after_full / validated:.2f}x over response_model, {after_full / orm:.1f}x over old)")
+    print(f"  columns + orjson, no validation (summary): {after_summary:8.1f} req/s  ({after_summary / orm:.1f}x over old)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+import asyncio
+import random
+import time
+from typing import Dict, List, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+import models
+import match_engine
+from skill_index import set_job_skills_bulk
+from match_store import refresh_job_matches
+from ai_service import request_job_skills
+from llm_guard import CircuitOpenError, is_provider_failure, retry_after_seconds
+from workers import run_blocking
+
+# Shared progress of the current (or last) bulk run, served by the status endpoint
+progress: Dict = {
+    "status": "idle",
+    "total": 0,
+    "processed": 0,
+    "failed": 0,
+    "last_committed_id": None,
+    "failed_ids": [],
+    "started_at": None,
+    "finished_at": None,
+}
+
+_run_lock = asyncio.Lock()
+
+def is_retryable(exc: Exception) -> bool:
+    """
+    Rate limits, provider outages and timeouts are worth retrying. An open
+    breaker is not: it refuses every call until it resets, so the job fails
+    and a later run resumes from the checkpoint.
+    """
+    if isinstance(exc, CircuitOpenError):
+        return False
+    return is_provider_failure(exc) or getattr(exc, "status_code", None) == 429
+
+def pending_jobs_query(db: Session, start_after: int = 0):
+    """Jobs that still need skills, in id order so runs can resume from a checkpoint"""
+    return db.query(models.Job.id, models.Job.title, models.Job.job_description).filter(
+        text(f"({models.PENDING_SKILLS_PREDICATE})"),
+        models.Job.id > start_after
+    ).order_by(models.Job.id)
+
+class BulkSkillExtractor:
+    """
+    Extracts skills for many jobs with bounded-concurrency LLM calls.
+
+    Jobs are processed in id order in groups of `commit_every`; each group is
+    committed in a single transaction. The checkpoint `last_committed_id` only
+    advances over jobs that succeeded and stops just before the first failure,
+    so resuming with `start_after=last_committed_id` retries failed jobs (they
+    are still pending) and skips the ones already done. Pass `llm_client` (e.g.
+    fake_llm.FakeAsyncLLMClient) to run without the Groq API.
+    """
+
+    def __init__(
+        self,
+        llm_client=None,
+        concurrency: int = 5,
+        commit_every: int = 20,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+    ):
+        self.llm_client = llm_client
+        self.concurrency = max(1, concurrency)
+        self.commit_every = max(1, commit_every)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    async def _extract_with_retry(self, semaphore: asyncio.Semaphore, description: str) -> List[str]:
+        attempt = 0
+        while True:
+            async with semaphore:
+                try:
+                    return await request_job_skills(description, llm_client=self.llm_client)
+                except Exception as e:
+                    if attempt >= self.max_retries or not is_retryable(e):
+                        raise
+                    delay = retry_after_seconds(e)
+            if delay is None:
+                delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+                delay += random.uniform(0, delay / 2)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def _process_group(self, db: Session, semaphore: asyncio.Semaphore, group) -> List[Dict]:
+        outcomes = await asyncio.gather(
+            *(self._extract_with_retry(semaphore, job.job_description or "") for job in group),
+            return_exceptions=True
+        )
+
+        results = []
+        updates = []
+        for job, outcome in zip(group, outcomes):
+            if isinstance(outcome, Exception):
+                results.append({"job_id": job.id, "title": job.title, "error": str(outcome)})
+            else:
+                updates.append({"id": job.id, "required_skills": outcome})
+                results.append({"job_id": job.id, "title": job.title, "skills_count": len(outcome)})
+
+        await run_blocking(self._save_group, db, updates)
+        return results
+
+    @staticmethod
+    def _save_group(db: Session, updates: List[Dict]):
+        if updates:
+            db.bulk_update_mappings(models.Job, updates)
+            set_job_skills_bulk(db, {update["id"]: update["required_skills"] for update in updates})
+            refresh_job_matches(db, [update["id"] for update in updates])
+        db.commit()
+        if updates:
+            match_engine.invalidate()
+
+    @staticmethod
+    def _checkpoint(group, group_results: List[Dict]):
+        failed = [result["job_id"] for result in group_results if "error" in result]
+        # Once a job has failed the checkpoint stays put, or a resume would skip it
+        if not progress["failed_ids"]:
+            if failed:
+                position = next(i for i, job in enumerate(group) if job.id == failed[0])
+                if position:
+                    progress["last_committed_id"] = group[position - 1].id
+            else:
+                progress["last_committed_id"] = group[-1].id
+        progress["failed"] += len(failed)
+        progress["failed_ids"].extend(failed)
+
+    async def run(self, db: Session, limit: Optional[int] = None, start_after: int = 0) -> Dict:
+        """Extract skills for up to `limit` pending jobs with id greater than `start_after`"""
+        if _run_lock.locked():
+            raise RuntimeError("A bulk extraction run is already in progress")
+
+        async with _run_lock:
+            query = pending_jobs_query(db, start_after)
+            if limit is not None:
+                query = query.limit(limit)
+            jobs = await run_blocking(query.all)
+
+            progress.update({
+                "status": "running",
+                "total": len(jobs),
+                "processed": 0,
+                "failed": 0,
+                "last_committed_id": start_after or None,
+                "failed_ids": [],
+                "started_at": time.time(),
+                "finished_at": None,
+            })
+
+            semaphore = asyncio.Semaphore(self.concurrency)
+            results = []
+            try:
+                for i in range(0, len(jobs), self.commit_every):
+                    group = jobs[i:i + self.commit_every]
+                    group_results = await self._process_group(db, semaphore, group)
+                    results.extend(group_results)
+                    progress["processed"] += len(group_results)
+                    self._checkpoint(group, group_results)
+            except BaseException:
+                db.rollback()
+                progress["status"] = "interrupted"
+                raise
+            finally:
+                progress["finished_at"] = time.time()
+
+            progress["status"] = "done"
+            return {
+                "processed": len(results),
+                "failed": progress["failed"],
+                "last_committed_id": progress["last_committed_id"],
+                "failed_ids": progress["failed_ids"],
+                "elapsed_seconds": round(progress["finished_at"] - progress["started_at"], 2),
+                "jobs": results,
+            }
+
+if __name__ == "__main__":
+    import argparse
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Extract skills for every job that has none yet")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--start-after", type=int, default=0, help="Resume after this job id")
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--commit-every", type=int, default=20)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        extractor = BulkSkillExtractor(concurrency=args.concurrency, commit_every=args.commit_every)
+        summary = asyncio.run(extractor.run(db, limit=args.limit, start_after=args.start_after))
+        print(f"✅ Processed {summary['processed']} jobs ({summary['failed']} failed) in {summary['elapsed_seconds']}s")
+        if summary["failed_ids"]:
+            print(f"⚠️  Failed job ids: {', '.join(map(str, summary['failed_ids']))}")
+            print(f"   Retry them with --start-after {summary['last_committed_id'] or 0}")
+    except KeyboardInterrupt:
+        print(f"⏸️  Interrupted. Resume with --start-after {progress['last_committed_id'] or 0}")
+    finally:
+        db.close()
@@ -1,11 +1,72 @@
-﻿from sqlalchemy import create_engine
+import os
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./jobs.db"
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./jobs.db")
+# Optional replica for GET endpoints; SQLite falls back to a query-only pool on the same file
+READ_DATABASE_URL = os.getenv("READ_DATABASE_URL")
+
+# How long a connection waits for the write lock instead of raising "database is locked".
+# Passed to sqlite3.connect so it already covers the journal_mode pragma run on connect.
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+
+SQLITE_PRAGMAS = {
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),        # safe with WAL, far fewer fsyncs than FULL
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", -65536)),       # negative = KiB, i.e. 64 MB per connection
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", 268435456)),      # 256 MB memory-mapped reads
+    "temp_store": "MEMORY",
+}
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+def _is_memory_sqlite(url: str) -> bool:
+    return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+
+def _set_sqlite_pragmas(read_only: bool, wal: bool):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if wal and not read_only:
+            cursor.execute("PRAGMA journal_mode=WAL")
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+    return on_connect
+
+def make_engine(url: str, read_only: bool = False):
+    """Create an engine with pragmas (SQLite) or a sized connection pool (server databases)"""
+    if _is_sqlite(url):
+        engine = create_engine(url, connect_args={
+            "check_same_thread": False,
+            "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000,
+        })
+        event.listen(engine, "connect", _set_sqlite_pragmas(read_only, wal=not _is_memory_sqlite(url)))
+        return engine
+
+    return create_engine(
+        url,
+        pool_size=int(os.getenv("DB_POOL_SIZE", 10)),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", 20)),
+        pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", 30)),
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", 1800)),
+        pool_pre_ping=True,
+    )
+
+engine = make_engine(SQLALCHEMY_DATABASE_URL)
+
+if READ_DATABASE_URL:
+    read_engine = make_engine(READ_DATABASE_URL, read_only=True)
+elif _is_sqlite(SQLALCHEMY_DATABASE_URL) and not _is_memory_sqlite(SQLALCHEMY_DATABASE_URL):
+    # WAL lets readers run alongside the writer, so reads get their own pool of query-only connections
+    read_engine = make_engine(SQLALCHEMY_DATABASE_URL, read_only=True)
+else:
+    read_engine = engine
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 Base = declarative_base()
 
 def get_db():
@@ -14,3 +75,11 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def get_read_db():
+    """Session for endpoints that only read; may point at a replica"""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
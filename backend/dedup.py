@@ -0,0 +1,109 @@
+import hashlib
+import re
+import zlib
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+import numpy as np
+
+NUM_PERM = 64
+BANDS = 8                       # 8 bands x 8 rows: candidate pairs start around 0.77 Jaccard
+SIMILARITY_THRESHOLD = 0.8
+TITLE_SIMILARITY_THRESHOLD = 0.7  # boilerplate descriptions make different roles look alike
+SHINGLE_SIZE = 3
+MIN_SHINGLES = 5                # shorter texts only dedupe on exact fingerprints
+
+_PRIME = np.uint64(4294967311)  # smallest prime above 2**32
+_rng = np.random.RandomState(20260117)
+# a < 2**31 and h < 2**32 keep a * h + b below 2**64, so the uint64 arithmetic never wraps
+_A = _rng.randint(1, 2**31, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.randint(0, 2**32 - 1, size=NUM_PERM, dtype=np.uint64)
+
+def normalise_text(value: Optional[str]) -> str:
+    """Lowercase and collapse punctuation/whitespace so cosmetic edits don't matter"""
+    if not value or value in ("nan", "Not Applicable"):
+        return ""
+    return " ".join(re.findall(r"[a-z0-9]+", value.lower()))
+
+def fingerprint(title: str, company: str, location: str, description: str) -> str:
+    """Deterministic identity of a posting, stable across re-imports and sources"""
+    key = "|".join(normalise_text(v) for v in (title, company, location, description))
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+def shingles(title: str, company: str, location: str, description: str) -> Set[str]:
+    words = " ".join(normalise_text(v) for v in (title, company, location, description)).split()
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+def minhash(shingle_set: Set[str]) -> Optional[np.ndarray]:
+    """NUM_PERM-wide MinHash signature, or None when the text is too short to compare"""
+    if len(shingle_set) < MIN_SHINGLES:
+        return None
+    hashes = np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) for s in shingle_set), dtype=np.uint64, count=len(shingle_set)
+    ) % _PRIME
+    # (a * h + b) mod p for every permutation at once: NUM_PERM x len(shingles)
+    permuted = (np.outer(_A, hashes) + _B[:, None]) % _PRIME
+    return permuted.min(axis=1)
+
+def estimated_similarity(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.mean(a == b))
+
+def title_tokens(title: Optional[str]) -> Set[str]:
+    return set(normalise_text(title).split())
+
+def title_similarity(a: Set[str], b: Set[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+class NearDuplicateIndex:
+    """
+    MinHash LSH index. Signatures are split into BANDS bands; postings that
+    share any identical band become candidates and are then confirmed against
+    SIMILARITY_THRESHOLD using the full signature and a title-overlap check.
+    """
+
+    def __init__(self):
+        self.signatures: Dict[str, np.ndarray] = {}
+        self.titles: Dict[str, Set[str]] = {}
+        self.buckets: Dict[tuple, List[str]] = defaultdict(list)
+
+    def _bands(self, signature: np.ndarray):
+        rows = NUM_PERM // BANDS
+        for band in range(BANDS):
+            yield (band, signature[band * rows:(band + 1) * rows].tobytes())
+
+    def add(self, key: str, signature: Optional[np.ndarray], title: Optional[str] = None):
+        if signature is None or key in self.signatures:
+            return
+        self.signatures[key] = signature
+        self.titles[key] = title_tokens(title)
+        for band in self._bands(signature):
+            self.buckets[band].append(key)
+
+    def find(self, signature: Optional[np.ndarray], title: Optional[str] = None) -> Optional[str]:
+        """Most similar indexed key above the thresholds, if any"""
+        if signature is None:
+            return None
+        candidates = set()
+        for band in self._bands(signature):
+            candidates.update(self.buckets.get(band, ()))
+
+        tokens = title_tokens(title)
+        best_key, best_score = None, SIMILARITY_THRESHOLD
+        for key in candidates:
+            if title_similarity(tokens, self.titles[key]) < TITLE_SIMILARITY_THRESHOLD:
+                continue
+            score = estimated_similarity(signature, self.signatures[key])
+            if score >= best_score:
+                best_key, best_score = key, score
+        return best_key
+
+    @classmethod
+    def from_rows(cls, rows: Iterable) -> "NearDuplicateIndex":
+        """Build from (key, title, company, location, description) tuples"""
+        index = cls()
+        for key, title, company, location, description in rows:
+            index.add(key, minhash(shingles(title, company, location, description)), title)
+        return index
@@ -0,0 +1,115 @@
+"""
+Local stand-ins for the Groq client, for running the AI pipelines offline.
+
+Both fakes expose the same `client.chat.completions.create(...)` surface as
+`ai_service.client` / `ai_service.async_client` and answer with whatever the
+`responder(prompt)` callable returns. With `stream=True` the reply comes back
+as delta chunks of `chunk_size` characters, like Groq's token stream.
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+from typing import Callable, Optional
+
+def default_responder(prompt: str) -> str:
+    """Reply with an empty skill list"""
+    return json.dumps([])
+
+class FakeRateLimitError(Exception):
+    """Mimics groq.RateLimitError closely enough for retry logic"""
+    status_code = 429
+
+    def __init__(self, message: str = "Rate limit reached"):
+        super().__init__(message)
+        self.response = None
+
+def _make_response(content: str):
+    message = SimpleNamespace(role="assistant", content=content)
+    usage = SimpleNamespace(
+        prompt_tokens=0,
+        completion_tokens=len(content.split()),
+        total_tokens=len(content.split())
+    )
+    return SimpleNamespace(choices=[SimpleNamespace(message=message, index=0)], usage=usage)
+
+def _make_chunk(content: Optional[str], finish_reason: Optional[str] = None):
+    delta = SimpleNamespace(role="assistant", content=content)
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta, index=0, finish_reason=finish_reason)])
+
+def _split(content: str, size: int):
+    return [content[i:i + size] for i in range(0, len(content), size)]
+
+class _Completions:
+    def __init__(self, owner):
+        self._owner = owner
+
+    def create(self, messages, model=None, temperature=None, stream=False, **kwargs):
+        response = self._owner._complete(messages)
+        if not stream:
+            return response
+        content = response.choices[0].message.content
+        return iter([*(_make_chunk(piece) for piece in _split(content, self._owner.chunk_size)), _make_chunk(None, "stop")])
+
+class _AsyncCompletions:
+    def __init__(self, owner):
+        self._owner = owner
+
+    async def create(self, messages, model=None, temperature=None, stream=False, **kwargs):
+        if self._owner.latency:
+            await asyncio.sleep(self._owner.latency)
+        response = self._owner._complete(messages)
+        if not stream:
+            return response
+        return self._stream(response.choices[0].message.content)
+
+    async def _stream(self, content: str):
+        for piece in _split(content, self._owner.chunk_size):
+            if self._owner.chunk_latency:
+                await asyncio.sleep(self._owner.chunk_latency)
+            yield _make_chunk(piece)
+        yield _make_chunk(None, "stop")
+
+class FakeLLMClient:
+    """
+    Synchronous fake. `fail_first` makes the first N calls raise a 429 so
+    retry/backoff paths can be exercised.
+    """
+    _completions_class = _Completions
+
+    def __init__(
+        self,
+        responder: Optional[Callable[[str], str]] = None,
+        fail_first: int = 0,
+        latency: float = 0.0,
+        chunk_size: int = 8,
+        chunk_latency: float = 0.0
+    ):
+        self.responder = responder or default_responder
+        self.fail_first = fail_first
+        self.latency = latency
+        self.chunk_size = max(1, chunk_size)
+        self.chunk_latency = chunk_latency
+        self.calls = 0
+        self.prompts = []
+        self.chat = SimpleNamespace(completions=self._completions_class(self))
+
+    def _complete(self, messages):
+        self.calls += 1
+        prompt = messages[-1]["content"]
+        self.prompts.append(prompt)
+        if self.calls <= self.fail_first:
+            raise FakeRateLimitError()
+        return _make_response(self.responder(prompt))
+
+    def close(self):
+        pass
+
+class FakeAsyncLLMClient(FakeLLMClient):
+    """
+    Async fake with optional simulated network latency: `latency` before the
+    reply (or first chunk) and `chunk_latency` between streamed chunks.
+    """
+    _completions_class = _AsyncCompletions
+
+    async def close(self):
+        pass
@@ -1,43 +1,146 @@
-import PyPDF2
+import codecs
 import io
-from typing import Optional
+import os
+import signal
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import BinaryIO, Optional, Union
 
-def extract_text_from_pdf(file_content: bytes) -> str:
-    """Extract text from PDF file content"""
+# Hard limits for untrusted uploads
+MAX_UPLOAD_BYTES = int(float(os.getenv("RESUME_MAX_UPLOAD_MB", 10)) * 1024 * 1024)
+MAX_PDF_PAGES = int(os.getenv("RESUME_MAX_PDF_PAGES", 50))
+MAX_TEXT_CHARS = int(os.getenv("RESUME_MAX_TEXT_CHARS", 200_000))
+PARSE_TIMEOUT_SECONDS = float(os.getenv("RESUME_PARSE_TIMEOUT_SECONDS", 20))
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+SUPPORTED_EXTENSIONS = (".pdf", ".txt")
+
+class UploadTooLargeError(ValueError):
+    """The upload is bigger than MAX_UPLOAD_BYTES (maps to HTTP 413)"""
+
+class ExtractionTimeoutError(Exception):
+    """Text extraction ran past PARSE_TIMEOUT_SECONDS"""
+
+def is_supported_file(filename: Optional[str]) -> bool:
+    return bool(filename) and filename.lower().endswith(SUPPORTED_EXTENSIONS)
+
+async def save_upload(upload, directory: Optional[str] = None, max_bytes: int = MAX_UPLOAD_BYTES) -> str:
+    """
+    Copy an UploadFile to a temp file in fixed-size chunks, never holding more
+    than one chunk in memory. Raises UploadTooLargeError past `max_bytes`.
+    Returns the path; the caller is responsible for deleting it.
+    """
+    fd, path = tempfile.mkstemp(prefix="upload_", dir=directory)
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(f"File is larger than {max_bytes // (1024 * 1024)} MB")
+                out.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+@contextmanager
+def _time_limit(seconds: float):
+    """
+    Interrupt the block with ExtractionTimeoutError after `seconds`. Uses SIGALRM,
+    so it only applies on Unix in a process's main thread (e.g. the parser pool);
+    elsewhere callers rely on their own deadline checks.
+    """
+    if seconds <= 0 or not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def on_timeout(signum, frame):
+        raise ExtractionTimeoutError(f"Text extraction took longer than {seconds:g}s")
+
+    previous = signal.signal(signal.SIGALRM, on_timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous or signal.SIG_DFL)
+
+def _open_source(source: Union[bytes, str]) -> BinaryIO:
+    return io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else open(source, "rb")
+
+def extract_text_from_pdf(
+    source: Union[bytes, str],
+    max_pages: int = MAX_PDF_PAGES,
+    max_chars: int = MAX_TEXT_CHARS,
+    timeout: float = PARSE_TIMEOUT_SECONDS
+) -> str:
+    """
+    Extract text from a PDF given as bytes or a file path.
+    Pages are parsed one at a time, stopping at `max_pages`, `max_chars` or `timeout`.
+    """
+    # Imported here so only the parser worker processes pay for it
+    import PyPDF2
+
+    deadline = time.monotonic() + timeout
     try:
-        pdf_file = io.BytesIO(file_content)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        
-        return text.strip()
+        with _open_source(source) as pdf_file, _time_limit(timeout):
+            pdf_reader = PyPDF2.PdfReader(pdf_file)
+
+            parts = []
+            chars = 0
+            for page_number in range(min(len(pdf_reader.pages), max_pages)):
+                if time.monotonic() > deadline:
+                    raise ExtractionTimeoutError(f"Text extraction took longer than {timeout:g}s")
+                page_text = pdf_reader.pages[page_number].extract_text() or ""
+                parts.append(page_text[:max_chars - chars])
+                chars += len(parts[-1])
+                if chars >= max_chars:
+                    break
+
+            return "\n".join(parts).strip()
+    except ExtractionTimeoutError:
+        raise
     except Exception as e:
+        if time.monotonic() > deadline:
+            # The alarm fired inside PyPDF2 code that swallowed it and failed some other way
+            raise ExtractionTimeoutError(f"Text extraction took longer than {timeout:g}s") from e
         raise Exception(f"Error extracting text from PDF: {str(e)}")
 
-def extract_text_from_txt(file_content: bytes) -> str:
-    """Extract text from TXT file content"""
+def extract_text_from_txt(source: Union[bytes, str], max_chars: int = MAX_TEXT_CHARS) -> str:
+    """Extract text from TXT file content or a file path"""
+    truncated = False
+    if not isinstance(source, (bytes, bytearray)):
+        # UTF-8 needs at most 4 bytes per character
+        with open(source, "rb") as f:
+            source = f.read(max_chars * 4 + 1)
+        truncated = len(source) > max_chars * 4
+        source = source[:max_chars * 4]
     try:
-        return file_content.decode('utf-8')
+        # Not final when truncated, so a character cut in half at the end is dropped instead of failing
+        return codecs.getincrementaldecoder('utf-8')().decode(source, final=not truncated)[:max_chars]
     except UnicodeDecodeError:
         # Try with different encodings
         try:
-            return file_content.decode('latin-1')
+            return source.decode('latin-1')[:max_chars]
         except Exception as e:
             raise Exception(f"Error decoding text file: {str(e)}")
 
-def extract_text_from_file(filename: str, file_content: bytes) -> str:
+def extract_text_from_file(filename: str, source: Union[bytes, str]) -> str:
     """
     Extract text from uploaded file based on file extension
-    Supports: .pdf, .txt
+    Supports: .pdf, .txt (as bytes or a path to a spooled upload)
     """
     filename_lower = filename.lower()
     
     if filename_lower.endswith('.pdf'):
-        return extract_text_from_pdf(file_content)
+        return extract_text_from_pdf(source)
     elif filename_lower.endswith('.txt'):
-        return extract_text_from_txt(file_content)
+        return extract_text_from_txt(source)
     else:
         raise Exception(f"Unsupported file type. Only .pdf and .txt files are supported.")
 
@@ -1,60 +1,280 @@
+import os
+import time
+import argparse
 import pandas as pd
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
-from database import SessionLocal, engine, Base
-from models import Job
-import uuid
-
-# Create all tables
-Base.metadata.create_all(bind=engine)
-
-def import_jobs_from_csv():
-    csv_path = "C:\\Users\\TeikFei\\Downloads\\Hackathons\\TechFest 2026\\all_jobs.csv"
-    
-    df = pd.read_csv(csv_path)
-    db = SessionLocal()
-    
-    imported_count = 0
-    skipped_count = 0
-    
-    for _, row in df.iterrows():
-        try:
-            # Get Job_Id or Jobid, if "Not Applicable" or empty, generate unique ID
-            job_id_raw = row.get('Job_Id') or row.get('Jobid')
-            if pd.isna(job_id_raw) or str(job_id_raw).strip() in ['Not Applicable', 'NOT FOUND', '']:
-                job_id_val = f"generated_{uuid.uuid4().hex[:12]}"
-            else:
-                job_id_val = str(job_id_raw)
-            
-            # Check if already exists in DB
-            existing = db.query(Job).filter(Job.job_id == job_id_val).first()
-            if existing:
-                skipped_count += 1
-                continue
-            
-            job = Job(
-                title=str(row.get('Title', '')),
-                company=str(row.get('Company', '')),
-                location=str(row.get('Location', '')),
-                posted=str(row.get('Posted', row.get('Posted_Date', ''))),
-                workplace_model=str(row.get('Workplace_Model', '')),
-                employment_type=str(row.get('Employment_Type', row.get('Type', ''))),
-                salary=str(row.get('Salary', '')),
-                job_description=str(row.get('Description', '')),
-                job_id=job_id_val,
-                url=str(row.get('Url', '')),
-                required_skills=[]
+from database import SessionLocal
+from models import Job, JobAlias, JobSkill, Application, UserJobMatch
+from dedup import NearDuplicateIndex, fingerprint, minhash, shingles
+import match_engine
+from job_stats import refresh_job_stats
+
+DEFAULT_CSV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "all_jobs.csv")
+DEFAULT_CHUNKSIZE = 5000
+
+# Job column -> CSV columns to take it from, first non-empty wins
+COLUMN_SOURCES = {
+    "title": ["Title"],
+    "company": ["Company"],
+    "location": ["Location"],
+    "posted": ["Posted", "Posted_Date"],
+    "workplace_model": ["Workplace_Model"],
+    "employment_type": ["Employment_Type", "Type"],
+    "salary": ["Salary"],
+    "job_description": ["Description"],
+    "url": ["Url"],
+}
+JOB_ID_SOURCES = ["Job_Id", "Jobid"]
+# Placeholders the scraper writes when a posting has no id; other columns keep them as-is
+MISSING_JOB_ID_VALUES = ["Not Applicable", "NOT FOUND", ""]
+
+def _coalesce(chunk: pd.DataFrame, sources, missing=("",)) -> pd.Series:
+    """First value across `sources` not in `missing`, as stripped strings"""
+    result = pd.Series(pd.NA, index=chunk.index, dtype="object")
+    for source in sources:
+        if source in chunk.columns:
+            values = chunk[source].astype("string").str.strip()
+            values = values.mask(values.isin(missing))
+            result = result.fillna(values)
+    return result
+
+def normalise_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Map a raw CSV chunk onto Job columns, vectorised over the whole chunk"""
+    frame = pd.DataFrame(index=chunk.index)
+    for column, sources in COLUMN_SOURCES.items():
+        frame[column] = _coalesce(chunk, sources)
+    frame = frame.fillna("")
+
+    # Row fingerprint over every imported field: unchanged rows are skipped on re-import
+    frame["content_hash"] = pd.util.hash_pandas_object(
+        frame[list(COLUMN_SOURCES)], index=False
+    ).map("{:016x}".format)
+
+    # Identity of the posting itself, ignoring volatile fields like "posted" or salary
+    frame["fingerprint"] = [
+        fingerprint(title, company, location, description)
+        for title, company, location, description in zip(
+            frame["title"], frame["company"], frame["location"], frame["job_description"]
+        )
+    ]
+
+    job_ids = _coalesce(chunk, JOB_ID_SOURCES, MISSING_JOB_ID_VALUES)
+    frame["job_id"] = job_ids.fillna("generated_" + frame["fingerprint"])
+
+    # Within a chunk the last occurrence of a job_id wins, matching upsert semantics
+    return frame.drop_duplicates(subset="job_id", keep="last")
+
+class Deduplicator:
+    """Near-duplicate lookup over the catalogue, built only once a new posting needs it"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._index = None
+
+    @property
+    def index(self) -> NearDuplicateIndex:
+        if self._index is None:
+            self._index = NearDuplicateIndex.from_rows(
+                self.db.query(Job.job_id, Job.title, Job.company, Job.location, Job.job_description)
             )
-            db.add(job)
-            db.commit()
-            imported_count += 1
-        except Exception as e:
-            db.rollback()
-            skipped_count += 1
-            print(f"⏭️  Skipping: {row.get('Title', 'Unknown')} - {e}")
-    
-    db.close()
-    print(f"✅ Successfully imported {imported_count} jobs!")
-    print(f"⏭️  Skipped {skipped_count} jobs (duplicates or errors)")
+        return self._index
+
+    def reset(self):
+        """Forget postings added by a transaction that was rolled back"""
+        self._index = None
+
+def _signature(record: dict):
+    return minhash(shingles(record["title"], record["company"], record["location"], record["job_description"]))
+
+def upsert_chunk(db: Session, frame: pd.DataFrame, dedup: Deduplicator = None) -> dict:
+    """
+    Insert new jobs and update changed ones in a single transaction.
+    New postings that duplicate an existing job (same fingerprint or MinHash
+    near-duplicate) are recorded as aliases of it instead of being inserted.
+    """
+    dedup = dedup or Deduplicator(db)
+    job_ids = frame["job_id"].tolist()
+    existing = {
+        job_id: (pk, content_hash)
+        for pk, job_id, content_hash in db.query(Job.id, Job.job_id, Job.content_hash)
+        .filter(Job.job_id.in_(job_ids))
+    }
+    aliased = {
+        alias for (alias,) in db.query(JobAlias.alias).filter(JobAlias.alias.in_(job_ids))
+    }
+
+    is_existing = frame["job_id"].isin(existing.keys())
+    is_aliased = frame["job_id"].isin(aliased)
+    new_rows = frame[~is_existing & ~is_aliased]
+    known_rows = frame[is_existing]
+    stored_hash = known_rows["job_id"].map(lambda job_id: existing[job_id][1])
+    changed_rows = known_rows[known_rows["content_hash"] != stored_hash]
+
+    same_fingerprint = {
+        fp: job_id for fp, job_id in db.query(Job.fingerprint, Job.job_id)
+        .filter(Job.fingerprint.in_(new_rows["fingerprint"].tolist()))
+    }
+
+    inserts = []
+    aliases = []
+    for record in new_rows.to_dict("records"):
+        canonical = same_fingerprint.get(record["fingerprint"])
+        signature = None
+        if canonical is None:
+            signature = _signature(record)
+            canonical = dedup.index.find(signature, record["title"])
+        if canonical is not None:
+            aliases.append((record["job_id"], canonical))
+            continue
+        record["required_skills"] = []
+        inserts.append(record)
+        same_fingerprint[record["fingerprint"]] = record["job_id"]
+        dedup.index.add(record["job_id"], signature, record["title"])
+
+    if inserts:
+        db.execute(insert(Job), inserts)
+
+    if aliases:
+        canonical_pks = dict(
+            db.query(Job.job_id, Job.id).filter(Job.job_id.in_({canonical for _, canonical in aliases}))
+        )
+        db.execute(insert(JobAlias), [
+            {"alias": alias, "job_id": canonical_pks[canonical]}
+            for alias, canonical in aliases if canonical in canonical_pks
+        ])
+
+    if len(changed_rows):
+        records = changed_rows.to_dict("records")
+        for record in records:
+            record["id"] = existing[record["job_id"]][0]
+        db.execute(update(Job), records)
+
+    db.commit()
+    return {
+        "inserted": len(inserts),
+        "updated": len(changed_rows),
+        "unchanged": len(known_rows) - len(changed_rows) + int(is_aliased.sum()),
+        "merged": len(aliases),
+    }
+
+def merge_existing_duplicates(db: Session) -> dict:
+    """
+    One-off cleanup for catalogues imported before deduplication: backfill
+    fingerprints, then fold every duplicate into the oldest copy, moving its
+    applications and keeping its job_id as an alias.
+    """
+    index = NearDuplicateIndex()
+    by_fingerprint = {}
+    fingerprint_updates = []
+    merges = []
+
+    rows = db.query(Job.id, Job.job_id, Job.title, Job.company, Job.location, Job.job_description, Job.fingerprint) \
+        .order_by(Job.id).all()
+    for row in rows:
+        fp = fingerprint(row.title, row.company, row.location, row.job_description)
+        if fp != row.fingerprint:
+            fingerprint_updates.append({"id": row.id, "fingerprint": fp})
+
+        signature = minhash(shingles(row.title, row.company, row.location, row.job_description))
+        canonical = by_fingerprint.get(fp)
+        if canonical is None:
+            match = index.find(signature, row.title)
+            canonical = int(match) if match is not None else None
+        if canonical is not None:
+            merges.append((row.id, canonical, row.job_id))
+            continue
+        by_fingerprint[fp] = row.id
+        index.add(str(row.id), signature, row.title)
+
+    if fingerprint_updates:
+        db.execute(update(Job), fingerprint_updates)
+
+    for duplicate_pk, canonical_pk, duplicate_job_id in merges:
+        db.query(Application).filter(Application.job_id == duplicate_pk) \
+            .update({Application.job_id: canonical_pk}, synchronize_session=False)
+        db.query(JobAlias).filter(JobAlias.job_id == duplicate_pk) \
+            .update({JobAlias.job_id: canonical_pk}, synchronize_session=False)
+        if duplicate_job_id:
+            db.merge(JobAlias(alias=duplicate_job_id, job_id=canonical_pk))
+
+    if merges:
+        duplicate_pks = [duplicate_pk for duplicate_pk, _, _ in merges]
+        db.query(JobSkill).filter(JobSkill.job_id.in_(duplicate_pks)).delete(synchronize_session=False)
+        db.query(UserJobMatch).filter(UserJobMatch.job_id.in_(duplicate_pks)).delete(synchronize_session=False)
+        db.query(Job).filter(Job.id.in_(duplicate_pks)).delete(synchronize_session=False)
+        match_engine.invalidate()
+
+    db.commit()
+    if merges:
+        refresh_job_stats(db)
+    return {"scanned": len(rows), "merged": len(merges), "fingerprints_updated": len(fingerprint_updates)}
+
+def import_jobs_from_csv(source=DEFAULT_CSV_PATH, chunksize: int = DEFAULT_CHUNKSIZE, db: Session = None) -> dict:
+    """
+    Stream a jobs CSV (path or file object) into the database chunk by chunk.
+    Returns row counts and throughput.
+    """
+    owns_session = db is None
+    db = db or SessionLocal()
+    # Rows of successful chunks reconcile: rows_read = inserted + updated + unchanged + merged + duplicates_in_file
+    stats = {"rows_read": 0, "inserted": 0, "updated": 0, "unchanged": 0, "merged": 0,
+             "duplicates_in_file": 0, "failed_chunks": 0}
+    started = time.perf_counter()
+    dedup = Deduplicator(db)
+
+    try:
+        reader = pd.read_csv(source, chunksize=chunksize, dtype=str, keep_default_na=False,
+                             na_values=[""], encoding="utf-8-sig")
+        for chunk in reader:
+            stats["rows_read"] += len(chunk)
+            try:
+                frame = normalise_chunk(chunk)
+                counts = upsert_chunk(db, frame, dedup)
+            except Exception as e:
+                db.rollback()
+                dedup.reset()
+                stats["failed_chunks"] += 1
+                print(f"⏭️  Skipping chunk ending at row {stats['rows_read']} - {e}")
+                continue
+            for key, value in counts.items():
+                stats[key] += value
+            # Earlier rows sharing a job_id with a later one in the same chunk
+            stats["duplicates_in_file"] += len(chunk) - len(frame)
+
+        if stats["inserted"] or stats["updated"]:
+            refresh_job_stats(db)
+            match_engine.invalidate()
+    finally:
+        if owns_session:
+            db.close()
+
+    elapsed = time.perf_counter() - started
+    stats["elapsed_seconds"] = round(elapsed, 3)
+    stats["rows_per_second"] = round(stats["rows_read"] / elapsed, 1) if elapsed > 0 else None
+    return stats
 
 if __name__ == "__main__":
-    import_jobs_from_csv()
\ No newline at end of file
+    from migrations import run_migrations
+
+    parser = argparse.ArgumentParser(description="Import jobs from a CSV export")
+    parser.add_argument("csv_path", nargs="?", default=DEFAULT_CSV_PATH)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--dedupe", action="store_true", help="Merge duplicates already in the database first")
+    args = parser.parse_args()
+
+    run_migrations()
+    if args.dedupe:
+        db = SessionLocal()
+        try:
+            result = merge_existing_duplicates(db)
+        finally:
+            db.close()
+        print(f"🧹 Merged {result['merged']} duplicate jobs out of {result['scanned']}")
+    stats = import_jobs_from_csv(args.csv_path, chunksize=args.chunksize)
+    print(f"✅ Imported {stats['inserted']} new, updated {stats['updated']}, "
+          f"merged {stats['merged']} duplicates, {stats['unchanged']} unchanged, "
+          f"{stats['duplicates_in_file']} repeated in the file ({stats['rows_read']} rows read)")
+    print(f"⏱️  {stats['elapsed_seconds']}s, {stats['rows_per_second']} rows/sec")
+    if stats["failed_chunks"]:
+        print(f"⏭️  Skipped {stats['failed_chunks']} chunk(s) due to errors")
@@ -0,0 +1,95 @@
+import hashlib
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, Tuple
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+import models
+from database import SessionLocal
+
+FACET_COLUMNS = {
+    "company": models.Job.company,
+    "location": models.Job.location,
+    "employment_type": models.Job.employment_type,
+    "workplace_model": models.Job.workplace_model,
+}
+# Facets whose raw values are comma-separated lists ("Contract, Permanent, Full Time")
+MULTI_VALUED = {"employment_type"}
+EMPTY_VALUES = {"", "nan", "Not Applicable", "NOT FOUND"}
+
+_payload_cache: Dict[int, Tuple[Dict, str]] = {}
+_cache_lock = threading.Lock()
+
+def _split(facet: str, value: str):
+    if value is None:
+        return []
+    parts = value.split(",") if facet in MULTI_VALUED else [value]
+    return [p.strip() for p in parts if p.strip() not in EMPTY_VALUES]
+
+def refresh_job_stats(db: Session) -> int:
+    """
+    Recompute the facet table with one GROUP BY per facet and bump the version.
+    Called after imports and other bulk job writes, never per request.
+    """
+    counts = defaultdict(Counter)
+    for facet, column in FACET_COLUMNS.items():
+        for value, count in db.query(column, func.count()).group_by(column):
+            for part in _split(facet, value):
+                counts[facet][part] += count
+
+    total_jobs = db.query(func.count(models.Job.id)).scalar() or 0
+
+    db.query(models.JobFacet).delete(synchronize_session=False)
+    rows = [
+        {"facet": facet, "value": value, "count": count}
+        for facet, values in counts.items() for value, count in values.items()
+    ]
+    if rows:
+        db.execute(insert(models.JobFacet), rows)
+
+    summary = db.get(models.JobStatsSummary, 1)
+    if summary is None:
+        summary = models.JobStatsSummary(id=1, version=0)
+        db.add(summary)
+    summary.total_jobs = total_jobs
+    summary.total_companies = len(counts["company"])
+    summary.version = (summary.version or 0) + 1
+    summary.refreshed_at = datetime.utcnow()
+    db.commit()
+    return summary.version
+
+def get_overview(db: Session) -> Tuple[Dict, str]:
+    """Return the stats payload and its ETag, served from the materialised summary"""
+    summary = db.get(models.JobStatsSummary, 1)
+    if summary is None:
+        # First request on a fresh database; `db` may be a read-only session
+        with SessionLocal() as write_db:
+            refresh_job_stats(write_db)
+        summary = db.get(models.JobStatsSummary, 1)
+
+    version = summary.version
+    with _cache_lock:
+        cached = _payload_cache.get(version)
+    if cached:
+        return cached
+
+    facets = defaultdict(list)
+    for facet, value, count in db.query(models.JobFacet.facet, models.JobFacet.value, models.JobFacet.count) \
+            .order_by(models.JobFacet.facet, models.JobFacet.count.desc(), models.JobFacet.value):
+        facets[facet].append({"value": value, "count": count})
+
+    payload = {
+        "total_jobs": summary.total_jobs,
+        "total_companies": summary.total_companies,
+        "locations": [f["value"] for f in facets["location"]],
+        "employment_types": [f["value"] for f in facets["employment_type"]],
+        "facets": {facet: facets[facet] for facet in FACET_COLUMNS},
+        "refreshed_at": summary.refreshed_at,
+    }
+    etag = '"' + hashlib.sha1(f"{version}:{summary.refreshed_at}".encode()).hexdigest()[:16] + '"'
+
+    with _cache_lock:
+        _payload_cache.clear()
+        _payload_cache[version] = (payload, etag)
+    return payload, etag
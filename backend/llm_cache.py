@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+class LLMCache:
+    """
+    Persistent, content-addressed cache of LLM replies.
+
+    Entries are keyed by a hash of (model, prompt, temperature), expire after
+    `ttl` seconds and are evicted least-recently-used once the cache holds more
+    than `max_entries` rows. Backed by its own SQLite file so it survives
+    restarts and is shared between worker processes. The file is only
+    opened on the first lookup, so importing the module touches no disk.
+
+    Hits only record their access time in memory; the times are written in
+    one batch every `touch_batch` hits and before each eviction. Eviction
+    runs every `evict_every` inserts, so the cache may briefly hold up to
+    `evict_every - 1` rows (per worker process) over `max_entries`.
+    """
+
+    def __init__(self, path: str, ttl: float, max_entries: int,
+                 touch_batch: int = 100, evict_every: Optional[int] = None):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.touch_batch = touch_batch
+        self.evict_every = evict_every or max(1, max_entries // 100)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._touched: Dict[str, float] = {}
+        self._inserts_since_evict = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the SQLite file on first use rather than at import (caller holds the lock)"""
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_last_accessed ON llm_cache (last_accessed)")
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def make_key(model: str, prompt: str, temperature: float) -> str:
+        payload = json.dumps([model, prompt, temperature], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._touched.pop(key, None)
+                self.misses += 1
+                return None
+            self._touched[key] = now
+            if len(self._touched) >= self.touch_batch:
+                self._flush_touches()
+            self.hits += 1
+            return row[0]
+
+    def _flush_touches(self) -> None:
+        """Write the buffered access times in one statement (caller holds the lock)"""
+        if self._touched:
+            self._connection().executemany(
+                "UPDATE llm_cache SET last_accessed = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, last_accessed) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            self._touched.pop(key, None)
+            self._inserts_since_evict += 1
+            if self._inserts_since_evict < self.evict_every:
+                return
+            self._inserts_since_evict = 0
+            self._flush_touches()
+            conn.execute(
+                """DELETE FROM llm_cache WHERE key IN (
+                    SELECT key FROM llm_cache ORDER BY last_accessed
+                    LIMIT max((SELECT COUNT(*) FROM llm_cache) - ?, 0)
+                )""",
+                (self.max_entries,)
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection().execute("DELETE FROM llm_cache")
+            self._touched.clear()
+            self._inserts_since_evict = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries = self._connection().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+        }
+
+cache = LLMCache(
+    path=os.getenv("LLM_CACHE_PATH", "./llm_cache.db"),
+    ttl=float(os.getenv("LLM_CACHE_TTL_SECONDS", 7 * 24 * 3600)),
+    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", 5000)),
+)
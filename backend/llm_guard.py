@@ -0,0 +1,491 @@
+"""
+Guards around the Groq clients: single-flight deduplication of identical
+in-flight requests, a token-bucket limiter sized to the provider's per-minute
+quotas, a circuit breaker that fails fast while the provider is down, and
+metrics for queue wait, latency and tokens.
+
+GuardedClient / GuardedAsyncClient expose the same
+`client.chat.completions.create(...)` surface as the clients they wrap, so
+they are drop-in replacements (and can wrap fake_llm clients too).
+"""
+import asyncio
+import hashlib
+import json
+import math
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, Optional, Tuple
+from skill_extractor import LatencyStats
+
+# Provider quotas (Groq free tier for llama-3.1-8b-instant); 0 disables a limit
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", 30))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", 6000))
+# Reserved for the reply until the real usage is known
+LLM_EXPECTED_COMPLETION_TOKENS = int(os.getenv("LLM_EXPECTED_COMPLETION_TOKENS", 300))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", 5))
+LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", 30))
+
+class CircuitOpenError(RuntimeError):
+    """The provider failed repeatedly; calls are refused until the breaker resets (HTTP 503)"""
+    status_code = 503
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def is_provider_failure(exc: BaseException) -> bool:
+    """
+    Outages count against the breaker. 4xx answers mean the provider is up, so a
+    429 never opens it; the token buckets back off for its Retry-After instead.
+    """
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    # httpx is only loaded once a real client exists, and only then can its errors occur
+    httpx = sys.modules.get("httpx")
+    if httpx is not None and isinstance(exc, httpx.TransportError):
+        return True
+    if type(exc).__name__ in ("APIConnectionError", "APITimeoutError"):
+        return True
+    status = getattr(exc, "status_code", None)
+    return status is not None and status >= 500
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+class TokenBucket:
+    """
+    Refills at `per_minute / 60` units per second up to one minute's worth.
+    `reserve` takes units immediately, letting the balance go negative, and
+    returns how long the caller must wait, so waiters are served in arrival
+    order without polling.
+    """
+
+    def __init__(self, per_minute: float):
+        self.per_minute = per_minute
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        if self.per_minute <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= min(amount, self.capacity)
+            return max(0.0, -self.tokens / self.rate)
+
+    def adjust(self, amount: float):
+        """Give back (positive) or take (negative) units once the real cost is known"""
+        if self.per_minute <= 0:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+    def pause(self, seconds: float):
+        """Hold every new reservation back for at least `seconds` (after a 429)"""
+        if self.per_minute <= 0:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, -seconds * self.rate)
+
+class CircuitBreaker:
+    """
+    Closed: calls pass. After `failure_threshold` consecutive provider failures
+    it opens and refuses calls for `reset_timeout` seconds, then lets a single
+    trial call through (half-open) which closes or re-opens it. Whoever holds
+    the trial must hand it back through `record(..., trial=True)` or `release`.
+    """
+
+    def __init__(self, failure_threshold: int = LLM_BREAKER_FAILURES, reset_timeout: float = LLM_BREAKER_RESET_SECONDS):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> bool:
+        """Raise CircuitOpenError if calls are refused; True when this call is the half-open trial"""
+        with self._lock:
+            if self.state == "open":
+                remaining = self.opened_at + self.reset_timeout - time.monotonic()
+                if remaining > 0:
+                    raise CircuitOpenError(f"LLM provider unavailable, retrying in {remaining:.0f}s", math.ceil(remaining))
+                self.state = "half_open"
+            if self.state == "half_open":
+                if self._trial_running:
+                    raise CircuitOpenError("LLM provider unavailable, trial call in progress")
+                self._trial_running = True
+                return True
+            return False
+
+    def release(self, trial: bool):
+        """Hand back a trial slot whose call was never made"""
+        if trial:
+            with self._lock:
+                self._trial_running = False
+
+    def record(self, exc: Optional[BaseException] = None, trial: bool = False):
+        with self._lock:
+            if trial:
+                self._trial_running = False
+            if exc is not None and not isinstance(exc, Exception):
+                # Cancelled or abandoned by the caller: says nothing about the provider
+                return
+            if exc is None or not is_provider_failure(exc):
+                self.state = "closed"
+                self.failures = 0
+                return
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.times_opened += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+class LLMMetrics:
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.rejected = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.queue_wait = LatencyStats()
+        self.latency = LatencyStats()
+        self._lock = threading.Lock()
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def record(self, stats: LatencyStats, seconds: float):
+        with self._lock:
+            stats.record(seconds)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "errors": self.errors,
+                "rate_limited": self.rate_limited,
+                "rejected_by_breaker": self.rejected,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "total_tokens": self.prompt_tokens + self.completion_tokens,
+                "queue_wait": self.queue_wait.snapshot(),
+                "latency": self.latency.snapshot(),
+            }
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for requests not yet answered"""
+    return len(text) // 4 + 1
+
+class LLMGuard:
+    """Limiter, breaker and metrics shared by every client talking to one provider"""
+
+    def __init__(
+        self,
+        requests_per_minute: float = LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = LLM_TOKENS_PER_MINUTE,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.breaker = breaker or CircuitBreaker()
+        self.metrics = LLMMetrics()
+
+    @staticmethod
+    def request_key(messages, model, temperature, kwargs) -> str:
+        payload = json.dumps([model, messages, temperature, sorted(kwargs.items())], ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def estimate(messages, kwargs) -> int:
+        prompt = "".join(str(message.get("content", "")) for message in messages)
+        return estimate_tokens(prompt) + int(kwargs.get("max_tokens") or LLM_EXPECTED_COMPLETION_TOKENS)
+
+    def admit(self, estimated_tokens: int) -> Tuple[float, bool]:
+        """
+        Check the breaker and reserve quota. Returns the seconds to wait before
+        calling and whether the call is the breaker's trial; follow up with
+        `settle`, or `abandon` if the call is never made.
+        """
+        try:
+            trial = self.breaker.before_call()
+        except CircuitOpenError:
+            self.metrics.add(rejected=1)
+            raise
+        return max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens)), trial
+
+    def abandon(self, estimated_tokens: int, trial: bool):
+        """Undo `admit` for a call cancelled before it was sent: free the trial slot and refund the quota"""
+        self.breaker.release(trial)
+        self.requests.adjust(1)
+        self.tokens.adjust(estimated_tokens)
+
+    def settle(
+        self,
+        estimated_tokens: int,
+        response=None,
+        exc: Optional[BaseException] = None,
+        completion_text: str = "",
+        trial: bool = False
+    ):
+        """Record the outcome: breaker state, real token usage and 429 back-off"""
+        self.breaker.record(exc, trial)
+        if exc is not None:
+            if isinstance(exc, Exception):
+                self.metrics.add(errors=1)
+            if getattr(exc, "status_code", None) == 429:
+                self.metrics.add(rate_limited=1)
+                self.tokens.pause(retry_after_seconds(exc) or 1.0)
+                self.requests.pause(retry_after_seconds(exc) or 1.0)
+            return
+
+        usage = getattr(response, "usage", None)
+        prompt_tokens = getattr(usage, "prompt_tokens", None)
+        completion_tokens = getattr(usage, "completion_tokens", None)
+        if completion_tokens is None:
+            completion_tokens = estimate_tokens(completion_text) if completion_text else 0
+        if prompt_tokens is None:
+            prompt_tokens = max(0, estimated_tokens - LLM_EXPECTED_COMPLETION_TOKENS)
+        self.metrics.add(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        self.tokens.adjust(estimated_tokens - prompt_tokens - completion_tokens)
+
+    def stats(self) -> Dict:
+        return {
+            "breaker": {
+                "state": self.breaker.state,
+                "consecutive_failures": self.breaker.failures,
+                "times_opened": self.breaker.times_opened,
+            },
+            "limits": {
+                "requests_per_minute": self.requests.per_minute,
+                "tokens_per_minute": self.tokens.per_minute,
+            },
+            **self.metrics.snapshot(),
+        }
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error: Optional[BaseException] = None
+
+class _GuardedCompletions:
+    def __init__(self, owner: "GuardedClient"):
+        self._owner = owner
+
+    def create(self, messages, model=None, temperature=None, stream=False, **kwargs):
+        return self._owner._create(messages, model, temperature, stream, kwargs)
+
+class GuardedClient:
+    """Synchronous client wrapper; identical concurrent requests from several threads share one call"""
+
+    def __init__(self, client, guard: LLMGuard):
+        self.client = client
+        self.guard = guard
+        self.chat = SimpleNamespace(completions=_GuardedCompletions(self))
+        self._inflight: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def _create(self, messages, model, temperature, stream, kwargs):
+        if stream:
+            return self._call(messages, model, temperature, stream, kwargs)
+
+        key = self.guard.request_key(messages, model, temperature, kwargs)
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+        if not leader:
+            self.guard.metrics.add(coalesced=1)
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.response
+
+        try:
+            flight.response = self._call(messages, model, temperature, stream, kwargs)
+            return flight.response
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.done.set()
+
+    def _call(self, messages, model, temperature, stream, kwargs):
+        estimated = self.guard.estimate(messages, kwargs)
+        queued = time.perf_counter()
+        wait, trial = self.guard.admit(estimated)
+        try:
+            if wait:
+                time.sleep(wait)
+        except BaseException:
+            self.guard.abandon(estimated, trial)
+            raise
+        started = time.perf_counter()
+        self.guard.metrics.record(self.guard.metrics.queue_wait, started - queued)
+        self.guard.metrics.add(calls=1)
+        try:
+            response = self.client.chat.completions.create(
+                messages=messages, model=model, temperature=temperature, stream=stream, **kwargs
+            )
+        except BaseException as e:
+            self.guard.settle(estimated, exc=e, trial=trial)
+            raise
+        if stream:
+            # The provider accepted the request, which decides a trial call; the
+            # stream may be closed or dropped without ever being iterated
+            self.guard.breaker.record(trial=trial)
+            return self._track_stream(response, estimated, started)
+        self.guard.metrics.record(self.guard.metrics.latency, time.perf_counter() - started)
+        self.guard.settle(estimated, response, trial=trial)
+        return response
+
+    def _track_stream(self, stream, estimated, started):
+        parts = []
+        try:
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    parts.append(delta)
+                yield chunk
+        except GeneratorExit:
+            # The consumer stopped reading early; count what it received
+            self.guard.settle(estimated, completion_text="".join(parts))
+            raise
+        except BaseException as e:
+            self.guard.settle(estimated, exc=e)
+            raise
+        self.guard.metrics.record(self.guard.metrics.latency, time.perf_counter() - started)
+        self.guard.settle(estimated, completion_text="".join(parts))
+
+    def close(self):
+        self.client.close()
+
+class _GuardedAsyncCompletions:
+    def __init__(self, owner: "GuardedAsyncClient"):
+        self._owner = owner
+
+    async def create(self, messages, model=None, temperature=None, stream=False, **kwargs):
+        return await self._owner._create(messages, model, temperature, stream, kwargs)
+
+class GuardedAsyncClient:
+    """Async client wrapper; identical concurrent requests on the event loop share one call"""
+
+    def __init__(self, client, guard: LLMGuard):
+        self.client = client
+        self.guard = guard
+        self.chat = SimpleNamespace(completions=_GuardedAsyncCompletions(self))
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def _create(self, messages, model, temperature, stream, kwargs):
+        if stream:
+            return await self._call(messages, model, temperature, stream, kwargs)
+
+        key = self.guard.request_key(messages, model, temperature, kwargs)
+        while key in self._inflight:
+            future = self._inflight[key]
+            self.guard.metrics.add(coalesced=1)
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The leader was cancelled, not us: take over the call
+                if not future.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        # Mark the outcome as retrieved even when nobody else was waiting
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self._inflight[key] = future
+        try:
+            response = await self._call(messages, model, temperature, stream, kwargs)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(response)
+            return response
+        finally:
+            del self._inflight[key]
+
+    async def _call(self, messages, model, temperature, stream, kwargs):
+        estimated = self.guard.estimate(messages, kwargs)
+        queued = time.perf_counter()
+        wait, trial = self.guard.admit(estimated)
+        try:
+            if wait:
+                await asyncio.sleep(wait)
+        except BaseException:
+            # Cancelled while waiting for quota: nothing reached the provider
+            self.guard.abandon(estimated, trial)
+            raise
+        started = time.perf_counter()
+        self.guard.metrics.record(self.guard.metrics.queue_wait, started - queued)
+        self.guard.metrics.add(calls=1)
+        try:
+            response = await self.client.chat.completions.create(
+                messages=messages, model=model, temperature=temperature, stream=stream, **kwargs
+            )
+        except BaseException as e:
+            self.guard.settle(estimated, exc=e, trial=trial)
+            raise
+        if stream:
+            # The provider accepted the request, which decides a trial call; the
+            # stream may be closed or dropped without ever being iterated
+            self.guard.breaker.record(trial=trial)
+            return self._track_stream(response, estimated, started)
+        self.guard.metrics.record(self.guard.metrics.latency, time.perf_counter() - started)
+        self.guard.settle(estimated, response, trial=trial)
+        return response
+
+    async def _track_stream(self, stream, estimated, started):
+        parts = []
+        try:
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    parts.append(delta)
+                yield chunk
+        except GeneratorExit:
+            # The consumer stopped reading early; count what it received
+            self.guard.settle(estimated, completion_text="".join(parts))
+            raise
+        except BaseException as e:
+            self.guard.settle(estimated, exc=e)
+            raise
+        self.guard.metrics.record(self.guard.metrics.latency, time.perf_counter() - started)
+        self.guard.settle(estimated, completion_text="".join(parts))
+
+    async def close(self):
+        await self.client.close()
@@ -1,22 +1,51 @@
-from fastapi import FastAPI, Depends, HTTPException, Query, UploadFile, File
+from fastapi import FastAPI, Depends, HTTPException, Query, UploadFile, File, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse, ORJSONResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from datetime import datetime
+import asyncio
+import json
+import os
+import tempfile
 import models, schemas
-from database import engine, get_db
+from database import engine, read_engine, get_db, get_read_db, SessionLocal
+from search import apply_search
+from migrations import run_migrations
+import bulk_extract
+from bulk_extract import BulkSkillExtractor
+import match_engine
+import job_stats
+import skill_index
+import skill_extractor
+from skill_index import set_job_skills, set_user_skills
+from match_store import refresh_job_matches, refresh_user_matches
+from workers import run_blocking, shutdown_pools
+from resume_processing import process_resume, ResumeError
+from resume_batch import ingest_resumes, BatchTooLargeError, BATCH_MAX_UPLOAD_BYTES
+from task_queue import TaskQueue, QueueFullError
+from file_utils import is_supported_file, save_upload, UploadTooLargeError
+from upload_limits import BodySizeLimitMiddleware, MULTIPART_OVERHEAD_BYTES
 from ai_service import (
-    extract_skills_from_job, 
     calculate_skill_match, 
-    generate_upskilling_roadmap,
-    extract_skills_from_resume
-)
-from file_utils import (
-    extract_text_from_file,
-    extract_email_from_text,
-    extract_name_from_filename
+    extract_skills_from_job_async,
+    generate_upskilling_roadmap_async,
+    stream_upskilling_roadmap_async,
+    extract_skills_from_resume_async,
+    close_async_client,
+    llm_guard
 )
+from llm_cache import cache as llm_cache
+from llm_guard import CircuitOpenError
+import metrics
+from profiler import PROFILER_ENABLED, PROFILE_MAX_SECONDS, SamplingProfiler
 
-models.Base.metadata.create_all(bind=engine)
+# Schema changes run at startup, not on import; workers starting together take turns
+# through a file lock. Set MIGRATE_ON_STARTUP=0 when `python migrations.py` runs as
+# a separate deploy step before the workers start.
+MIGRATE_ON_STARTUP = os.getenv("MIGRATE_ON_STARTUP", "1") != "0"
 
 app = FastAPI(title="JobScope API")
 
@@ -26,23 +55,114 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Next-Cursor", "ETag"],
+)
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+app.add_middleware(BodySizeLimitMiddleware, path_prefixes=["/api/upload-resume"])
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    path_prefixes=["/api/upload-resumes"],
+    max_bytes=BATCH_MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES
 )
+# Added last so it is outermost and times everything the other middleware does
+app.add_middleware(metrics.RequestMetricsMiddleware)
+
+for bound in {engine, read_engine}:
+    metrics.instrument_engine(bound)
+
+async def _process_queued_resume(filename: str, path: str, report):
+    db = SessionLocal()
+    try:
+        return await process_resume(db, filename, path, report)
+    finally:
+        db.close()
+
+# Task state is in-process: run a single worker process (uvicorn --workers 1)
+# when clients poll /api/tasks, see TaskQueue
+resume_queue = TaskQueue(
+    handler=_process_queued_resume,
+    workers=int(os.getenv("RESUME_QUEUE_WORKERS", 2)),
+    max_depth=int(os.getenv("RESUME_QUEUE_MAX_DEPTH", 50)),
+    upload_dir=os.getenv("RESUME_UPLOAD_DIR")
+)
+
+metrics.registry.collector(
+    "resume_queue_depth", "Resume uploads waiting for a worker", lambda: [((), resume_queue.depth)]
+)
+metrics.registry.collector(
+    "llm_circuit_open", "1 while the LLM circuit breaker is refusing calls",
+    lambda: [((), int(llm_guard.breaker.state != "closed"))]
+)
+metrics.registry.collector(
+    "llm_provider_calls_total", "LLM calls by what the guard did with them",
+    lambda: [((outcome,), llm_guard.stats()[key]) for outcome, key in (
+        ("sent", "calls"), ("coalesced", "coalesced"), ("failed", "errors"),
+        ("rate_limited", "rate_limited"), ("rejected", "rejected_by_breaker")
+    )],
+    labelnames=("outcome",), type="counter"
+)
+
+@app.on_event("startup")
+async def startup():
+    if MIGRATE_ON_STARTUP:
+        run_migrations(engine)
+    await resume_queue.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await resume_queue.stop()
+    await close_async_client()
+    shutdown_pools()
+
+@app.exception_handler(CircuitOpenError)
+async def circuit_open_handler(request: Request, exc: CircuitOpenError):
+    """The LLM provider is failing: refuse fast instead of answering with empty AI results"""
+    return fast_json({"detail": str(exc)}, status_code=503, headers={"Retry-After": str(int(exc.retry_after))})
+
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def sse_response(events) -> StreamingResponse:
+    """
+    Stream Server-Sent Events unbuffered. Content-Encoding: identity makes
+    GZipMiddleware pass the events through instead of holding them in its
+    compressor until the stream ends; X-Accel-Buffering does the same for nginx.
+    """
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "Content-Encoding": "identity", "X-Accel-Buffering": "no"}
+    )
+
+def fast_json(content, status_code: int = 200, headers: Optional[dict] = None) -> ORJSONResponse:
+    """
+    Serialise data we built ourselves straight to JSON with orjson,
+    bypassing response_model validation and jsonable_encoder.
+    """
+    return ORJSONResponse(content, status_code=status_code, headers=headers)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match check with weak comparison: accepts "*", comma-separated
+    lists and W/ tags (proxies weaken the ETag when they recompress a body)
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
 
 # ===== JOB ENDPOINTS =====
 
-@app.get("/api/jobs")
-def get_jobs(
-    skip: int = 0,
-    limit: int = 349,
+def filter_jobs(
+    query,
     employment_type: Optional[str] = None,
     location: Optional[str] = None,
     company: Optional[str] = None,
-    search: Optional[str] = None,
-    db: Session = Depends(get_db)
+    search: Optional[str] = None
 ):
-    """Get all jobs with optional filters"""
-    query = db.query(models.Job)
-    
+    """Apply the shared job-listing filters to a query over models.Job"""
     if employment_type:
         query = query.filter(models.Job.employment_type.contains(employment_type))
     if location:
@@ -50,40 +170,97 @@ def get_jobs(
     if company:
         query = query.filter(models.Job.company.contains(company))
     if search:
-        query = query.filter(
-            (models.Job.title.contains(search)) | 
-            (models.Job.company.contains(search)) |
-            (models.Job.location.contains(search))
-        )
+        query = apply_search(query, search, models.Job)
+    return query
+
+def with_match_scores(query, user_id: Optional[int], sort: str):
+    """
+    Add the user's stored match_percentage (0 when not stored) to a job query,
+    and order by it, best first, when `sort` is "match"
+    """
+    if user_id is None:
+        if sort == "match":
+            raise HTTPException(status_code=400, detail="sort=match requires user_id")
+        return query
     
-    jobs = query.offset(skip).limit(limit).all()
-    return jobs
+    score = func.coalesce(models.UserJobMatch.match_percentage, 0.0)
+    query = query.add_columns(score.label("match_percentage")).outerjoin(
+        models.UserJobMatch,
+        (models.UserJobMatch.job_id == models.Job.id) & (models.UserJobMatch.user_id == user_id)
+    )
+    if sort == "match":
+        query = query.order_by(None).order_by(score.desc(), models.Job.id)
+    return query
+
+@app.get("/api/jobs", response_class=ORJSONResponse, responses={200: {"model": List[schemas.JobDetail]}})
+def get_jobs(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(349, ge=1, le=1000),
+    employment_type: Optional[str] = None,
+    location: Optional[str] = None,
+    company: Optional[str] = None,
+    search: Optional[str] = None,
+    fields: str = Query("full", pattern="^(summary|full)$"),
+    cursor: Optional[int] = Query(None, description="Return jobs with id greater than this (keyset pagination)"),
+    user_id: Optional[int] = Query(None, description="Include this user's match_percentage for every job"),
+    sort: str = Query("id", pattern="^(id|match)$"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Get all jobs with optional filters.
+    `fields=summary` omits the description; `cursor` pages by id without OFFSET
+    (search results are ranked by relevance, so they page with `skip`).
+    `sort=match` orders by the user's stored match scores and also pages with `skip`.
+    """
+    columns = schemas.JOB_SUMMARY_FIELDS if fields == "summary" else schemas.JOB_DETAIL_FIELDS
+    query = db.query(*[getattr(models.Job, name) for name in columns])
+    query = filter_jobs(query, employment_type, location, company, search)
+    
+    headers = {"X-Total-Count": str(query.order_by(None).count())}
+    
+    query = with_match_scores(query, user_id, sort)
+    keyset = not search and sort == "id"
+    if keyset:
+        if cursor is not None:
+            query = query.filter(models.Job.id > cursor)
+        query = query.order_by(models.Job.id)
+    if cursor is None or not keyset:
+        query = query.offset(skip)
+    
+    jobs = query.limit(limit).all()
+    
+    if keyset and len(jobs) == limit:
+        headers["X-Next-Cursor"] = str(jobs[-1].id)
+    
+    return fast_json([row._asdict() for row in jobs], headers=headers)
+
+@app.post("/api/jobs/import")
+def import_jobs(file: UploadFile = File(...), chunksize: int = Query(5000, ge=100, le=100000), db: Session = Depends(get_db)):
+    """Stream an uploaded jobs CSV into the catalogue (insert new, update changed)"""
+    if not file.filename.lower().endswith(".csv"):
+        raise HTTPException(status_code=400, detail="Only .csv files are supported")
+    # Imported on first use: pandas is the slowest import in the app
+    from import_jobs import import_jobs_from_csv
+    return import_jobs_from_csv(file.file, chunksize=chunksize, db=db)
 
 @app.get("/api/jobs/{job_id}", response_model=schemas.Job)
-def get_job(job_id: int, db: Session = Depends(get_db)):
+def get_job(job_id: int, db: Session = Depends(get_read_db)):
     """Get a single job by ID"""
     job = db.query(models.Job).filter(models.Job.id == job_id).first()
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     return job
 
-@app.get("/api/jobs/stats/overview")
-def get_job_stats(db: Session = Depends(get_db)):
-    """Get overview statistics about jobs"""
-    total_jobs = db.query(models.Job).count()
-    
-    companies = db.query(models.Job.company).distinct().count()
-    
-    locations = db.query(models.Job.location).distinct().all()
+@app.get("/api/jobs/stats/overview", response_class=ORJSONResponse)
+def get_job_stats(request: Request, db: Session = Depends(get_read_db)):
+    """Get overview statistics about jobs, with facet counts"""
+    payload, etag = job_stats.get_overview(db)
     
-    employment_types = db.query(models.Job.employment_type).distinct().all()
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
     
-    return {
-        "total_jobs": total_jobs,
-        "total_companies": companies,
-        "locations": [loc[0] for loc in locations if loc[0]],
-        "employment_types": [e[0] for e in employment_types if e[0]]
-    }
+    return fast_json(payload, headers=headers)
 
 # ===== USER ENDPOINTS =====
 
@@ -96,18 +273,114 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
     
     db_user = models.User(**user.dict())
     db.add(db_user)
+    db.flush()
+    set_user_skills(db, db_user.id, user.skills)
+    refresh_user_matches(db, [db_user.id])
     db.commit()
     db.refresh(db_user)
     return db_user
 
 @app.get("/api/users/{user_id}", response_model=schemas.User)
-def get_user(user_id: int, db: Session = Depends(get_db)):
+def get_user(user_id: int, db: Session = Depends(get_read_db)):
     """Get user by ID"""
     user = db.query(models.User).filter(models.User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
+@app.get("/api/users/{user_id}/top-matches", response_model=List[schemas.JobMatch])
+def get_top_matches(
+    user_id: int,
+    k: int = Query(10, ge=1, le=100),
+    min_match: float = Query(0, ge=0, le=100),
+    employment_type: Optional[str] = None,
+    location: Optional[str] = None,
+    company: Optional[str] = None,
+    search: Optional[str] = None,
+    match_mode: Optional[str] = Query(None, pattern="^(exact|semantic)$", description="Override SKILL_MATCH_MODE"),
+    db: Session = Depends(get_read_db)
+):
+    """Rank every job against the user's skills and return the best K"""
+    user = db.query(models.User).filter(models.User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    allowed_ids = None
+    if employment_type or location or company or search:
+        id_query = filter_jobs(db.query(models.Job.id), employment_type, location, company, search)
+        allowed_ids = [row[0] for row in id_query.all()]
+    
+    index = match_engine.get_index(db)
+    ranked = index.top_k(user.skills or [], k, allowed_job_ids=allowed_ids, min_match=min_match, mode=match_mode)
+    if not ranked:
+        return []
+    
+    jobs = {
+        job.id: job for job in
+        db.query(models.Job).filter(models.Job.id.in_([job_id for job_id, _ in ranked])).all()
+    }
+    results = []
+    for job_id, _ in ranked:
+        job = jobs.get(job_id)
+        if job is None:
+            continue
+        results.append({
+            "job_id": job.id,
+            "job_title": job.title,
+            "company": job.company,
+            "location": job.location,
+            **calculate_skill_match(user.skills or [], job.required_skills or [], match_mode)
+        })
+    return results
+
+# ===== SKILL ENDPOINTS =====
+
+@app.get("/api/skills/jobs", response_class=ORJSONResponse, responses={200: {"model": List[schemas.JobDetail]}})
+def get_jobs_by_skills(
+    skills: List[str] = Query(..., description="Skill names or aliases, e.g. skills=Kubernetes&skills=JS"),
+    match: str = Query("all", pattern="^(all|any)$"),
+    employment_type: Optional[str] = None,
+    location: Optional[str] = None,
+    company: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    fields: str = Query("summary", pattern="^(summary|full)$"),
+    user_id: Optional[int] = Query(None, description="Include this user's match_percentage for every job"),
+    sort: str = Query("id", pattern="^(id|match)$"),
+    db: Session = Depends(get_read_db)
+):
+    """Jobs requiring all (or any) of the given skills, answered from the job_skills index"""
+    job_ids = skill_index.job_ids_with_skills(db, skills, match_all=match == "all")
+    if job_ids is None:
+        return fast_json([], headers={"X-Total-Count": "0"})
+    
+    columns = schemas.JOB_SUMMARY_FIELDS if fields == "summary" else schemas.JOB_DETAIL_FIELDS
+    query = db.query(*[getattr(models.Job, name) for name in columns]).filter(models.Job.id.in_(job_ids))
+    query = filter_jobs(query, employment_type, location, company)
+    
+    total = query.order_by(None).count()
+    query = with_match_scores(query.order_by(models.Job.id), user_id, sort)
+    rows = query.offset(skip).limit(limit).all()
+    
+    return fast_json([row._asdict() for row in rows], headers={"X-Total-Count": str(total)})
+
+@app.get("/api/skills/demand", response_model=List[schemas.SkillDemand])
+def get_skill_demand(
+    limit: int = Query(50, ge=1, le=500),
+    employment_type: Optional[str] = None,
+    location: Optional[str] = None,
+    company: Optional[str] = None,
+    search: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    """Number of jobs requiring each skill, most in-demand first"""
+    job_ids = None
+    if employment_type or location or company or search:
+        id_query = filter_jobs(db.query(models.Job.id), employment_type, location, company, search)
+        job_ids = id_query.order_by(None).statement
+    
+    return skill_index.skill_demand(db, job_ids=job_ids, limit=limit)
+
 # ===== APPLICATION ENDPOINTS =====
 
 @app.post("/api/applications", response_model=schemas.Application)
@@ -133,59 +406,234 @@ def create_application(application: schemas.ApplicationCreate, db: Session = Dep
     db.refresh(db_application)
     return db_application
 
-@app.get("/api/applications/user/{user_id}")
-def get_user_applications(user_id: int, db: Session = Depends(get_db)):
+@app.get(
+    "/api/applications/user/{user_id}",
+    response_class=ORJSONResponse,
+    responses={200: {"model": List[schemas.ApplicationWithJob]}}
+)
+def get_user_applications(
+    user_id: int,
+    status: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_read_db)
+):
     """Get all applications for a user"""
-    applications = db.query(models.Application).filter(
+    query = db.query(
+        models.Application.id,
+        models.Application.job_id,
+        models.Application.status,
+        models.Application.applied_at,
+        models.Job.title,
+        models.Job.company
+    ).outerjoin(models.Application.job).filter(
         models.Application.user_id == user_id
-    ).all()
+    )
     
-    results = []
-    for app in applications:
-        job = db.query(models.Job).filter(models.Job.id == app.job_id).first()
-        results.append({
-            "id": app.id,
-            "job_id": app.job_id,
-            "job_title": job.title if job else "Unknown",
-            "company": job.company if job else "Unknown",
-            "status": app.status,
-            "applied_at": app.applied_at
-        })
+    if status:
+        query = query.filter(models.Application.status == status)
     
-    return results
+    rows = query.order_by(models.Application.id).offset(skip).limit(limit).all()
+    
+    return fast_json([
+        {
+            "id": row.id,
+            "job_id": row.job_id,
+            "job_title": row.title or "Unknown",
+            "company": row.company or "Unknown",
+            "status": row.status,
+            "applied_at": row.applied_at
+        }
+        for row in rows
+    ])
+
+# ===== JOB TRACKER ENDPOINTS =====
+
+TRACKER_COLUMNS = [
+    models.JobTrackerEntry.id,
+    models.JobTrackerEntry.user_id,
+    models.JobTrackerEntry.company,
+    models.JobTrackerEntry.position,
+    models.JobTrackerEntry.status,
+    models.JobTrackerEntry.dateApplied,
+    models.JobTrackerEntry.notes,
+    models.JobTrackerEntry.created_at,
+    models.JobTrackerEntry.updated_at,
+]
+
+@app.post("/api/job-tracker", response_model=schemas.JobTracker)
+def create_tracker_entry(entry: schemas.JobTrackerCreate, db: Session = Depends(get_db)):
+    """Add a job to the user's tracker board"""
+    if not db.query(models.User.id).filter(models.User.id == entry.userId).first():
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    data = entry.dict()
+    db_entry = models.JobTrackerEntry(user_id=data.pop("userId"), **data)
+    db.add(db_entry)
+    db.commit()
+    db.refresh(db_entry)
+    return db_entry
+
+@app.put("/api/job-tracker/bulk")
+def bulk_update_tracker_entries(update: schemas.JobTrackerBulkUpdate, db: Session = Depends(get_db)):
+    """Apply the same status/notes change to many of a user's tracked jobs"""
+    changes = update.dict(exclude_unset=True, exclude={"userId", "ids"})
+    if not changes or not update.ids:
+        return {"updated": 0}
+    
+    changes["updated_at"] = datetime.utcnow()
+    updated = db.query(models.JobTrackerEntry).filter(
+        models.JobTrackerEntry.user_id == update.userId,
+        models.JobTrackerEntry.id.in_(update.ids)
+    ).update(changes, synchronize_session=False)
+    db.commit()
+    return {"updated": updated}
+
+@app.post("/api/job-tracker/bulk-delete")
+def bulk_delete_tracker_entries(request: schemas.JobTrackerBulkDelete, db: Session = Depends(get_db)):
+    """Delete many of a user's tracked jobs at once"""
+    if not request.ids:
+        return {"deleted": 0}
+    
+    deleted = db.query(models.JobTrackerEntry).filter(
+        models.JobTrackerEntry.user_id == request.userId,
+        models.JobTrackerEntry.id.in_(request.ids)
+    ).delete(synchronize_session=False)
+    db.commit()
+    return {"deleted": deleted}
+
+@app.get(
+    "/api/job-tracker/{user_id}",
+    response_class=ORJSONResponse,
+    responses={200: {"model": List[schemas.JobTracker]}}
+)
+def get_tracker_entries(
+    user_id: int,
+    status: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_read_db)
+):
+    """Get a user's tracked jobs, most recently updated first"""
+    query = db.query(*TRACKER_COLUMNS).filter(models.JobTrackerEntry.user_id == user_id)
+    if status:
+        query = query.filter(models.JobTrackerEntry.status == status)
+    
+    total = query.order_by(None).count()
+    rows = query.order_by(models.JobTrackerEntry.updated_at.desc(), models.JobTrackerEntry.id.desc()) \
+        .offset(skip).limit(limit).all()
+    
+    return fast_json([row._asdict() for row in rows], headers={"X-Total-Count": str(total)})
+
+@app.get("/api/job-tracker/{user_id}/counts")
+def get_tracker_counts(user_id: int, db: Session = Depends(get_read_db)):
+    """Number of tracked jobs per status, answered from the (user_id, status, updated_at) index"""
+    rows = db.query(models.JobTrackerEntry.status, func.count()).filter(
+        models.JobTrackerEntry.user_id == user_id
+    ).group_by(models.JobTrackerEntry.status).all()
+    
+    counts = {status: count for status, count in rows}
+    return {"user_id": user_id, "total": sum(counts.values()), "counts": counts}
+
+@app.put("/api/job-tracker/{entry_id}", response_model=schemas.JobTracker)
+def update_tracker_entry(entry_id: int, update: schemas.JobTrackerUpdate, db: Session = Depends(get_db)):
+    """Update one of the user's tracked jobs"""
+    entry = db.query(models.JobTrackerEntry).filter(
+        models.JobTrackerEntry.id == entry_id,
+        models.JobTrackerEntry.user_id == update.userId
+    ).first()
+    if not entry:
+        raise HTTPException(status_code=404, detail="Tracked job not found")
+    
+    changes = update.dict(exclude_unset=True, exclude={"userId"})
+    for field, value in changes.items():
+        setattr(entry, field, value)
+    db.commit()
+    db.refresh(entry)
+    return entry
+
+@app.delete("/api/job-tracker/{entry_id}")
+def delete_tracker_entry(entry_id: int, user_id: int, db: Session = Depends(get_db)):
+    """Remove one of the user's tracked jobs"""
+    deleted = db.query(models.JobTrackerEntry).filter(
+        models.JobTrackerEntry.id == entry_id,
+        models.JobTrackerEntry.user_id == user_id
+    ).delete(synchronize_session=False)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Tracked job not found")
+    db.commit()
+    return {"deleted": entry_id}
 
 # ===== AI ENDPOINTS =====
 
-@app.post("/api/ai/extract-job-skills/{job_id}")
-def api_extract_job_skills(job_id: int, db: Session = Depends(get_db)):
-    """Extract skills from a job description using AI"""
+def save_job_skills(db: Session, job: models.Job, skills: List[str], *reload):
+    """
+    Store a job's extracted skills and refresh everything derived from them.
+    Objects in `reload` are refreshed after the commit, so an async caller can
+    read them on the event loop without a lazy load.
+    """
+    job.required_skills = skills
+    set_job_skills(db, job.id, skills)
+    refresh_job_matches(db, [job.id])
+    db.commit()
+    match_engine.invalidate()
+    for obj in reload:
+        db.refresh(obj)
+
+def _get_job(db: Session, job_id: int) -> models.Job:
     job = db.query(models.Job).filter(models.Job.id == job_id).first()
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+def _get_user_and_job(db: Session, user_id: int, job_id: int):
+    user = db.query(models.User).filter(models.User.id == user_id).first()
+    job = db.query(models.Job).filter(models.Job.id == job_id).first()
+    if not user or not job:
+        raise HTTPException(status_code=404, detail="User or Job not found")
+    return user, job
+
+# The AI endpoints are async so the LLM call doesn't hold a threadpool slot;
+# their database work still runs in a thread via run_blocking.
+
+@app.post("/api/ai/extract-job-skills/{job_id}")
+async def api_extract_job_skills(
+    job_id: int,
+    mode: Optional[str] = Query(None, pattern="^(llm|local|hybrid)$", description="Override SKILL_EXTRACTION_MODE"),
+    db: Session = Depends(get_db)
+):
+    """Extract skills from a job description using the skill dictionary and/or AI"""
+    job = await run_blocking(_get_job, db, job_id)
     
     if job.required_skills and len(job.required_skills) > 0:
         return {"job_id": job_id, "skills": job.required_skills, "cached": True}
     
-    skills = extract_skills_from_job(job.job_description or "")
-    job.required_skills = skills
-    db.commit()
+    skills = await extract_skills_from_job_async(job.job_description or "", mode=mode)
+    await run_blocking(save_job_skills, db, job, skills)
     
     return {"job_id": job_id, "skills": skills, "cached": False}
 
-@app.post("/api/ai/match-skills", response_model=schemas.SkillMatchResponse)
-def api_match_skills(user_id: int, job_id: int, db: Session = Depends(get_db)):
-    """Calculate skill match between user and job"""
-    user = db.query(models.User).filter(models.User.id == user_id).first()
-    job = db.query(models.Job).filter(models.Job.id == job_id).first()
-    
-    if not user or not job:
-        raise HTTPException(status_code=404, detail="User or Job not found")
+async def _user_and_job_with_skills(db: Session, user_id: int, job_id: int):
+    """Load the user and job, extracting and saving the job's skills first if it has none"""
+    user, job = await run_blocking(_get_user_and_job, db, user_id, job_id)
     
     if not job.required_skills or len(job.required_skills) == 0:
-        job.required_skills = extract_skills_from_job(job.job_description or "")
-        db.commit()
+        skills = await extract_skills_from_job_async(job.job_description or "")
+        await run_blocking(save_job_skills, db, job, skills, job, user)
     
-    match_result = calculate_skill_match(user.skills or [], job.required_skills or [])
+    return user, job
+
+@app.post("/api/ai/match-skills", response_model=schemas.SkillMatchResponse)
+async def api_match_skills(
+    user_id: int,
+    job_id: int,
+    match_mode: Optional[str] = Query(None, pattern="^(exact|semantic)$", description="Override SKILL_MATCH_MODE"),
+    db: Session = Depends(get_db)
+):
+    """Calculate skill match between user and job"""
+    user, job = await _user_and_job_with_skills(db, user_id, job_id)
+    
+    match_result = calculate_skill_match(user.skills or [], job.required_skills or [], match_mode)
     
     return {
         "job_id": job.id,
@@ -193,22 +641,18 @@ def api_match_skills(user_id: int, job_id: int, db: Session = Depends(get_db)):
         **match_result
     }
 
+async def _roadmap_context(db: Session, user_id: int, job_id: int):
+    """Load the user and job for a roadmap, extracting the job's skills if needed"""
+    user, job = await _user_and_job_with_skills(db, user_id, job_id)
+    match_result = calculate_skill_match(user.skills or [], job.required_skills or [])
+    return user, job, match_result
+
 @app.post("/api/ai/generate-roadmap")
-def api_generate_roadmap(user_id: int, job_id: int, db: Session = Depends(get_db)):
+async def api_generate_roadmap(user_id: int, job_id: int, db: Session = Depends(get_db)):
     """Generate a personalized upskilling roadmap"""
-    user = db.query(models.User).filter(models.User.id == user_id).first()
-    job = db.query(models.Job).filter(models.Job.id == job_id).first()
-    
-    if not user or not job:
-        raise HTTPException(status_code=404, detail="User or Job not found")
-    
-    if not job.required_skills or len(job.required_skills) == 0:
-        job.required_skills = extract_skills_from_job(job.job_description or "")
-        db.commit()
+    user, job, match_result = await _roadmap_context(db, user_id, job_id)
     
-    match_result = calculate_skill_match(user.skills or [], job.required_skills or [])
-    
-    roadmap = generate_upskilling_roadmap(
+    roadmap = await generate_upskilling_roadmap_async(
         user.skills or [],
         match_result["missing_skills"],
         job.title
@@ -220,84 +664,206 @@ def api_generate_roadmap(user_id: int, job_id: int, db: Session = Depends(get_db
     
     return roadmap
 
+@app.get("/api/ai/generate-roadmap/stream")
+async def api_stream_roadmap(user_id: int, job_id: int, db: Session = Depends(get_read_db)):
+    """
+    Server-Sent Events variant of generate-roadmap: a `meta` event, one `item`
+    event per roadmap entry as the model finishes it, `projects`, then `done`
+    with the same body the non-streaming endpoint returns.
+    Being a GET it never writes, so a job whose skills haven't been extracted
+    yet gets a 409; POST /api/ai/extract-job-skills/{job_id} first.
+    """
+    user, job = await run_blocking(_get_user_and_job, db, user_id, job_id)
+    
+    if not job.required_skills:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Job skills have not been extracted yet; POST /api/ai/extract-job-skills/{job_id} first"
+        )
+    
+    match_result = calculate_skill_match(user.skills or [], job.required_skills)
+    meta = {
+        "job_title": job.title,
+        "job_company": job.company,
+        "match_percentage": match_result["match_percentage"]
+    }
+    events = stream_upskilling_roadmap_async(list(user.skills or []), match_result["missing_skills"], meta["job_title"])
+    # Wait for the reply to start before sending headers, so an open circuit
+    # breaker is a 503 response rather than a stream that stops after `meta`
+    first = await events.__anext__()
+    
+    async def event_stream():
+        yield sse_event("meta", meta)
+        pending = first
+        while pending is not None:
+            event, data = pending
+            if event == "done":
+                data = {**data, **meta}
+            if event != "start":
+                yield sse_event(event, data)
+            try:
+                pending = await events.__anext__()
+            except StopAsyncIteration:
+                pending = None
+    
+    return sse_response(event_stream())
+
 @app.post("/api/ai/parse-resume")
-def api_parse_resume(resume_text: str, db: Session = Depends(get_db)):
+async def api_parse_resume(
+    resume_text: str,
+    mode: Optional[str] = Query(None, pattern="^(llm|local|hybrid)$", description="Override SKILL_EXTRACTION_MODE")
+):
     """Extract skills from resume text"""
-    skills = extract_skills_from_resume(resume_text)
+    skills = await extract_skills_from_resume_async(resume_text, mode=mode)
     return {"extracted_skills": skills, "count": len(skills)}
 
+async def spool_resume_upload(file: UploadFile, directory: Optional[str] = None) -> str:
+    """Validate the file type and stream the upload to a temp file (413 past the size limit)"""
+    if not is_supported_file(file.filename):
+        raise HTTPException(status_code=400, detail="Unsupported file type. Only .pdf and .txt files are supported.")
+    try:
+        return await save_upload(file, directory=directory)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
 @app.post("/api/upload-resume")
 async def upload_resume(file: UploadFile = File(...), db: Session = Depends(get_db)):
     """Upload and process resume file (PDF or TXT)"""
+    path = await spool_resume_upload(file)
     try:
-        file_content = await file.read()
-        
-        resume_text = extract_text_from_file(file.filename, file_content)
-        
-        if not resume_text or len(resume_text.strip()) < 50:
-            raise HTTPException(status_code=400, detail="Resume appears to be empty or too short")
-        
-        email = extract_email_from_text(resume_text)
-        if not email:
-            email = "user@example.com"
-        
-        name = extract_name_from_filename(file.filename)
-        
-        skills = extract_skills_from_resume(resume_text)
-        
-        existing_user = db.query(models.User).filter(models.User.email == email).first()
-        if existing_user:
-            existing_user.name = name
-            existing_user.skills = skills
-            existing_user.resume_text = resume_text
-            db.commit()
-            db.refresh(existing_user)
-            user = existing_user
-        else:
-            user = models.User(
-                email=email,
-                name=name,
-                skills=skills,
-                resume_text=resume_text
-            )
-            db.add(user)
-            db.commit()
-            db.refresh(user)
-        
-        return {
-            "user": {
-                "id": user.id,
-                "email": user.email,
-                "name": user.name,
-                "skills": user.skills
-            },
-            "extracted_skills": skills,
-            "file_type": file.filename.split('.')[-1].upper()
-        }
-        
-    except HTTPException:
+        return await process_resume(db, file.filename, path)
+    except ResumeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except CircuitOpenError:
         raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error processing file: {str(e)}")
+    finally:
+        os.remove(path)
+
+@app.post("/api/upload-resumes")
+async def upload_resumes(
+    files: List[UploadFile] = File(...),
+    mode: Optional[str] = Query(None, pattern="^(llm|local|hybrid)$", description="Override SKILL_EXTRACTION_MODE"),
+    db: Session = Depends(get_db)
+):
+    """Upload many resumes (PDF, TXT or ZIP archives of them) and create or update their users in one go"""
+    with tempfile.TemporaryDirectory(prefix="resume_upload_") as directory:
+        spooled = []
+        for file in files:
+            try:
+                spooled.append((file.filename, await save_upload(file, directory=directory, max_bytes=BATCH_MAX_UPLOAD_BYTES)))
+            except UploadTooLargeError as e:
+                raise HTTPException(status_code=413, detail=str(e))
+        
+        try:
+            return await ingest_resumes(db, spooled, mode=mode)
+        except BatchTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+
+@app.post("/api/upload-resume/async", status_code=202)
+async def upload_resume_async(file: UploadFile = File(...)):
+    """Queue a resume for background processing and return a task id to poll"""
+    path = await spool_resume_upload(file, directory=resume_queue.upload_dir)
+    try:
+        task_id = resume_queue.submit_file(file.filename, path)
+    except QueueFullError as e:
+        os.remove(path)
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    
+    return {
+        "task_id": task_id,
+        "status": "queued",
+        "status_url": f"/api/tasks/{task_id}",
+        "events_url": f"/api/tasks/{task_id}/events"
+    }
+
+@app.get("/api/tasks/{task_id}")
+def get_task_status(task_id: str):
+    """Current status of a background resume task"""
+    task = resume_queue.get(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
+
+@app.get("/api/tasks/{task_id}/events")
+async def stream_task_events(task_id: str):
+    """Server-Sent Events stream of a background task's progress"""
+    if not resume_queue.get(task_id):
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    async def event_stream():
+        async for snapshot in resume_queue.events(task_id):
+            if snapshot is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield sse_event(snapshot["status"], snapshot)
+    
+    return sse_response(event_stream())
 
 @app.post("/api/ai/bulk-extract-skills")
-def bulk_extract_skills(limit: int = 10, db: Session = Depends(get_db)):
+async def bulk_extract_skills(
+    limit: int = 10,
+    start_after: int = 0,
+    concurrency: int = Query(5, ge=1, le=20),
+    commit_every: int = Query(20, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
     """Extract skills for jobs that don't have them yet"""
-    jobs = db.query(models.Job).filter(
-        (models.Job.required_skills == None) | (models.Job.required_skills == [])
-    ).limit(limit).all()
+    extractor = BulkSkillExtractor(concurrency=concurrency, commit_every=commit_every)
+    try:
+        return await extractor.run(db, limit=limit, start_after=start_after)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@app.get("/api/ai/bulk-extract-skills/status")
+def bulk_extract_status():
+    """Progress of the current or last bulk extraction run"""
+    return bulk_extract.progress
+
+@app.get("/api/ai/cache/stats")
+def llm_cache_stats():
+    """Hit/miss counters and size of the LLM response cache"""
+    return llm_cache.stats()
+
+@app.get("/api/ai/llm/stats")
+def llm_call_stats():
+    """Provider calls: breaker state, coalesced duplicates, queue wait, latency and tokens used"""
+    return llm_guard.stats()
+
+@app.get("/api/ai/skill-extraction/stats")
+def skill_extraction_stats():
+    """Configured extraction mode, per-mode latency and how often hybrid mode needed the LLM"""
+    return skill_extractor.stats()
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Request, database and LLM metrics in the Prometheus text format, for this worker process only"""
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/api/debug/profile")
+async def sample_profile(
+    seconds: float = Query(5, gt=0),
+    interval_ms: float = Query(5, ge=1, le=1000),
+    hot_paths_only: bool = Query(False, description="Only samples inside @hot_path functions"),
+    format: str = Query("top", pattern="^(top|collapsed)$")
+):
+    """Sample every thread's stack for a few seconds (requires PROFILER_ENABLED=1)"""
+    if not PROFILER_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiler is disabled")
     
-    results = []
-    for job in jobs:
-        try:
-            skills = extract_skills_from_job(job.job_description or "")
-            job.required_skills = skills
-            db.commit()
-            results.append({"job_id": job.id, "title": job.title, "skills_count": len(skills)})
-        except Exception as e:
-            results.append({"job_id": job.id, "title": job.title, "error": str(e)})
-    
-    return {"processed": len(results), "jobs": results}
+    with SamplingProfiler(interval_ms / 1000, hot_paths_only) as profiler:
+        await asyncio.sleep(min(seconds, PROFILE_MAX_SECONDS))
+    
+    if format == "collapsed":
+        return Response(profiler.collapsed(), media_type="text/plain")
+    return {"seconds": round(profiler.elapsed, 3), "ticks": profiler.ticks, "top": profiler.top()}
+
+@app.delete("/api/ai/cache")
+def clear_llm_cache():
+    """Drop every cached LLM response"""
+    llm_cache.clear()
+    return {"cleared": True}
 
 @app.get("/")
 def root():
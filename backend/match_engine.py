@@ -0,0 +1,136 @@
+import threading
+import time
+from typing import Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy.orm import Session
+import models
+from profiler import hot_path
+from skill_embeddings import VectorIndex, embedder, resolve_match_mode, MATCH_THRESHOLD
+
+# The index is cached per process and invalidate() only reaches the process that
+# calls it, so with several workers a job edited elsewhere can be scored against
+# its old skills until this age forces a rebuild
+INDEX_MAX_AGE_SECONDS = 300
+
+class SkillMatchIndex:
+    """
+    Sparse job x skill matrix in CSR form (indptr/indices over a lowercase
+    skill vocabulary). Scoring a user is one gather + bincount over all
+    non-zeros, i.e. a single vectorized pass over every job.
+
+    In semantic mode the user's indicator vector marks every vocabulary skill
+    within MATCH_THRESHOLD of one of their skills, found through a VectorIndex
+    over the vocabulary embeddings; the per-job pass is unchanged.
+    """
+
+    def __init__(self, jobs: Iterable[Tuple[int, Sequence[str]]]):
+        self.vocabulary = {}
+        self.job_skills: List[List[str]] = []
+        job_ids = []
+        indices = []
+        indptr = [0]
+
+        for job_id, skills in jobs:
+            skills = [s for s in (skills or []) if isinstance(s, str)]
+            job_ids.append(job_id)
+            self.job_skills.append(skills)
+            for skill in skills:
+                indices.append(self.vocabulary.setdefault(skill.lower(), len(self.vocabulary)))
+            indptr.append(len(indices))
+
+        self.job_ids = np.asarray(job_ids, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.skill_counts = np.diff(self.indptr)
+        # Row number of every non-zero, so per-job sums are a single bincount
+        self.entry_rows = np.repeat(np.arange(len(job_ids)), self.skill_counts)
+        self.row_of_job = {job_id: row for row, job_id in enumerate(job_ids)}
+        self.built_at = time.time()
+        self._vocabulary_index: Optional[VectorIndex] = None
+
+    def __len__(self):
+        return len(self.job_ids)
+
+    @property
+    def vocabulary_index(self) -> VectorIndex:
+        """Embeddings of the vocabulary, built on first semantic query"""
+        if self._vocabulary_index is None:
+            self._vocabulary_index = VectorIndex(list(self.vocabulary), embedder.embed_many(self.vocabulary))
+        return self._vocabulary_index
+
+    def user_vector(self, user_skills: Sequence[str], mode: Optional[str] = None) -> np.ndarray:
+        """Dense boolean indicator of the user's skills (or their neighbours) over the vocabulary"""
+        if resolve_match_mode(mode) == "semantic":
+            user_skills = [skill for skill in user_skills or [] if isinstance(skill, str)]
+            covered = self.vocabulary_index.covered_by(embedder.embed_many(user_skills), MATCH_THRESHOLD)
+            return covered.astype(np.float64)
+
+        vector = np.zeros(len(self.vocabulary), dtype=np.float64)
+        for skill in user_skills or []:
+            col = self.vocabulary.get(skill.lower()) if isinstance(skill, str) else None
+            if col is not None:
+                vector[col] = 1.0
+        return vector
+
+    @hot_path("match_engine.score")
+    def score(
+        self,
+        user_skills: Sequence[str],
+        user_vector: Optional[np.ndarray] = None,
+        mode: Optional[str] = None
+    ) -> np.ndarray:
+        """Match percentage of the user against every job, aligned with `job_ids`"""
+        if user_vector is None:
+            user_vector = self.user_vector(user_skills, mode)
+        matched = np.bincount(self.entry_rows, weights=user_vector[self.indices], minlength=len(self.job_ids))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percentages = np.where(self.skill_counts > 0, matched / self.skill_counts * 100, 0.0)
+        return np.round(percentages, 2)
+
+    @hot_path("match_engine.top_k")
+    def top_k(
+        self,
+        user_skills: Sequence[str],
+        k: int,
+        allowed_job_ids: Optional[Iterable[int]] = None,
+        min_match: float = 0.0,
+        mode: Optional[str] = None,
+    ) -> List[Tuple[int, float]]:
+        """Best `k` (job_id, match_percentage) pairs, highest first"""
+        scores = self.score(user_skills, mode=mode)
+        mask = (self.skill_counts > 0) & (scores >= min_match)
+        if allowed_job_ids is not None:
+            mask &= np.isin(self.job_ids, np.fromiter(allowed_job_ids, dtype=np.int64))
+
+        candidates = np.flatnonzero(mask)
+        if len(candidates) == 0 or k <= 0:
+            return []
+        if len(candidates) > k:
+            # Keep every job tied with the k-th best score so ties are cut by job id below
+            kth_score = -np.partition(-scores[candidates], k - 1)[k - 1]
+            candidates = candidates[scores[candidates] >= kth_score]
+        # Highest score first, ties broken by job id for stable pagination
+        order = np.lexsort((self.job_ids[candidates], -scores[candidates]))[:k]
+        return [(int(self.job_ids[i]), float(scores[i])) for i in candidates[order]]
+
+_index: Optional[SkillMatchIndex] = None
+_dirty = True
+_lock = threading.Lock()
+
+def invalidate():
+    """
+    Mark this process's index stale; call whenever a job's required_skills change.
+    Other worker processes pick the change up within INDEX_MAX_AGE_SECONDS.
+    """
+    global _dirty
+    _dirty = True
+
+def get_index(db: Session) -> SkillMatchIndex:
+    """Return the cached index, rebuilding it from the jobs table when stale"""
+    global _index, _dirty
+    with _lock:
+        if _index is None or _dirty or time.time() - _index.built_at > INDEX_MAX_AGE_SECONDS:
+            rows = db.query(models.Job.id, models.Job.required_skills).order_by(models.Job.id).all()
+            _index = SkillMatchIndex(rows)
+            _dirty = False
+        return _index
@@ -0,0 +1,117 @@
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+from sqlalchemy import delete, insert, text
+from sqlalchemy.orm import Session
+import models
+import match_engine
+from database import SessionLocal
+from match_engine import SkillMatchIndex
+
+# Keeps each multi-row INSERT well under SQLite's bound-parameter limit
+INSERT_BATCH_SIZE = 300
+
+def _jobs_with_skills(db: Session, job_ids: Optional[Iterable[int]] = None):
+    query = db.query(models.Job.id, models.Job.required_skills).filter(
+        text(f"NOT ({models.PENDING_SKILLS_PREDICATE})")
+    )
+    if job_ids is not None:
+        query = query.filter(models.Job.id.in_(list(job_ids)))
+    return query.order_by(models.Job.id)
+
+def _users_with_skills(db: Session, user_ids: Optional[Iterable[int]] = None):
+    query = db.query(models.User.id, models.User.skills).filter(
+        text("users.skills IS NOT NULL AND users.skills NOT IN ('[]', 'null')")
+    )
+    if user_ids is not None:
+        query = query.filter(models.User.id.in_(list(user_ids)))
+    return query.order_by(models.User.id)
+
+def _score_rows(index: SkillMatchIndex, user_id: int, skills) -> List[Dict]:
+    """Rows for every job the user matches at all; same percentages as calculate_skill_match"""
+    scores = index.score(skills or [])
+    return [
+        {"user_id": user_id, "job_id": int(index.job_ids[row]), "match_percentage": float(scores[row])}
+        for row in np.flatnonzero(scores > 0)
+    ]
+
+def _insert(db: Session, rows: List[Dict]):
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        db.execute(insert(models.UserJobMatch), rows[start:start + INSERT_BATCH_SIZE])
+
+def _score_users(db: Session, index: SkillMatchIndex, users) -> int:
+    total = 0
+    rows = []
+    for user_id, skills in users:
+        rows.extend(_score_rows(index, user_id, skills))
+        if len(rows) >= INSERT_BATCH_SIZE * 10:
+            _insert(db, rows)
+            total += len(rows)
+            rows = []
+    _insert(db, rows)
+    return total + len(rows)
+
+def refresh_user_matches(db: Session, user_ids: Iterable[int]) -> int:
+    """
+    Recompute the stored scores of these users against every job (caller commits),
+    using match_engine's cached index so a user write doesn't rebuild it.
+    Call after a user's skills change; returns the number of stored pairs.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return 0
+    # SessionLocal doesn't autoflush; the scores must see pending skill changes
+    db.flush()
+    db.execute(delete(models.UserJobMatch).where(models.UserJobMatch.user_id.in_(user_ids)))
+    users = _users_with_skills(db, user_ids).all()
+    if not users:
+        return 0
+
+    # The shared index is rebuilt when jobs change in this process and at least
+    # every INDEX_MAX_AGE_SECONDS for other processes, whose job writes also
+    # re-score their own pairs through refresh_job_matches
+    return _score_users(db, match_engine.get_index(db), users)
+
+def refresh_job_matches(db: Session, job_ids: Iterable[int]) -> int:
+    """
+    Recompute the stored scores of every user against these jobs (caller commits).
+    Call after jobs' required_skills change or jobs are deleted.
+    """
+    job_ids = list(job_ids)
+    if not job_ids:
+        return 0
+    db.flush()
+    db.execute(delete(models.UserJobMatch).where(models.UserJobMatch.job_id.in_(job_ids)))
+    jobs = _jobs_with_skills(db, job_ids).all()
+    if not jobs:
+        return 0
+
+    # Only the changed jobs' columns of the user x job matrix are scored
+    return _score_users(db, SkillMatchIndex(jobs), _users_with_skills(db).all())
+
+def rebuild_match_scores(db: Session) -> int:
+    """Recompute the whole store"""
+    db.execute(delete(models.UserJobMatch))
+    index = SkillMatchIndex(_jobs_with_skills(db).all())
+    total = _score_users(db, index, _users_with_skills(db).all())
+    db.commit()
+    return total
+
+def sync_match_scores(engine) -> Optional[int]:
+    """Fill the store the first time it is needed (existing databases, fresh installs with data)"""
+    with Session(bind=engine) as db:
+        if db.query(models.UserJobMatch.user_id).first():
+            return None
+        if not (_users_with_skills(db).first() and _jobs_with_skills(db).first()):
+            return None
+        return rebuild_match_scores(db)
+
+if __name__ == "__main__":
+    from migrations import run_migrations
+
+    run_migrations()
+    db = SessionLocal()
+    try:
+        total = rebuild_match_scores(db)
+    finally:
+        db.close()
+    print(f"✅ Stored {total} user/job match scores")
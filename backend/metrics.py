@@ -0,0 +1,323 @@
+"""
+In-process metrics rendered in the Prometheus text exposition format, plus the
+per-request breakdown of where time went (database, LLM, response parsing).
+
+RequestMetricsMiddleware times every request by its route template and opens
+a request context; the SQLAlchemy hooks from instrument_engine and the
+`stage()` timers in ai_service add to it, and the totals come back on the
+response as a Server-Timing header.
+
+Everything here lives in the memory of one process. Under several uvicorn or
+gunicorn workers each scrape of /metrics reaches one of them and sees only its
+share, and counters restart with the worker; scrape each worker on its own
+port (or run a single worker) rather than summing what one endpoint returns.
+"""
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Request latency, including slow LLM-backed routes
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Single SQL statements
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+# Statements per request
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+
+LabelValues = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+class Counter:
+    """Monotonic counter per combination of label values"""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(str(labels[name]) for name in self.labelnames), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+class Histogram:
+    """Cumulative-bucket histogram per combination of label values"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: counts per bucket (last one is +Inf), sum
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def count(self, **labels) -> int:
+        series = self._series.get(tuple(str(labels[name]) for name in self.labelnames))
+        return sum(series[0]) if series else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            series = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._series.items())
+        lines = []
+        for key, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                labels = _format_labels((*self.labelnames, "le"), (*key, _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+class Registry:
+    """
+    Metrics owned by this module plus collectors that read state kept
+    elsewhere (breaker state, queue depth) at scrape time
+    """
+
+    def __init__(self):
+        self._metrics: List = []
+        self._collectors: List[Tuple[str, str, str, Sequence[str], Callable[[], Iterable[Tuple[LabelValues, float]]]]] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(
+        self,
+        name: str,
+        documentation: str,
+        read: Callable[[], Iterable[Tuple[LabelValues, float]]],
+        labelnames: Sequence[str] = (),
+        type: str = "gauge"
+    ):
+        """`read` returns (label values, value) pairs and is called on every scrape"""
+        self._collectors.append((name, documentation, type, tuple(labelnames), read))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        for name, documentation, type, labelnames, read in self._collectors:
+            try:
+                values = list(read())
+            except Exception:
+                # A broken collector must not take the whole scrape down
+                continue
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {type}")
+            lines.extend(f"{name}{_format_labels(labelnames, key)} {_format_value(value)}" for key, value in values)
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests by route template and status code", ("method", "route", "status")
+)
+http_latency = registry.histogram(
+    "http_request_duration_seconds", "Time to the last response byte, by route template", ("method", "route")
+)
+http_db_queries = registry.histogram(
+    "http_request_db_queries", "SQL statements executed per request", ("route",), COUNT_BUCKETS
+)
+http_stage_seconds = registry.counter(
+    "http_request_stage_seconds_total", "Time requests spent in the database, LLM calls and response parsing", ("route", "stage")
+)
+db_query_latency = registry.histogram(
+    "db_query_duration_seconds", "SQL statement execution time by statement type", ("statement",), QUERY_BUCKETS
+)
+llm_latency = registry.histogram(
+    "llm_call_duration_seconds", "LLM provider calls by ai_service function and outcome", ("function", "outcome")
+)
+llm_tokens = registry.counter(
+    "llm_tokens_total", "LLM tokens used by ai_service function", ("function", "kind")
+)
+llm_cache_lookups = registry.counter(
+    "llm_cache_lookups_total", "LLM response cache lookups by ai_service function", ("function", "result")
+)
+llm_parse_latency = registry.histogram(
+    "llm_parse_duration_seconds", "Time to parse LLM replies by ai_service function", ("function",), QUERY_BUCKETS
+)
+
+class RequestMetrics:
+    """Time attributed to each stage of the current request"""
+
+    def __init__(self):
+        self.db_queries = 0
+        self.stages: Dict[str, float] = {}
+
+    def add(self, stage: str, seconds: float):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+_current_request: contextvars.ContextVar[Optional[RequestMetrics]] = contextvars.ContextVar("request_metrics", default=None)
+
+def current_request() -> Optional[RequestMetrics]:
+    return _current_request.get()
+
+@contextmanager
+def stage(name: str, histogram: Optional[Histogram] = None, **labels):
+    """Time a block, attribute it to `name` on the current request and optionally observe it in `histogram`"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        request = _current_request.get()
+        if request is not None:
+            request.add(name, elapsed)
+        if histogram is not None:
+            histogram.observe(elapsed, **labels)
+
+@contextmanager
+def llm_call(function: str):
+    """Time one LLM provider call made on behalf of ai_service `function`"""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    except GeneratorExit:
+        # A streamed reply the client stopped reading
+        outcome = "cancelled"
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        llm_latency.observe(elapsed, function=function, outcome=outcome)
+        request = _current_request.get()
+        if request is not None:
+            request.add("llm", elapsed)
+
+def record_llm_usage(function: str, prompt_tokens: int, completion_tokens: int):
+    llm_tokens.inc(prompt_tokens, function=function, kind="prompt")
+    llm_tokens.inc(completion_tokens, function=function, kind="completion")
+
+def _statement_type(statement: str) -> str:
+    keyword = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else ""
+    return keyword if keyword in ("select", "insert", "update", "delete", "with") else "other"
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    db_query_latency.observe(elapsed, statement=_statement_type(statement))
+    request = _current_request.get()
+    if request is not None:
+        request.db_queries += 1
+        request.add("db", elapsed)
+
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
+
+def instrument_engine(engine):
+    """Time every statement `engine` executes and count it against the current request"""
+    from sqlalchemy import event
+
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+class RequestMetricsMiddleware:
+    """
+    Record latency, status and per-stage time for every HTTP request, labelled
+    by route template ("/api/jobs/{job_id}") so the series stay bounded.
+    Streaming responses are timed until their last chunk is sent.
+    """
+
+    def __init__(self, app, exclude_paths: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.exclude_paths = tuple(exclude_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        request = RequestMetrics()
+        token = _current_request.set(request)
+        started = time.perf_counter()
+        status = 500
+
+        async def timing_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                # Headers go out before a streamed body, so they carry what was spent so far
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", self._server_timing(request, started))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timing_send)
+        finally:
+            _current_request.reset(token)
+            self._record(scope, request, status, time.perf_counter() - started)
+
+    @staticmethod
+    def _server_timing(request: RequestMetrics, started: float) -> bytes:
+        parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in sorted(request.stages.items())]
+        parts.append(f"total;dur={(time.perf_counter() - started) * 1000:.1f}")
+        return ", ".join(parts).encode("latin-1")
+
+    @staticmethod
+    def _record(scope, request: RequestMetrics, status: int, elapsed: float):
+        route = getattr(scope.get("route"), "path", None) or "unmatched"
+        method = scope["method"]
+        http_requests.inc(method=method, route=route, status=status)
+        http_latency.observe(elapsed, method=method, route=route)
+        http_db_queries.observe(request.db_queries, route=route)
+        for name, seconds in request.stages.items():
+            http_stage_seconds.inc(seconds, route=route, stage=name)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
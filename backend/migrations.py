@@ -0,0 +1,95 @@
+import hashlib
+import os
+import tempfile
+from contextlib import contextmanager
+from sqlalchemy import inspect, text
+from database import Base, engine as default_engine
+from search import init_search_index
+from skill_index import sync_skill_links
+from match_store import sync_match_scores
+import models
+
+def add_missing_columns(engine):
+    """ALTER existing tables to add columns that were added to the models later"""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {col["name"] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                added.append(f"{table.name}.{column.name}")
+    return added
+
+def create_missing_indexes(engine):
+    """create_all skips indexes on tables that already exist; add any that are missing"""
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+
+# Indexes dropped from the models: location/employment_type are only filtered with
+# LIKE '%...%' (which no B-tree index serves) and workplace_model not at all
+OBSOLETE_INDEXES = ["ix_jobs_location", "ix_jobs_workplace_model", "ix_jobs_employment_type"]
+
+def drop_obsolete_indexes(engine):
+    """Drop indexes the models no longer define, and partial indexes whose predicate changed"""
+    with engine.begin() as conn:
+        for name in OBSOLETE_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        if engine.dialect.name == "sqlite":
+            pending_sql = conn.execute(text(
+                "SELECT sql FROM sqlite_master WHERE type = 'index' AND name = 'ix_jobs_pending_skills'"
+            )).scalar()
+            if pending_sql and models.PENDING_SKILLS_PREDICATE not in pending_sql:
+                conn.execute(text("DROP INDEX ix_jobs_pending_skills"))
+
+def _lock_path(engine) -> str:
+    database = engine.url.database
+    if engine.dialect.name == "sqlite" and database and database != ":memory:":
+        return os.path.abspath(database) + ".migrate.lock"
+    url_hash = hashlib.sha1(engine.url.render_as_string(hide_password=True).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"jobscope_migrate_{url_hash}.lock")
+
+@contextmanager
+def migration_lock(engine):
+    """
+    Exclusive file lock per database, so worker processes starting together
+    migrate one after another instead of racing on the same DDL (Unix only)
+    """
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+    with open(_lock_path(engine), "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def run_migrations(engine=None):
+    """Bring an existing (or empty) database up to the current schema"""
+    engine = engine or default_engine
+    with migration_lock(engine):
+        Base.metadata.create_all(bind=engine)
+        added = add_missing_columns(engine)
+        drop_obsolete_indexes(engine)
+        create_missing_indexes(engine)
+        init_search_index(engine)
+        sync_skill_links(engine)
+        sync_match_scores(engine)
+    return added
+
+if __name__ == "__main__":
+    added = run_migrations()
+    print(f"✅ Schema up to date ({len(added)} column(s) added)")
+    for name in added:
+        print(f"   + {name}")
@@ -1,7 +1,12 @@
-﻿from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON
+﻿from sqlalchemy import Column, Integer, Float, String, Text, DateTime, ForeignKey, JSON, Index, text
+from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime
 
+# Literal (not bound) so SQLite can prove a query implies the partial index below.
+# The CAST keeps it valid on PostgreSQL, whose json type has no = operator.
+PENDING_SKILLS_PREDICATE = "required_skills IS NULL OR CAST(required_skills AS TEXT) = '[]'"
+
 class Job(Base):
     __tablename__ = "jobs"
     
@@ -17,7 +22,19 @@ class Job(Base):
     job_id = Column(String, unique=True)
     url = Column(String)
     required_skills = Column(JSON)
+    content_hash = Column(String)
+    fingerprint = Column(String, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    
+    applications = relationship("Application", back_populates="job")
+    
+    __table_args__ = (
+        # Jobs still waiting for skill extraction (bulk-extract-skills), walked in id order
+        Index(
+            "ix_jobs_pending_skills", "id",
+            sqlite_where=text(PENDING_SKILLS_PREDICATE), postgresql_where=text(PENDING_SKILLS_PREDICATE)
+        ),
+    )
 
 class User(Base):
     __tablename__ = "users"
@@ -28,6 +45,8 @@ class User(Base):
     skills = Column(JSON)
     resume_text = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
+    
+    applications = relationship("Application", back_populates="user")
 
 class Application(Base):
     __tablename__ = "applications"
@@ -38,4 +57,109 @@ class Application(Base):
     status = Column(String, default="applied")
     applied_at = Column(DateTime, default=datetime.utcnow)
     notes = Column(Text)
+    
+    user = relationship("User", back_populates="applications")
+    job = relationship("Job", back_populates="applications")
+    
+    __table_args__ = (
+        # create_application duplicate check and get_user_applications
+        Index("ix_applications_user_job", "user_id", "job_id"),
+        # Re-pointing applications when duplicate jobs are merged
+        Index("ix_applications_job_id", "job_id"),
+    )
+
+class JobTrackerEntry(Base):
+    """A job the user tracks by hand on the tracker board (not necessarily in the catalogue)"""
+    __tablename__ = "job_tracker"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    company = Column(String, nullable=False)
+    position = Column(String, nullable=False)
+    status = Column(String, nullable=False, default="Applied")
+    dateApplied = Column("date_applied", String)
+    notes = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        # Board columns and per-status counts: WHERE user_id = ? [AND status = ?] ORDER BY updated_at
+        Index("ix_job_tracker_user_status_updated", "user_id", "status", "updated_at"),
+        # Unfiltered board load, newest first
+        Index("ix_job_tracker_user_updated", "user_id", "updated_at"),
+    )
+
+class JobAlias(Base):
+    """Maps the job_id of a merged duplicate posting to its canonical job"""
+    __tablename__ = "job_aliases"
+    
+    alias = Column(String, primary_key=True)
+    job_id = Column(Integer, ForeignKey("jobs.id"), index=True)
+
+class JobFacet(Base):
+    """Materialised per-value job counts for the stats overview"""
+    __tablename__ = "job_facets"
+    
+    facet = Column(String, primary_key=True)
+    value = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
 
+class JobStatsSummary(Base):
+    """Single-row header for job_facets; `version` changes whenever the facets do"""
+    __tablename__ = "job_stats_summary"
+    
+    id = Column(Integer, primary_key=True)
+    total_jobs = Column(Integer, nullable=False, default=0)
+    total_companies = Column(Integer, nullable=False, default=0)
+    version = Column(Integer, nullable=False, default=0)
+    refreshed_at = Column(DateTime, default=datetime.utcnow)
+
+class Skill(Base):
+    """Canonical skill; every spelling that maps to it lives in skill_aliases"""
+    __tablename__ = "skills"
+    
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class SkillAlias(Base):
+    """Normalised spelling (lowercase, single spaces) -> canonical skill, e.g. "js" -> JavaScript"""
+    __tablename__ = "skill_aliases"
+    
+    alias = Column(String, primary_key=True)
+    skill_id = Column(Integer, ForeignKey("skills.id"), nullable=False, index=True)
+
+class JobSkill(Base):
+    """Normalised copy of Job.required_skills; (skill_id, job_id) is the skill -> jobs inverted index"""
+    __tablename__ = "job_skills"
+    
+    job_id = Column(Integer, ForeignKey("jobs.id"), primary_key=True)
+    skill_id = Column(Integer, ForeignKey("skills.id"), primary_key=True)
+    
+    __table_args__ = (
+        Index("ix_job_skills_skill_job", "skill_id", "job_id"),
+    )
+
+class UserSkill(Base):
+    """Normalised copy of User.skills"""
+    __tablename__ = "user_skills"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    skill_id = Column(Integer, ForeignKey("skills.id"), primary_key=True)
+    
+    __table_args__ = (
+        Index("ix_user_skills_skill_user", "skill_id", "user_id"),
+    )
+
+class UserJobMatch(Base):
+    """Precomputed match percentage of a user against a job; pairs scoring 0 are not stored"""
+    __tablename__ = "user_job_match"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    job_id = Column(Integer, ForeignKey("jobs.id"), primary_key=True)
+    match_percentage = Column(Float, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_user_job_match_user_score", "user_id", "match_percentage", "job_id"),
+        Index("ix_user_job_match_job", "job_id"),
+    )
@@ -0,0 +1,128 @@
+"""
+Low-overhead sampling profiler for the running API process. A background
+thread snapshots every thread's stack with sys._current_frames() at a fixed
+interval; nothing is traced in between, so it is safe to run against live
+traffic for a few seconds. Output is in collapsed-stack format
+("a;b;c <samples>") for flamegraph.pl or speedscope.
+
+Synchronous hot paths are marked with @hot_path("name"). A profiler started
+with hot_paths_only=True keeps only samples taken inside a marked call, rooted
+at its name. Marks are per thread, so they are only meaningful on code that
+does not await (an async function would be credited with whatever else the
+event loop ran while it was suspended).
+"""
+import functools
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+# The /api/debug/profile endpoint is off unless explicitly enabled
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "0") == "1"
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", 60))
+DEFAULT_INTERVAL_SECONDS = 0.005
+MAX_STACK_DEPTH = 64
+
+# Thread id -> names of the hot paths it is currently inside, innermost last
+_active_paths: Dict[int, List[str]] = {}
+# Number of running hot-path profilers; while 0, @hot_path costs one comparison
+_hot_path_profilers = 0
+_hooks_lock = threading.Lock()
+
+def hot_path(name: str):
+    """Mark a synchronous function as a hot path for hot_paths_only profiling"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _hot_path_profilers:
+                return func(*args, **kwargs)
+            stack = _active_paths.setdefault(threading.get_ident(), [])
+            stack.append(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stack.pop()
+        return wrapper
+    return decorator
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.splitext(os.path.basename(code.co_filename))[0]}:{code.co_name}"
+
+def _collapse(frame) -> List[str]:
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+class SamplingProfiler:
+    """Sample every thread's stack each `interval` seconds between start() and stop()"""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL_SECONDS, hot_paths_only: bool = False):
+        self.interval = interval
+        self.hot_paths_only = hot_paths_only
+        self.samples: Counter = Counter()
+        self.ticks = 0
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SamplingProfiler":
+        global _hot_path_profilers
+        if self.hot_paths_only:
+            with _hooks_lock:
+                _hot_path_profilers += 1
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        global _hot_path_profilers
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self._started
+        if self.hot_paths_only:
+            with _hooks_lock:
+                _hot_path_profilers -= 1
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.ticks += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                if self.hot_paths_only:
+                    paths = _active_paths.get(thread_id)
+                    if not paths:
+                        continue
+                    self.samples[";".join([f"[{paths[-1]}]", *_collapse(frame)])] += 1
+                else:
+                    self.samples[";".join(_collapse(frame))] += 1
+
+    def collapsed(self) -> str:
+        """Stacks in collapsed format, most sampled first"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common()) + "\n"
+
+    def top(self, limit: int = 20) -> List[Dict]:
+        """Functions by samples spent in the function itself (leaf frames)"""
+        leaves: Counter = Counter()
+        for stack, count in self.samples.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        total = sum(leaves.values()) or 1
+        return [
+            {"function": function, "samples": count, "share": round(count / total, 4)}
+            for function, count in leaves.most_common(limit)
+        ]
@@ -0,0 +1,236 @@
+import asyncio
+import os
+import tempfile
+import time
+import zipfile
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+import models
+from ai_service import extract_skills_from_resume_async
+from file_utils import MAX_UPLOAD_BYTES, UPLOAD_CHUNK_BYTES, UploadTooLargeError, is_supported_file
+from resume_processing import ResumeError, parse_resume, resume_result, upsert_user
+from skill_index import set_user_skills_bulk
+from match_store import refresh_user_matches
+from workers import run_blocking
+
+# Limits for one batch: resumes after unpacking zips, and the whole request body
+BATCH_MAX_FILES = int(os.getenv("RESUME_BATCH_MAX_FILES", 200))
+BATCH_MAX_UPLOAD_BYTES = int(float(os.getenv("RESUME_BATCH_MAX_UPLOAD_MB", 100)) * 1024 * 1024)
+# Parsing is bounded by the process pool; this bounds concurrent Groq calls
+BATCH_LLM_CONCURRENCY = int(os.getenv("RESUME_BATCH_LLM_CONCURRENCY", 5))
+
+class BatchTooLargeError(ValueError):
+    """The batch holds more than BATCH_MAX_FILES resumes (maps to HTTP 413)"""
+
+def _extract_member(archive: zipfile.ZipFile, member: zipfile.ZipInfo, directory: str) -> str:
+    """
+    Copy one zip member to a temp file in chunks. The member name is never used
+    as a path, and inflating past MAX_UPLOAD_BYTES stops whatever the header claims.
+    """
+    fd, path = tempfile.mkstemp(prefix="resume_", dir=directory)
+    written = 0
+    try:
+        with os.fdopen(fd, "wb") as out, archive.open(member) as source:
+            while True:
+                chunk = source.read(UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > MAX_UPLOAD_BYTES:
+                    raise UploadTooLargeError(f"File is larger than {MAX_UPLOAD_BYTES // (1024 * 1024)} MB")
+                out.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+def expand_archives(files: List[Tuple[str, str]], directory: str) -> List[Dict]:
+    """
+    Turn (filename, path) pairs into batch items, unpacking .zip files into
+    `directory`. Each item has a filename and either a path to parse or an error.
+    """
+    items = []
+    resumes = 0
+
+    def add_resume(item: Dict):
+        nonlocal resumes
+        resumes += 1
+        if resumes > BATCH_MAX_FILES:
+            raise BatchTooLargeError(f"A batch can hold at most {BATCH_MAX_FILES} resumes")
+        items.append(item)
+
+    for filename, path in files:
+        if not (filename or "").lower().endswith(".zip"):
+            if not is_supported_file(filename):
+                items.append({"filename": filename, "error": "Unsupported file type. Only .pdf and .txt files are supported."})
+            elif os.path.getsize(path) > MAX_UPLOAD_BYTES:
+                items.append({"filename": filename, "error": f"File is larger than {MAX_UPLOAD_BYTES // (1024 * 1024)} MB"})
+            else:
+                add_resume({"filename": filename, "path": path})
+            continue
+
+        try:
+            with zipfile.ZipFile(path) as archive:
+                for member in archive.infolist():
+                    name = os.path.basename(member.filename)
+                    if member.is_dir() or not name or name.startswith(".") or member.filename.startswith("__MACOSX/"):
+                        continue
+                    entry_name = f"{filename}/{member.filename}"
+                    if not is_supported_file(name):
+                        items.append({"filename": entry_name, "error": "Unsupported file type. Only .pdf and .txt files are supported."})
+                        continue
+                    if resumes >= BATCH_MAX_FILES:
+                        raise BatchTooLargeError(f"A batch can hold at most {BATCH_MAX_FILES} resumes")
+                    try:
+                        path_in_batch = _extract_member(archive, member, directory)
+                    except UploadTooLargeError as e:
+                        items.append({"filename": entry_name, "error": str(e)})
+                        continue
+                    add_resume({"filename": name, "source": entry_name, "path": path_in_batch})
+        except (zipfile.BadZipFile, zipfile.LargeZipFile, NotImplementedError, RuntimeError) as e:
+            # RuntimeError: encrypted members; NotImplementedError: unsupported compression
+            items.append({"filename": filename, "error": f"Could not read zip archive: {e}"})
+    return items
+
+def _save_batch(db: Session, parsed_items: List[Dict]) -> Dict[int, List[str]]:
+    """Create or update every parsed item's user in one transaction (blocking, run it off the event loop)"""
+    emails = {item["parsed"]["email"] for item in parsed_items}
+    users_by_email = {
+        user.email: user
+        for user in db.query(models.User).filter(models.User.email.in_(emails))
+    } if emails else {}
+
+    skills_by_user = {}
+    try:
+        for item in parsed_items:
+            parsed = item["parsed"]
+            user = upsert_user(
+                db, parsed["email"], parsed["name"], parsed["skills"], parsed["resume_text"],
+                existing_user=users_by_email.get(parsed["email"])
+            )
+            users_by_email[user.email] = user
+            skills_by_user[user.id] = parsed["skills"]
+            item["result"] = resume_result(user, item["filename"], parsed["skills"])
+        set_user_skills_bulk(db, skills_by_user)
+        refresh_user_matches(db, skills_by_user)
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    return skills_by_user
+
+async def ingest_resumes(
+    db: Session,
+    files: List[Tuple[str, str]],
+    concurrency: int = BATCH_LLM_CONCURRENCY,
+    mode: Optional[str] = None
+) -> Dict:
+    """
+    Process many resumes given as (filename, path) pairs; .zip files are unpacked.
+
+    Each resume is parsed in the process pool and goes on to skill extraction
+    as soon as it is parsed, with at most `concurrency` extractions in flight.
+    All users are then created or updated in a single transaction; resumes
+    sharing an email update the same user, the later file winning. Returns
+    per-file results in input order plus timing and throughput stats.
+    """
+    started = time.perf_counter()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    timings = {"parse_seconds": 0.0, "skills_seconds": 0.0}
+
+    async def handle(item: Dict) -> Dict:
+        parse_started = time.perf_counter()
+        parsed = await parse_resume(item["filename"], item["path"])
+        timings["parse_seconds"] += time.perf_counter() - parse_started
+
+        async with semaphore:
+            skills_started = time.perf_counter()
+            parsed["skills"] = await extract_skills_from_resume_async(parsed["resume_text"], mode=mode)
+            timings["skills_seconds"] += time.perf_counter() - skills_started
+        return parsed
+
+    with tempfile.TemporaryDirectory(prefix="resume_batch_") as workdir:
+        # Unzipping and stat-ing every file is blocking disk I/O
+        items = await run_blocking(expand_archives, files, workdir)
+        pending = [item for item in items if "path" in item]
+        outcomes = await asyncio.gather(*(handle(item) for item in pending), return_exceptions=True)
+    processing_done = time.perf_counter()
+
+    parsed_items = []
+    for item, outcome in zip(pending, outcomes):
+        if isinstance(outcome, ResumeError):
+            item["error"] = str(outcome)
+        elif isinstance(outcome, Exception):
+            item["error"] = f"Error processing file: {outcome}"
+        elif isinstance(outcome, BaseException):
+            raise outcome
+        else:
+            item["parsed"] = outcome
+            parsed_items.append(item)
+
+    skills_by_user = await run_blocking(_save_batch, db, parsed_items)
+    finished = time.perf_counter()
+
+    results = []
+    for item in items:
+        entry = {"filename": item.get("source", item["filename"])}
+        if "result" in item:
+            entry.update(status="ok", **item["result"])
+        else:
+            entry.update(status="error", error=item["error"])
+        results.append(entry)
+
+    succeeded = len(parsed_items)
+    elapsed = finished - started
+    return {
+        "results": results,
+        "stats": {
+            "files": len(items),
+            "succeeded": succeeded,
+            "failed": len(items) - succeeded,
+            "users_saved": len(skills_by_user),
+            "elapsed_seconds": round(elapsed, 3),
+            "processing_seconds": round(processing_done - started, 3),
+            "save_seconds": round(finished - processing_done, 3),
+            # Summed over files, so they exceed processing_seconds when work overlaps
+            "parse_seconds_total": round(timings["parse_seconds"], 3),
+            "skills_seconds_total": round(timings["skills_seconds"], 3),
+            "resumes_per_second": round(succeeded / elapsed, 2) if elapsed > 0 else None,
+        },
+    }
+
+def _collect_paths(paths: List[str]) -> List[Tuple[str, str]]:
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend((name, os.path.join(root, name)) for name in sorted(names))
+        else:
+            files.append((os.path.basename(path), path))
+    return files
+
+if __name__ == "__main__":
+    import argparse
+    from database import SessionLocal
+    from migrations import run_migrations
+
+    parser = argparse.ArgumentParser(description="Create or update users from many resumes (.pdf, .txt, .zip or directories)")
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--concurrency", type=int, default=BATCH_LLM_CONCURRENCY, help="Concurrent skill extractions")
+    parser.add_argument("--mode", choices=("llm", "local", "hybrid"), default=None, help="Override SKILL_EXTRACTION_MODE")
+    args = parser.parse_args()
+
+    run_migrations()
+    db = SessionLocal()
+    try:
+        summary = asyncio.run(ingest_resumes(db, _collect_paths(args.paths), args.concurrency, args.mode))
+    finally:
+        db.close()
+
+    for result in summary["results"]:
+        if result["status"] == "ok":
+            print(f"✅ {result['filename']}: {result['user']['email']} ({len(result['extracted_skills'])} skills)")
+        else:
+            print(f"❌ {result['filename']}: {result['error']}")
+    stats = summary["stats"]
+    print(f"📊 {stats['succeeded']}/{stats['files']} resumes in {stats['elapsed_seconds']}s ({stats['resumes_per_second']}/s)")
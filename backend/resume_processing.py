@@ -0,0 +1,134 @@
+import asyncio
+import hashlib
+from typing import Callable, Dict, List, Optional, Union
+from sqlalchemy.orm import Session
+import models
+from ai_service import extract_skills_from_resume_async
+from file_utils import (
+    PARSE_TIMEOUT_SECONDS,
+    ExtractionTimeoutError,
+    extract_text_from_file,
+    extract_email_from_text,
+    extract_name_from_filename
+)
+from workers import pool_slot, run_blocking, run_cpu_bound
+from skill_index import set_user_skills
+from match_store import refresh_user_matches
+
+# The parser enforces PARSE_TIMEOUT_SECONDS itself; this only guards against a wedged worker
+PARSE_GUARD_SECONDS = PARSE_TIMEOUT_SECONDS + 5
+
+class ResumeError(ValueError):
+    """The uploaded resume could not be used (maps to HTTP 400)"""
+
+def placeholder_email(resume_text: str) -> str:
+    """
+    Stand-in identity for a resume without an email address: one per distinct
+    resume text, so unrelated resumes never merge into the same user while
+    re-uploading the same file still updates it (.invalid never resolves)
+    """
+    digest = hashlib.sha256(" ".join(resume_text.split()).encode("utf-8")).hexdigest()[:16]
+    return f"resume-{digest}@no-email.invalid"
+
+async def parse_resume(filename: str, source: Union[bytes, str]) -> Dict:
+    """Extract the text, email and name of a resume, parsing it in the process pool"""
+    try:
+        # Wait for a free worker first, so time spent queued behind a large batch doesn't count
+        async with pool_slot():
+            resume_text = await asyncio.wait_for(
+                run_cpu_bound(extract_text_from_file, filename, source), PARSE_GUARD_SECONDS
+            )
+    except asyncio.TimeoutError:
+        raise ResumeError("Resume took too long to parse")
+    except ExtractionTimeoutError as e:
+        raise ResumeError(str(e))
+
+    if not resume_text or len(resume_text.strip()) < 50:
+        raise ResumeError("Resume appears to be empty or too short")
+
+    email = extract_email_from_text(resume_text) or placeholder_email(resume_text)
+
+    return {
+        "resume_text": resume_text,
+        "email": email,
+        "name": extract_name_from_filename(filename)
+    }
+
+def upsert_user(
+    db: Session,
+    email: str,
+    name: str,
+    skills: List[str],
+    resume_text: str,
+    existing_user: Optional[models.User] = None
+) -> models.User:
+    """
+    Create or update the user with this email (caller links skills and commits).
+    Pass `existing_user` when it has already been looked up.
+    """
+    if existing_user is None:
+        existing_user = db.query(models.User).filter(models.User.email == email).first()
+    if existing_user:
+        existing_user.name = name
+        existing_user.skills = skills
+        existing_user.resume_text = resume_text
+        user = existing_user
+    else:
+        user = models.User(
+            email=email,
+            name=name,
+            skills=skills,
+            resume_text=resume_text
+        )
+        db.add(user)
+        db.flush()
+    return user
+
+def resume_result(user: models.User, filename: str, skills: List[str]) -> Dict:
+    return {
+        "user": {
+            "id": user.id,
+            "email": user.email,
+            "name": user.name,
+            "skills": user.skills
+        },
+        "extracted_skills": skills,
+        "file_type": filename.split('.')[-1].upper()
+    }
+
+def save_resume_user(db: Session, parsed: Dict, skills: List[str]) -> models.User:
+    """Create or update the resume's user with its skills and commit (blocking, run it off the event loop)"""
+    try:
+        user = upsert_user(db, parsed["email"], parsed["name"], skills, parsed["resume_text"])
+        set_user_skills(db, user.id, skills)
+        refresh_user_matches(db, [user.id])
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    db.refresh(user)
+    return user
+
+async def process_resume(
+    db: Session,
+    filename: str,
+    source: Union[bytes, str],
+    report: Optional[Callable[[str], None]] = None
+) -> Dict:
+    """
+    Parse a resume (bytes, or the path of a spooled upload), extract its skills
+    and create or update the matching user.
+    `report(stage)` is called as each stage starts, for progress reporting.
+    """
+    report = report or (lambda stage: None)
+
+    report("parsing")
+    parsed = await parse_resume(filename, source)
+
+    report("extracting_skills")
+    skills = await extract_skills_from_resume_async(parsed["resume_text"])
+
+    report("saving")
+    user = await run_blocking(save_resume_user, db, parsed, skills)
+
+    return resume_result(user, filename, skills)
@@ -0,0 +1,101 @@
+import json
+from typing import Dict, List, Optional, Tuple
+
+class RoadmapStreamParser:
+    """
+    Incremental parser for the roadmap JSON while the LLM is still writing it.
+
+    Feed text chunks as they arrive; `feed` returns the events completed by that
+    chunk: ("item", {...}) for each object finished inside the top-level
+    "roadmap" array and ("projects", [...]) once the "projects" array closes.
+    It only tracks nesting, strings and keys, and slices each finished value out
+    of the buffer for json.loads, so every character is scanned once. Text
+    around the object (code fences, chatter) is ignored.
+    """
+
+    ITEMS_KEY = "roadmap"
+    PROJECTS_KEY = "projects"
+
+    def __init__(self):
+        self.text = ""
+        self.items: List[Dict] = []
+        self.projects: Optional[List] = None
+        self._pos = 0
+        # (bracket, key of the value it opens, start offset) for each open container
+        self._stack: List[Tuple[str, Optional[str], int]] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string: Optional[str] = None
+        self._key: Optional[str] = None
+
+    def feed(self, chunk: str) -> List[Tuple[str, object]]:
+        self.text += chunk
+        events = []
+        text = self.text
+        for index in range(self._pos, len(text)):
+            char = text[index]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._last_string = text[self._string_start:index + 1]
+                continue
+
+            if not self._stack and char != "{":
+                continue
+            if char == '"':
+                self._in_string = True
+                self._string_start = index
+            elif char == ":":
+                self._key = self._decode_key(self._last_string)
+            elif char == ",":
+                self._key = None
+            elif char in "{[":
+                key = self._key if self._stack and self._stack[-1][0] == "{" else None
+                self._stack.append((char, key, index))
+                self._key = None
+            elif char in "}]" and self._stack:
+                _, key, start = self._stack.pop()
+                event = self._completed(key, text[start:index + 1])
+                if event:
+                    events.append(event)
+                self._key = None
+        self._pos = len(text)
+        return events
+
+    @staticmethod
+    def _decode_key(raw: Optional[str]) -> Optional[str]:
+        try:
+            return json.loads(raw) if raw else None
+        except ValueError:
+            return None
+
+    def _completed(self, key: Optional[str], raw: str) -> Optional[Tuple[str, object]]:
+        depth = len(self._stack)
+        # An object directly inside the root's "roadmap" array
+        if depth == 2 and raw.startswith("{") and self._stack[1][0] == "[" and self._stack[1][1] == self.ITEMS_KEY:
+            item = self._load(raw)
+            if isinstance(item, dict):
+                self.items.append(item)
+                return "item", item
+        elif depth == 1 and key == self.PROJECTS_KEY and raw.startswith("["):
+            projects = self._load(raw)
+            if isinstance(projects, list):
+                self.projects = projects
+                return "projects", projects
+        return None
+
+    @staticmethod
+    def _load(raw: str):
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return None
+
+    def result(self) -> Dict:
+        """The roadmap seen so far, in the shape of parse_roadmap_response"""
+        return {"roadmap": list(self.items), "projects": list(self.projects or [])}
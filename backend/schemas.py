@@ -1,4 +1,4 @@
-﻿from pydantic import BaseModel
+﻿from pydantic import BaseModel, field_validator
 from typing import List, Optional
 from datetime import datetime
 
@@ -19,6 +19,28 @@ class Job(JobBase):
     class Config:
         from_attributes = True
 
+class JobSummary(BaseModel):
+    id: int
+    title: Optional[str] = None
+    company: Optional[str] = None
+    location: Optional[str] = None
+    employment_type: Optional[str] = None
+    workplace_model: Optional[str] = None
+    salary: Optional[str] = None
+    posted: Optional[str] = None
+    required_skills: Optional[List[str]] = []
+
+class JobDetail(JobSummary):
+    job_description: Optional[str] = None
+    job_id: Optional[str] = None
+    url: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+# Column lists for the hot read endpoints. They select exactly these columns and
+# serialise the rows directly, skipping per-row model validation.
+JOB_SUMMARY_FIELDS = tuple(JobSummary.model_fields)
+JOB_DETAIL_FIELDS = tuple(JobDetail.model_fields)
+
 class UserCreate(BaseModel):
     email: str
     name: str
@@ -44,6 +66,14 @@ class Application(ApplicationCreate):
     class Config:
         from_attributes = True
 
+class ApplicationWithJob(BaseModel):
+    id: int
+    job_id: int
+    job_title: str
+    company: str
+    status: str
+    applied_at: datetime
+
 class SkillMatchResponse(BaseModel):
     job_id: int
     job_title: str
@@ -51,6 +81,19 @@ class SkillMatchResponse(BaseModel):
     matched_skills: List[str]
     missing_skills: List[str]
 
+class JobMatch(SkillMatchResponse):
+    company: Optional[str] = None
+    location: Optional[str] = None
+
+class SkillDemand(BaseModel):
+    skill: str
+    jobs: int
+
+
+def _not_null(value):
+    if value is None:
+        raise ValueError("may be omitted but not null")
+    return value
 
 class JobTrackerCreate(BaseModel):
 
@@ -80,7 +123,13 @@ class JobTrackerUpdate(BaseModel):
 
     notes: Optional[str] = None
 
-    userId: Optional[int] = None
+    userId: int
+
+    # Leave a field out to keep its value; the NOT NULL columns can't be set to null
+    @field_validator("company", "position", "status")
+    @classmethod
+    def required_fields_not_null(cls, value):
+        return _not_null(value)
 
 
 
@@ -111,3 +160,26 @@ class JobTracker(BaseModel):
         from_attributes = True
 
 
+
+class JobTrackerBulkUpdate(BaseModel):
+
+    userId: int
+
+    ids: List[int]
+
+    status: Optional[str] = None
+
+    notes: Optional[str] = None
+
+    @field_validator("status")
+    @classmethod
+    def status_not_null(cls, value):
+        return _not_null(value)
+
+
+
+class JobTrackerBulkDelete(BaseModel):
+
+    userId: int
+
+    ids: List[int]
@@ -0,0 +1,103 @@
+import re
+from typing import Optional
+from sqlalchemy import text, literal_column, table, column
+
+# External-content FTS5 index over the searchable job columns. The triggers
+# keep it in sync with every INSERT/UPDATE/DELETE on the jobs table.
+FTS_TABLE = "jobs_fts"
+
+# bm25 column weights: title, company, location, job_description
+RANK_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+_CREATE_STATEMENTS = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, company, location, job_description,
+        content='jobs', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS jobs_fts_ai AFTER INSERT ON jobs BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, company, location, job_description)
+        VALUES (new.id, new.title, new.company, new.location, new.job_description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS jobs_fts_ad AFTER DELETE ON jobs BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, company, location, job_description)
+        VALUES ('delete', old.id, old.title, old.company, old.location, old.job_description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS jobs_fts_au
+        AFTER UPDATE OF title, company, location, job_description ON jobs BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, company, location, job_description)
+        VALUES ('delete', old.id, old.title, old.company, old.location, old.job_description);
+        INSERT INTO {FTS_TABLE}(rowid, title, company, location, job_description)
+        VALUES (new.id, new.title, new.company, new.location, new.job_description);
+    END""",
+]
+
+jobs_fts = table(FTS_TABLE, column("rowid"), column("rank"))
+
+# None until known: set by init_search_index, or looked up on the first search
+# when migrations ran in another process (MIGRATE_ON_STARTUP=0)
+_fts_enabled: Optional[bool] = None
+
+_EXISTS_SQL = text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name")
+
+def _search_index_exists(session) -> bool:
+    if session.get_bind().dialect.name != "sqlite":
+        return False
+    return session.execute(_EXISTS_SQL, {"name": FTS_TABLE}).first() is not None
+
+def init_search_index(engine) -> bool:
+    """Create the FTS5 index and sync triggers, backfilling existing jobs on first run"""
+    global _fts_enabled
+    if engine.dialect.name != "sqlite":
+        _fts_enabled = False
+        return False
+
+    with engine.begin() as conn:
+        exists = conn.execute(_EXISTS_SQL, {"name": FTS_TABLE}).first()
+        for statement in _CREATE_STATEMENTS:
+            conn.execute(text(statement))
+        if not exists:
+            conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+            weights = ", ".join(str(w) for w in RANK_WEIGHTS)
+            conn.execute(
+                text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('rank', :rank)"),
+                {"rank": f"bm25({weights})"}
+            )
+
+    _fts_enabled = True
+    return True
+
+def build_match_query(search: str) -> Optional[str]:
+    """
+    Turn free-text user input into an FTS5 MATCH expression.
+    Every term must match (implicit AND) and every term is a prefix,
+    so "soft eng" matches "Software Engineer".
+    """
+    terms = re.findall(r"\w+", search or "")
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+def apply_search(query, search: str, job_model):
+    """Restrict a Job query to rows matching `search`, ordered by relevance"""
+    global _fts_enabled
+    if _fts_enabled is None:
+        _fts_enabled = _search_index_exists(query.session)
+    if not _fts_enabled:
+        return query.filter(
+            (job_model.title.contains(search)) |
+            (job_model.company.contains(search)) |
+            (job_model.location.contains(search)) |
+            (job_model.job_description.contains(search))
+        )
+
+    match_query = build_match_query(search)
+    if match_query is None:
+        return query
+
+    return (
+        query.join(jobs_fts, jobs_fts.c.rowid == job_model.id)
+        .filter(literal_column(FTS_TABLE).op("MATCH")(match_query))
+        .order_by(jobs_fts.c.rank)
+    )
@@ -0,0 +1,87 @@
+from typing import Dict, List
+
+# Canonical name -> other spellings that mean the same skill
+CURATED_SKILLS: Dict[str, List[str]] = {
+    "JavaScript": ["JS", "ECMAScript", "ES6"],
+    "TypeScript": ["TS"],
+    "Python": ["Python3", "Python 3"],
+    "Java": ["Java SE", "Java EE", "J2EE"],
+    "C++": ["CPP", "C Plus Plus"],
+    "C#": ["CSharp", "C Sharp"],
+    "Go": ["Golang"],
+    "Rust": [],
+    "Kotlin": [],
+    "Swift": [],
+    "PHP": [],
+    "Ruby": [],
+    "Ruby on Rails": ["Rails", "RoR"],
+    "SQL": ["Structured Query Language"],
+    "PostgreSQL": ["Postgres", "Postgre", "PSQL"],
+    "MySQL": [],
+    "Microsoft SQL Server": ["MSSQL", "SQL Server", "MS SQL"],
+    "MongoDB": ["Mongo"],
+    "Redis": [],
+    "Elasticsearch": ["Elastic Search", "ES"],
+    "React": ["ReactJS", "React.js", "React JS"],
+    "Angular": ["AngularJS", "Angular.js"],
+    "Vue.js": ["Vue", "VueJS"],
+    "Node.js": ["Node", "NodeJS", "Node JS"],
+    "Next.js": ["NextJS"],
+    "Express.js": ["Express", "ExpressJS"],
+    ".NET": ["DotNet", "Dot Net", ".NET Core", "ASP.NET"],
+    "Spring Boot": ["Spring", "SpringBoot"],
+    "Django": [],
+    "Flask": [],
+    "FastAPI": [],
+    "HTML": ["HTML5"],
+    "CSS": ["CSS3"],
+    "Amazon Web Services": ["AWS"],
+    "Microsoft Azure": ["Azure"],
+    "Google Cloud Platform": ["GCP", "Google Cloud"],
+    "Docker": [],
+    "Kubernetes": ["K8s", "K8S", "Kube"],
+    "Terraform": [],
+    "Ansible": [],
+    "CI/CD": ["CICD", "CI CD", "Continuous Integration", "Continuous Delivery"],
+    "Jenkins": [],
+    "Git": ["GitHub", "GitLab"],
+    "Linux": [],
+    "REST APIs": ["REST", "RESTful", "RESTful APIs", "REST API"],
+    "GraphQL": [],
+    "Microservices": ["Microservice", "Micro-services"],
+    "Machine Learning": ["ML"],
+    "Deep Learning": [],
+    "Artificial Intelligence": ["AI"],
+    "Natural Language Processing": ["NLP"],
+    "Computer Vision": [],
+    "TensorFlow": [],
+    "PyTorch": ["Torch"],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "Pandas": [],
+    "NumPy": [],
+    "Apache Spark": ["Spark", "PySpark"],
+    "Apache Kafka": ["Kafka"],
+    "Hadoop": [],
+    "Data Analysis": ["Data Analytics"],
+    "Power BI": ["PowerBI"],
+    "Tableau": [],
+    "Excel": ["Microsoft Excel", "MS Excel"],
+    "Agile": ["Scrum", "Agile Methodologies"],
+    "Project Management": [],
+    "Communication": ["Communication Skills"],
+    "Problem Solving": ["Problem-solving"],
+    "Cybersecurity": ["Cyber Security", "Information Security", "InfoSec"],
+}
+
+def normalise_skill(name) -> str:
+    """Lookup key for a skill spelling: lowercase with single spaces"""
+    if not name:
+        return ""
+    return " ".join(str(name).lower().split())
+
+# Spellings that are also everyday words or short acronyms ("go", "spark",
+# "excel", "es"); the local extractor only accepts them written exactly as here
+CASE_SENSITIVE_ALIASES = {
+    "Go", "Rust", "Swift", "Ruby", "Spring", "Express", "Node", "Spark", "Excel",
+    "Flask", "Torch", "ES", "TS", "AI", "ML", "REST", "Kube", "Mongo",
+}
@@ -0,0 +1,131 @@
+import os
+import re
+import threading
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from skill_dictionary import normalise_skill
+from skill_extractor import extractor
+
+MATCH_MODES = ("exact", "semantic")
+# exact: lowercase string equality; semantic: dictionary aliases plus
+# character n-gram similarity at or above SKILL_MATCH_THRESHOLD
+MATCH_MODE = os.getenv("SKILL_MATCH_MODE", "exact")
+MATCH_THRESHOLD = float(os.getenv("SKILL_MATCH_THRESHOLD", 0.75))
+EMBEDDING_DIM = int(os.getenv("SKILL_EMBEDDING_DIM", 1024))
+EMBEDDING_CACHE_SIZE = int(os.getenv("SKILL_EMBEDDING_CACHE_SIZE", 50_000))
+NGRAM_SIZES = (2, 3, 4)
+# float32 dot products of identical unit vectors can land just under 1.0
+SIMILARITY_EPSILON = 1e-6
+
+if MATCH_MODE not in MATCH_MODES:
+    raise ValueError(f"SKILL_MATCH_MODE must be one of {', '.join(MATCH_MODES)}")
+
+def resolve_match_mode(mode: Optional[str]) -> str:
+    mode = mode or MATCH_MODE
+    if mode not in MATCH_MODES:
+        raise ValueError(f"Unknown skill match mode: {mode}")
+    return mode
+
+# Standalone version numbers ("Python 3.11", "Java 8", "v2") say nothing about the skill itself
+_VERSION = re.compile(r"(?<![\w.])v?\d+(?:\.\d+)*(?![\w.])")
+
+def canonical_key(skill: str) -> str:
+    """
+    Normalised spelling without version numbers, mapped onto its dictionary
+    name when it is a known alias ("ML" -> "machine learning")
+    """
+    key = normalise_skill(skill)
+    key = normalise_skill(_VERSION.sub(" ", key)) or key
+    canonical = extractor.canonical.get(key)
+    return normalise_skill(canonical) if canonical else key
+
+class HashedNgramEmbedder:
+    """
+    CPU-only skill embeddings: character n-grams of the canonical spelling are
+    hashed into `dim` signed buckets and the vector is L2-normalised, so the dot
+    product of two embeddings is their cosine similarity ("postgresql" vs
+    "postgres" ~0.8, "java" vs "javascript" ~0.4). Vectors are cached per
+    distinct canonical spelling.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM, ngram_sizes: Sequence[int] = NGRAM_SIZES, cache_size: int = EMBEDDING_CACHE_SIZE):
+        self.dim = dim
+        self.ngram_sizes = tuple(ngram_sizes)
+        self.cache_size = cache_size
+        self._cache: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def _compute(self, key: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        padded = f" {key} "
+        for n in self.ngram_sizes:
+            for start in range(len(padded) - n + 1):
+                # crc32 rather than hash(): stable across processes and restarts
+                bucket = zlib.crc32(padded[start:start + n].encode("utf-8"))
+                vector[bucket % self.dim] += 1.0 if bucket & 0x10000 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def embed(self, skill: str) -> np.ndarray:
+        key = canonical_key(skill)
+        vector = self._cache.get(key)
+        if vector is None:
+            vector = self._compute(key)
+            with self._lock:
+                if len(self._cache) < self.cache_size:
+                    self._cache[key] = vector
+        return vector
+
+    def embed_many(self, skills: Iterable[str]) -> np.ndarray:
+        vectors = [self.embed(skill) for skill in skills]
+        return np.vstack(vectors) if vectors else np.zeros((0, self.dim), dtype=np.float32)
+
+    def cache_info(self) -> Dict:
+        return {"cached_embeddings": len(self._cache), "max_cached": self.cache_size, "dim": self.dim}
+
+class VectorIndex:
+    """
+    In-memory nearest-neighbour index over unit vectors. Exact search: one
+    matrix product scores every query against every row.
+    """
+
+    def __init__(self, keys: Sequence, vectors: np.ndarray):
+        self.keys = list(keys)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.keys:
+            self.matrix = vectors.reshape(len(self.keys), -1)
+        else:
+            # reshape(0, -1) can't infer a width; keep one so products with queries still line up
+            self.matrix = np.zeros((0, vectors.shape[-1] if vectors.ndim == 2 else EMBEDDING_DIM), dtype=np.float32)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def search(self, queries: np.ndarray, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """Row indices and cosine similarities of the `k` nearest rows for each query, best first"""
+        k = min(k, len(self.keys))
+        if k == 0 or len(queries) == 0:
+            return np.zeros((len(queries), 0), dtype=np.int64), np.zeros((len(queries), 0), dtype=np.float32)
+        similarities = queries @ self.matrix.T
+        nearest = np.argsort(-similarities, axis=1)[:, :k]
+        return nearest, np.take_along_axis(similarities, nearest, axis=1)
+
+    def covered_by(self, queries: np.ndarray, threshold: float) -> np.ndarray:
+        """Boolean mask of rows within `threshold` similarity of at least one query"""
+        if len(queries) == 0 or len(self.keys) == 0:
+            return np.zeros(len(self.keys), dtype=bool)
+        return (self.matrix @ queries.T).max(axis=1) >= threshold - SIMILARITY_EPSILON
+
+embedder = HashedNgramEmbedder()
+
+def semantic_matches(job_skills: Sequence[str], user_skills: Sequence[str], threshold: float = MATCH_THRESHOLD) -> List[bool]:
+    """For each job skill, whether its nearest user skill is at least `threshold` similar"""
+    if not job_skills:
+        return []
+    user_skills = [skill for skill in user_skills or [] if isinstance(skill, str)]
+    index = VectorIndex(user_skills, embedder.embed_many(user_skills))
+    _, similarities = index.search(embedder.embed_many(job_skills), k=1)
+    if similarities.shape[1] == 0:
+        return [False] * len(job_skills)
+    return [bool(similarity >= threshold - SIMILARITY_EPSILON) for similarity in similarities[:, 0]]
@@ -0,0 +1,264 @@
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from profiler import hot_path
+from skill_dictionary import CASE_SENSITIVE_ALIASES, CURATED_SKILLS, normalise_skill
+
+EXTRACTION_MODES = ("llm", "local", "hybrid")
+# llm (default, as before the dictionary existed): every document goes to Groq;
+# local: dictionary only; hybrid: dictionary first, Groq only when it finds
+# fewer than HYBRID_MIN_SKILLS skills
+EXTRACTION_MODE = os.getenv("SKILL_EXTRACTION_MODE", "llm")
+HYBRID_MIN_SKILLS = int(os.getenv("SKILL_HYBRID_MIN_SKILLS", 3))
+
+if EXTRACTION_MODE not in EXTRACTION_MODES:
+    raise ValueError(f"SKILL_EXTRACTION_MODE must be one of {', '.join(EXTRACTION_MODES)}")
+
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+_WHITESPACE = re.compile(r"\s+")
+
+class AhoCorasick:
+    """Multi-pattern string matcher: one pass over the text finds every pattern occurrence"""
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+        for pattern in patterns:
+            self._insert(pattern)
+        self._build_failure_links()
+
+    def _insert(self, pattern: str):
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(pattern)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def iter_matches(self, text: str):
+        """Yield (start, end, pattern) for every occurrence, overlapping ones included"""
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern in output[state]:
+                yield index + 1 - len(pattern), index + 1, pattern
+
+class SkillExtractor:
+    """
+    Finds dictionary skills in free text in a single Aho–Corasick pass.
+
+    Matches must sit on word boundaries ("Java" does not match inside
+    "JavaScript"), overlapping matches keep the longest ("SQL Server" over
+    "SQL"), and CASE_SENSITIVE_ALIASES only count when written exactly as in
+    the dictionary, so "go" or "excel" in prose are ignored.
+    """
+
+    def __init__(self, skills: Dict[str, List[str]], case_sensitive: Iterable[str] = ()):
+        self.canonical: Dict[str, str] = {}
+        self.exact_spellings: Dict[str, set] = {}
+        case_sensitive = set(case_sensitive)
+        for name, aliases in skills.items():
+            for spelling in [name, *aliases]:
+                key = normalise_skill(spelling)
+                self.canonical.setdefault(key, name)
+                if spelling in case_sensitive:
+                    self.exact_spellings.setdefault(key, set()).add(spelling)
+        self._matcher = AhoCorasick(self.canonical)
+
+    @staticmethod
+    def _is_boundary(text: str, index: int) -> bool:
+        return index < 0 or index >= len(text) or not text[index].isalnum()
+
+    @hot_path("skill_extractor.extract")
+    def extract(self, text: str) -> List[str]:
+        """Canonical names of the dictionary skills in `text`, in order of first mention"""
+        if not text:
+            return []
+        # Both strings keep the same length so match offsets index into either
+        original = _WHITESPACE.sub(" ", text)
+        lowered = original.translate(_ASCII_LOWER)
+
+        candidates: List[Tuple[int, int, str]] = []
+        for start, end, key in self._matcher.iter_matches(lowered):
+            if not (self._is_boundary(lowered, start - 1) and self._is_boundary(lowered, end)):
+                continue
+            exact = self.exact_spellings.get(key)
+            if exact and original[start:end] not in exact:
+                continue
+            candidates.append((start, end, key))
+
+        skills = []
+        seen = set()
+        covered_until = -1
+        for start, end, key in sorted(candidates, key=lambda match: (match[0], match[0] - match[1])):
+            if start < covered_until:
+                continue
+            covered_until = end
+            name = self.canonical[key]
+            if name not in seen:
+                seen.add(name)
+                skills.append(name)
+        return skills
+
+    def canonicalise(self, skills: Iterable[str]) -> List[str]:
+        """Map known spellings onto their canonical names and drop duplicates"""
+        result = []
+        seen = set()
+        for skill in skills:
+            if not isinstance(skill, str) or not skill.strip():
+                continue
+            key = normalise_skill(skill)
+            name = self.canonical.get(key, skill.strip())
+            if normalise_skill(name) not in seen:
+                seen.add(normalise_skill(name))
+                result.append(name)
+        return result
+
+class LatencyStats:
+    """Call count and latency percentiles over the most recent `window` calls"""
+
+    def __init__(self, window: int = 1000):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._samples = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self._samples.append(seconds)
+
+    def snapshot(self) -> Dict:
+        samples = sorted(self._samples)
+
+        def percentile(p):
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))] * 1000, 3) if samples else None
+
+        return {
+            "calls": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 3) if self.count else None,
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+extractor = SkillExtractor(CURATED_SKILLS, CASE_SENSITIVE_ALIASES)
+
+_stats_lock = threading.Lock()
+latency = {mode: LatencyStats() for mode in EXTRACTION_MODES}
+counters = {"hybrid_local_only": 0, "hybrid_llm_fallback": 0, "hybrid_llm_errors": 0}
+
+def _record(mode: str, started: float, outcome: Optional[str] = None):
+    with _stats_lock:
+        latency[mode].record(time.perf_counter() - started)
+        if outcome:
+            counters[outcome] += 1
+
+def _resolve_mode(mode: Optional[str]) -> str:
+    mode = mode or EXTRACTION_MODE
+    if mode not in EXTRACTION_MODES:
+        raise ValueError(f"Unknown skill extraction mode: {mode}")
+    return mode
+
+def _merge(local_skills: List[str], llm_skills: List[str]) -> List[str]:
+    return extractor.canonicalise([*llm_skills, *local_skills])
+
+def extract_skills(
+    text: str,
+    llm_extract: Callable[[str], List[str]],
+    mode: Optional[str] = None,
+    fallback_on_error: bool = True
+) -> List[str]:
+    """
+    Extract skills from `text` according to `mode` (default SKILL_EXTRACTION_MODE).
+    `llm_extract(text)` is only called in llm mode or for low-confidence hybrid
+    results. In hybrid mode an LLM error falls back to the dictionary matches
+    unless `fallback_on_error` is False.
+    """
+    mode = _resolve_mode(mode)
+    started = time.perf_counter()
+    if mode == "llm":
+        try:
+            return llm_extract(text)
+        finally:
+            _record(mode, started)
+
+    local_skills = extractor.extract(text)
+    if mode == "local" or len(local_skills) >= HYBRID_MIN_SKILLS:
+        _record(mode, started, "hybrid_local_only" if mode == "hybrid" else None)
+        return local_skills
+
+    try:
+        llm_skills = llm_extract(text)
+    except Exception:
+        _record(mode, started, "hybrid_llm_errors")
+        if not fallback_on_error:
+            raise
+        return local_skills
+    _record(mode, started, "hybrid_llm_fallback")
+    return _merge(local_skills, llm_skills)
+
+async def extract_skills_async(
+    text: str,
+    llm_extract: Callable[[str], Awaitable[List[str]]],
+    mode: Optional[str] = None,
+    fallback_on_error: bool = True
+) -> List[str]:
+    """Async counterpart of extract_skills; the dictionary pass itself takes milliseconds"""
+    mode = _resolve_mode(mode)
+    started = time.perf_counter()
+    if mode == "llm":
+        try:
+            return await llm_extract(text)
+        finally:
+            _record(mode, started)
+
+    local_skills = extractor.extract(text)
+    if mode == "local" or len(local_skills) >= HYBRID_MIN_SKILLS:
+        _record(mode, started, "hybrid_local_only" if mode == "hybrid" else None)
+        return local_skills
+
+    try:
+        llm_skills = await llm_extract(text)
+    except Exception:
+        _record(mode, started, "hybrid_llm_errors")
+        if not fallback_on_error:
+            raise
+        return local_skills
+    _record(mode, started, "hybrid_llm_fallback")
+    return _merge(local_skills, llm_skills)
+
+def stats() -> Dict:
+    with _stats_lock:
+        return {
+            "mode": EXTRACTION_MODE,
+            "hybrid_min_skills": HYBRID_MIN_SKILLS,
+            "dictionary_spellings": len(extractor.canonical),
+            "latency": {mode: latency[mode].snapshot() for mode in EXTRACTION_MODES},
+            **counters,
+        }
@@ -0,0 +1,190 @@
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+import models
+from database import SessionLocal
+from skill_dictionary import CURATED_SKILLS, normalise_skill
+
+def _insert_ignoring_conflicts(db: Session, model, rows: List[Dict], key: str):
+    """Insert rows, skipping any whose `key` another writer has already inserted"""
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        stmt = sqlite_insert(model).on_conflict_do_nothing(index_elements=[key])
+    elif dialect == "postgresql":
+        stmt = postgresql_insert(model).on_conflict_do_nothing(index_elements=[key])
+    else:
+        stmt = insert(model).prefix_with("IGNORE")  # MySQL / MariaDB
+    db.execute(stmt, rows)
+
+def _alias_ids(db: Session, keys: Iterable[str]) -> Dict[str, int]:
+    return dict(
+        db.query(models.SkillAlias.alias, models.SkillAlias.skill_id)
+        .filter(models.SkillAlias.alias.in_(list(keys)))
+    )
+
+def _create_skills(db: Session, display: Dict[str, str]) -> Dict[str, int]:
+    """
+    Create a skill (named by `display`) and alias for each normalised spelling.
+    Concurrent writers may create the same ones: conflicts are skipped and the
+    ids re-read, so every caller ends up with whichever row won.
+    """
+    names = set(display.values())
+    _insert_ignoring_conflicts(db, models.Skill, [{"name": name} for name in names], "name")
+    skill_ids = dict(db.query(models.Skill.name, models.Skill.id).filter(models.Skill.name.in_(names)))
+    _insert_ignoring_conflicts(db, models.SkillAlias, [
+        {"alias": key, "skill_id": skill_ids[name]} for key, name in display.items()
+    ], "alias")
+    return _alias_ids(db, display)
+
+def seed_curated_skills(db: Session) -> int:
+    """Insert any curated skills and aliases that are missing; returns skills added"""
+    known = dict(db.query(models.SkillAlias.alias, models.SkillAlias.skill_id))
+    existing_ids = set(known.values())
+
+    missing = {
+        normalise_skill(name): name for name in CURATED_SKILLS if normalise_skill(name) not in known
+    }
+    known.update(_create_skills(db, missing))
+
+    _insert_ignoring_conflicts(db, models.SkillAlias, [
+        {"alias": normalise_skill(alias), "skill_id": known[normalise_skill(name)]}
+        for name, aliases in CURATED_SKILLS.items()
+        for alias in aliases
+        if normalise_skill(alias) not in known
+    ], "alias")
+    db.commit()
+    return len({known[key] for key in missing} - existing_ids)
+
+def resolve_skills(db: Session, names: Iterable[str], create: bool = True) -> Dict[str, int]:
+    """
+    Map skill spellings to canonical skill ids, keyed by normalised spelling.
+    Unknown spellings become new skills when `create` is set, otherwise they
+    are left out of the result.
+    """
+    display = {}
+    for name in names:
+        key = normalise_skill(name)
+        if key and key not in display:
+            display[key] = " ".join(str(name).split())
+    if not display:
+        return {}
+
+    resolved = _alias_ids(db, display)
+    missing = {key: name for key, name in display.items() if key not in resolved}
+    if missing and create:
+        resolved.update(_create_skills(db, missing))
+    return resolved
+
+def _replace_links(db: Session, link_model, owner_column: str, skills_by_owner: Dict[int, Iterable[str]]):
+    skills_by_owner = {owner: list(names or []) for owner, names in skills_by_owner.items()}
+    if not skills_by_owner:
+        return
+    resolved = resolve_skills(db, (name for names in skills_by_owner.values() for name in names))
+
+    owner = getattr(link_model, owner_column)
+    db.execute(delete(link_model).where(owner.in_(skills_by_owner)))
+    rows = []
+    for owner_id, names in skills_by_owner.items():
+        skill_ids = {resolved[key] for key in map(normalise_skill, names) if key in resolved}
+        rows.extend({owner_column: owner_id, "skill_id": skill_id} for skill_id in skill_ids)
+    if rows:
+        db.execute(insert(link_model), rows)
+
+def set_job_skills(db: Session, job_id: int, names: Iterable[str]):
+    """Mirror a job's required_skills into job_skills (caller commits)"""
+    _replace_links(db, models.JobSkill, "job_id", {job_id: names})
+
+def set_job_skills_bulk(db: Session, skills_by_job: Dict[int, Iterable[str]]):
+    """set_job_skills for many jobs in one pass"""
+    _replace_links(db, models.JobSkill, "job_id", skills_by_job)
+
+def set_user_skills(db: Session, user_id: int, names: Iterable[str]):
+    """Mirror a user's skills into user_skills (caller commits)"""
+    _replace_links(db, models.UserSkill, "user_id", {user_id: names})
+
+def set_user_skills_bulk(db: Session, skills_by_user: Dict[int, Iterable[str]]):
+    """set_user_skills for many users in one pass"""
+    _replace_links(db, models.UserSkill, "user_id", skills_by_user)
+
+def rebuild_skill_links(db: Session, batch_size: int = 1000) -> Dict[str, int]:
+    """Repopulate job_skills and user_skills from the JSON columns"""
+    seed_curated_skills(db)
+    counts = {}
+    for model, column, link_model, owner_column in (
+        (models.Job, models.Job.required_skills, models.JobSkill, "job_id"),
+        (models.User, models.User.skills, models.UserSkill, "user_id"),
+    ):
+        db.execute(delete(link_model))
+        batch = {}
+        total = 0
+        for owner_id, names in db.query(model.id, column).order_by(model.id).all():
+            if not names:
+                continue
+            batch[owner_id] = names
+            if len(batch) >= batch_size:
+                _replace_links(db, link_model, owner_column, batch)
+                total += len(batch)
+                batch = {}
+        _replace_links(db, link_model, owner_column, batch)
+        total += len(batch)
+        counts[link_model.__tablename__] = total
+    db.commit()
+    return counts
+
+def _any_with_skills(db: Session, model, column_name: str) -> bool:
+    predicate = text(f"{column_name} IS NOT NULL AND {column_name} NOT IN ('[]', 'null')")
+    return db.query(model.id).filter(predicate).first() is not None
+
+def sync_skill_links(engine) -> Optional[Dict[str, int]]:
+    """Seed the dictionary and backfill the link tables the first time they are needed"""
+    with Session(bind=engine) as db:
+        seed_curated_skills(db)
+        if db.query(models.JobSkill.job_id).first() or db.query(models.UserSkill.user_id).first():
+            return None
+        if not (_any_with_skills(db, models.Job, "required_skills") or _any_with_skills(db, models.User, "skills")):
+            return None
+        return rebuild_skill_links(db)
+
+def job_ids_with_skills(db: Session, names: Iterable[str], match_all: bool = True):
+    """
+    Subquery of ids of jobs requiring the given skills (all of them, or any),
+    read from the (skill_id, job_id) index. None when no job can match.
+    """
+    keys = {normalise_skill(name) for name in names} - {""}
+    resolved = resolve_skills(db, keys, create=False)
+    if not resolved or (match_all and len(resolved) < len(keys)):
+        return None
+
+    # Aliases of the same skill collapse to one id
+    skill_ids = set(resolved.values())
+    stmt = select(models.JobSkill.job_id).where(models.JobSkill.skill_id.in_(skill_ids))
+    if match_all and len(skill_ids) > 1:
+        return stmt.group_by(models.JobSkill.job_id).having(func.count() == len(skill_ids))
+    return stmt.distinct()
+
+def skill_demand(db: Session, job_ids=None, limit: int = 50) -> List[Dict]:
+    """Number of jobs requiring each skill, most in-demand first"""
+    counts = select(models.JobSkill.skill_id, func.count().label("jobs")).group_by(models.JobSkill.skill_id)
+    if job_ids is not None:
+        counts = counts.where(models.JobSkill.job_id.in_(job_ids))
+    counts = counts.subquery()
+
+    rows = db.query(models.Skill.name, counts.c.jobs) \
+        .join(counts, counts.c.skill_id == models.Skill.id) \
+        .order_by(counts.c.jobs.desc(), models.Skill.name).limit(limit)
+    return [{"skill": name, "jobs": jobs} for name, jobs in rows]
+
+if __name__ == "__main__":
+    from migrations import run_migrations
+
+    run_migrations()
+    db = SessionLocal()
+    try:
+        counts = rebuild_skill_links(db)
+    finally:
+        db.close()
+    print(f"✅ Indexed skills for {counts['job_skills']} jobs and {counts['user_skills']} users")
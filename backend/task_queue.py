@@ -0,0 +1,183 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from collections import OrderedDict
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional
+
+class QueueFullError(Exception):
+    """Raised when the queue is at capacity; callers should retry later"""
+
+class TaskQueue:
+    """
+    In-process background queue with a fixed pool of worker coroutines.
+
+    Uploads are spooled to `upload_dir` so the request that submitted them can
+    return immediately; the handler receives the spooled file's path. The queue
+    is bounded: `submit_file` raises QueueFullError once `max_depth` tasks are
+    waiting, which the API turns into a 503. Task state lives in memory and the
+    oldest finished tasks are forgotten past `max_finished`.
+
+    Because state is per process, the API must run as a single worker process
+    (or route each client's polls to the process that took the upload);
+    otherwise a status request can land on a worker that never saw the task.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[str, str, Callable[[str], None]], Awaitable[Dict]],
+        workers: int = 2,
+        max_depth: int = 50,
+        max_finished: int = 1000,
+        upload_dir: Optional[str] = None,
+    ):
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.max_depth = max_depth
+        self.max_finished = max_finished
+        self._upload_dir = upload_dir
+        self.tasks: "OrderedDict[str, Dict]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._changed: Optional[asyncio.Condition] = None
+        self._workers = []
+
+    @property
+    def upload_dir(self) -> str:
+        """Spool directory, a fresh temp dir unless one was given (created on first use, not at import)"""
+        if self._upload_dir is None:
+            self._upload_dir = tempfile.mkdtemp(prefix="resume_uploads_")
+        return self._upload_dir
+
+    async def start(self):
+        if self._upload_dir is not None:
+            os.makedirs(self._upload_dir, exist_ok=True)
+        self._queue = asyncio.Queue(maxsize=self.max_depth)
+        self._changed = asyncio.Condition()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def submit_file(self, filename: str, path: str) -> str:
+        """Enqueue an already spooled upload; the queue takes ownership of (and deletes) `path`"""
+        self._check_capacity()
+        task_id = uuid.uuid4().hex
+        spooled = os.path.join(self.upload_dir, task_id)
+        shutil.move(path, spooled)
+        path = spooled
+
+        self.tasks[task_id] = {
+            "task_id": task_id,
+            "filename": filename,
+            "status": "queued",
+            "stage": None,
+            "result": None,
+            "error": None,
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "version": 0,
+        }
+        self._queue.put_nowait((task_id, filename, path))
+        return task_id
+
+    def _check_capacity(self):
+        if self._queue is None:
+            raise RuntimeError("Task queue has not been started")
+        if self._queue.full():
+            raise QueueFullError(f"Queue is full ({self.max_depth} tasks waiting)")
+
+    def get(self, task_id: str) -> Optional[Dict]:
+        task = self.tasks.get(task_id)
+        if task is None:
+            return None
+        snapshot = {k: v for k, v in task.items() if k != "version"}
+        if task["status"] == "queued":
+            snapshot["queue_position"] = self._position(task_id)
+        return snapshot
+
+    def _position(self, task_id: str) -> int:
+        position = 0
+        for tid, task in self.tasks.items():
+            if task["status"] == "queued":
+                position += 1
+            if tid == task_id:
+                break
+        return position
+
+    async def _update(self, task_id: str, **changes):
+        task = self.tasks[task_id]
+        task.update(changes)
+        task["version"] += 1
+        await self._notify()
+
+    def _forget_old_tasks(self):
+        finished = [tid for tid, t in self.tasks.items() if t["status"] in ("done", "failed")]
+        for tid in finished[:max(0, len(finished) - self.max_finished)]:
+            del self.tasks[tid]
+
+    async def _worker(self):
+        while True:
+            task_id, filename, path = await self._queue.get()
+            try:
+                await self._update(task_id, status="running", started_at=time.time())
+
+                def report(stage: str):
+                    self.tasks[task_id]["stage"] = stage
+                    self.tasks[task_id]["version"] += 1
+                    asyncio.get_running_loop().create_task(self._notify())
+
+                result = await self.handler(filename, path, report)
+                await self._update(task_id, status="done", stage=None, result=result, finished_at=time.time())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await self._update(task_id, status="failed", error=str(e), finished_at=time.time())
+            finally:
+                if os.path.exists(path):
+                    os.remove(path)
+                self._queue.task_done()
+                self._forget_old_tasks()
+
+    async def _notify(self):
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def events(self, task_id: str, heartbeat: float = 15.0) -> AsyncIterator[Optional[Dict]]:
+        """
+        Yield a snapshot every time the task changes, until it finishes.
+        Yields None after `heartbeat` seconds without changes so streams can send keep-alives.
+        """
+        last_version = -1
+
+        def changed():
+            task = self.tasks.get(task_id)
+            return task is None or task["version"] != last_version
+
+        while True:
+            task = self.tasks.get(task_id)
+            if task is None:
+                return
+            if task["version"] != last_version:
+                last_version = task["version"]
+                yield self.get(task_id)
+                if task["status"] in ("done", "failed"):
+                    return
+                continue
+            timed_out = False
+            async with self._changed:
+                try:
+                    await asyncio.wait_for(self._changed.wait_for(changed), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    timed_out = True
+            if timed_out:
+                yield None
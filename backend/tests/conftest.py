@@ -0,0 +1,77 @@
+import os
+import sys
+import tempfile
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# database.py resolves ./jobs.db against the working directory when it is imported
+WORKDIR = tempfile.mkdtemp(prefix="jobscope_tests_")
+os.chdir(WORKDIR)
+os.environ.pop("DATABASE_URL", None)
+os.environ.pop("READ_DATABASE_URL", None)
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ["LLM_CACHE_PATH"] = os.path.join(WORKDIR, "llm_cache.db")
+# Every extraction goes through the (fake) LLM unless a test picks a mode
+os.environ["SKILL_EXTRACTION_MODE"] = "llm"
+
+# Skill vocabulary is shared reference data, everything else is emptied between tests
+KEEP_TABLES = {"skills", "skill_aliases"}
+
+@pytest.fixture(scope="session")
+def migrated():
+    from migrations import run_migrations
+    run_migrations()
+
+@pytest.fixture
+def db(migrated):
+    from database import Base, SessionLocal, engine
+    from llm_cache import cache
+    import match_engine
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        with engine.begin() as conn:
+            for table in reversed(Base.metadata.sorted_tables):
+                if table.name not in KEEP_TABLES:
+                    conn.execute(table.delete())
+        cache.clear()
+        match_engine.invalidate()
+
+@pytest.fixture
+def make_jobs(db):
+    """Insert jobs without skills and return their ids in order"""
+    import models
+
+    def make(count: int, **fields):
+        jobs = [
+            models.Job(title=f"Job {i}", company="Acme", location="Singapore", job_description=f"description {i}", **fields)
+            for i in range(count)
+        ]
+        db.add_all(jobs)
+        db.commit()
+        return [job.id for job in jobs]
+
+    return make
+
+@pytest.fixture
+def llm(monkeypatch):
+    """Answer ai_service's async LLM calls with a fake client; tests set its responder"""
+    import ai_service
+    from fake_llm import FakeAsyncLLMClient
+
+    fake = FakeAsyncLLMClient()
+    monkeypatch.setattr(ai_service, "async_client", fake)
+    return fake
+
+@pytest.fixture
+def client(db, llm):
+    from fastapi.testclient import TestClient
+    import main
+
+    with TestClient(main.app) as client:
+        yield client
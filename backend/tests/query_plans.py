@@ -0,0 +1,220 @@
+"""
+EXPLAIN QUERY PLAN regression check for the API's SQL.
+
+Builds a throwaway SQLite database from all_jobs.csv, calls every endpoint
+that touches the database (plus the bulk extraction and stats refresh jobs),
+captures each SELECT/UPDATE/DELETE they issue and runs EXPLAIN QUERY PLAN on
+it. Any bare `SCAN <table>` (a full table scan with no index) that is not in
+ALLOWED_SCANS fails the run. tests/test_query_plans.py runs it under pytest;
+run it directly to print every plan:
+
+    python tests/query_plans.py [--csv all_jobs.csv] [--verbose]
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+DEFAULT_CSV_PATH = os.path.join(BACKEND_DIR, "all_jobs.csv")
+
+# (check, table) -> why a full scan is expected there
+ALLOWED_SCANS = {
+    ("list jobs", "jobs"): "first page walks the rowid in order and stops at LIMIT",
+    ("list jobs (contains filters)", "jobs"): "location/company/employment_type filters are LIKE '%...%' substring matches",
+    ("top matches (filtered)", "jobs"): "the location filter is a LIKE '%...%' substring match",
+    ("refresh stats", "jobs"): "facet counts group every job once per import, never per request",
+    ("top matches", "jobs"): "match index loads every job's skills once and caches them",
+    ("import csv", "jobs"): "near-duplicate index is built from every job once per import",
+    ("create user", "jobs"): "a new user is scored against every job with skills",
+    ("bulk extract skills", "users"): "changed jobs are scored against every user with skills",
+    ("list jobs (by match)", "jobs"): "every job is ranked by the user's score, unmatched ones last",
+}
+
+SCAN_RE = re.compile(r"^SCAN (\w+)")
+SUBQUERY_RE = re.compile(r"^(?:MATERIALIZE|CO-ROUTINE) (\w+)")
+
+def full_scans(plan):
+    """Tables the plan reads in full without an index (scans of subquery results don't count)"""
+    subqueries = {match.group(1) for match in map(SUBQUERY_RE.match, plan) if match}
+    tables = []
+    for detail in plan:
+        match = SCAN_RE.match(detail)
+        if not match or match.group(1) in subqueries:
+            continue
+        if "USING INDEX" in detail or "USING COVERING INDEX" in detail or "VIRTUAL TABLE" in detail:
+            continue
+        tables.append(match.group(1))
+    return tables
+
+class StatementRecorder:
+    """Collects the statements executed on an engine, tagged with the current check name"""
+
+    def __init__(self):
+        self.check = None
+        self.statements = defaultdict(list)
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if self.check is None or executemany:
+            return
+        verb = statement.lstrip().split(None, 1)[0].upper()
+        if verb in ("SELECT", "UPDATE", "DELETE", "WITH"):
+            self.statements[self.check].append((statement, parameters))
+
+def run_checks(client, recorder, db_factory, csv_path):
+    import bulk_extract
+    from fake_llm import FakeAsyncLLMClient
+    from job_stats import refresh_job_stats
+
+    def check(name, method, path, **kwargs):
+        recorder.check = name
+        response = client.request(method, path, **kwargs)
+        recorder.check = None
+        if response.status_code >= 400:
+            raise SystemExit(f"❌ {name}: {method} {path} returned {response.status_code} {response.text[:200]}")
+        return response
+
+    with open(csv_path, "rb") as f:
+        check("import csv", "POST", "/api/jobs/import", files={"file": ("jobs.csv", f, "text/csv")})
+
+    user = check("create user", "POST", "/api/users", json={
+        "name": "Plan Check", "email": "plans@example.com", "skills": ["Python", "SQL", "AWS"]
+    }).json()
+    user_id = user["id"]
+    jobs = check("list jobs", "GET", "/api/jobs", params={"limit": 20, "fields": "summary"})
+    job_ids = [job["id"] for job in jobs.json()]
+    cursor = jobs.headers.get("X-Next-Cursor")
+
+    check("list jobs (cursor)", "GET", "/api/jobs", params={"limit": 20, "cursor": cursor})
+    check("list jobs (search)", "GET", "/api/jobs", params={"search": "python developer", "limit": 20})
+    check("list jobs (contains filters)", "GET", "/api/jobs",
+          params={"location": "Singapore", "employment_type": "Full", "company": "a", "limit": 20})
+    check("get job", "GET", f"/api/jobs/{job_ids[0]}")
+    check("stats overview", "GET", "/api/jobs/stats/overview")
+    check("get user", "GET", f"/api/users/{user_id}")
+    check("top matches", "GET", f"/api/users/{user_id}/top-matches", params={"k": 5})
+    check("top matches (filtered)", "GET", f"/api/users/{user_id}/top-matches", params={"k": 5, "location": "Singapore"})
+    check("top matches (search)", "GET", f"/api/users/{user_id}/top-matches", params={"k": 5, "search": "engineer"})
+
+    for job_id in job_ids[:5]:
+        check("create application", "POST", "/api/applications", json={"user_id": user_id, "job_id": job_id})
+    check("create application", "POST", "/api/applications", json={"user_id": user_id, "job_id": job_ids[0]})
+    check("user applications", "GET", f"/api/applications/user/{user_id}")
+    check("user applications (status)", "GET", f"/api/applications/user/{user_id}", params={"status": "applied"})
+
+    entry_ids = []
+    for i in range(5):
+        entry = check("create tracker entry", "POST", "/api/job-tracker", json={
+            "userId": user_id, "company": f"Company {i}", "position": "Engineer",
+            "status": "Applied", "dateApplied": "2026-01-15"
+        }).json()
+        entry_ids.append(entry["id"])
+    check("tracker entries", "GET", f"/api/job-tracker/{user_id}")
+    check("tracker entries (status)", "GET", f"/api/job-tracker/{user_id}", params={"status": "Applied"})
+    check("tracker counts", "GET", f"/api/job-tracker/{user_id}/counts")
+    check("update tracker entry", "PUT", f"/api/job-tracker/{entry_ids[0]}", json={"userId": user_id, "status": "Interview"})
+    check("bulk update tracker", "PUT", "/api/job-tracker/bulk",
+          json={"userId": user_id, "ids": entry_ids[1:3], "status": "Offer"})
+    check("bulk delete tracker", "POST", "/api/job-tracker/bulk-delete", json={"userId": user_id, "ids": entry_ids[3:]})
+    check("delete tracker entry", "DELETE", f"/api/job-tracker/{entry_ids[0]}", params={"user_id": user_id})
+
+    # Background jobs that run outside a request
+    db = db_factory()
+    try:
+        recorder.check = "bulk extract skills"
+        llm_client = FakeAsyncLLMClient(responder=lambda prompt: json.dumps(["Python", "Docker", "K8s"]))
+        extractor = bulk_extract.BulkSkillExtractor(llm_client=llm_client, commit_every=5)
+        asyncio.run(extractor.run(db, limit=10))
+        recorder.check = "refresh stats"
+        refresh_job_stats(db)
+    finally:
+        recorder.check = None
+        db.close()
+
+    check("jobs by skills", "GET", "/api/skills/jobs", params={"skills": ["Kubernetes", "python"]})
+    check("jobs by skills (any)", "GET", "/api/skills/jobs", params={"skills": ["Docker", "JS"], "match": "any"})
+    check("skill demand", "GET", "/api/skills/demand")
+    check("skill demand (filtered)", "GET", "/api/skills/demand", params={"search": "engineer"})
+    check("list jobs (by match)", "GET", "/api/jobs",
+          params={"user_id": user_id, "sort": "match", "limit": 20, "fields": "summary"})
+    check("jobs by skills (by match)", "GET", "/api/skills/jobs",
+          params={"skills": ["Docker"], "user_id": user_id, "sort": "match"})
+
+def explain(db_path, statements, verbose=False):
+    """Return [(check, table, statement, plan)] for every unexpected full scan"""
+    conn = sqlite3.connect(db_path)
+    regressions = []
+    seen = set()
+    try:
+        for check, captured in statements.items():
+            for statement, parameters in captured:
+                if (check, statement) in seen:
+                    continue
+                seen.add((check, statement))
+                plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ())]
+                if verbose:
+                    print(f"\n[{check}] {' '.join(statement.split())}")
+                    for detail in plan:
+                        print(f"    {detail}")
+                for table in full_scans(plan):
+                    if (check, table) not in ALLOWED_SCANS:
+                        regressions.append((check, table, statement, plan))
+    finally:
+        conn.close()
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--csv", default=DEFAULT_CSV_PATH)
+    parser.add_argument("--verbose", action="store_true", help="Print every statement and its plan")
+    args = parser.parse_args()
+    csv_path = os.path.abspath(args.csv)
+
+    workdir = tempfile.mkdtemp(prefix="query_plans_")
+    os.chdir(workdir)  # database.py resolves ./jobs.db relative to the working directory
+    os.environ.pop("DATABASE_URL", None)
+    os.environ.pop("READ_DATABASE_URL", None)
+    os.environ.setdefault("GROQ_API_KEY", "query-plan-check")
+    os.environ.setdefault("LLM_CACHE_PATH", os.path.join(workdir, "llm_cache.db"))
+    # Migrate before recording so only the checked requests are captured
+    os.environ["MIGRATE_ON_STARTUP"] = "0"
+
+    from sqlalchemy import event
+    from fastapi.testclient import TestClient
+    import main as app_module
+    from database import SessionLocal, engine, read_engine
+    from migrations import run_migrations
+
+    run_migrations(engine)
+
+    recorder = StatementRecorder()
+    for bound in {engine, read_engine}:
+        event.listen(bound, "before_cursor_execute", recorder)
+
+    with TestClient(app_module.app) as client:
+        run_checks(client, recorder, SessionLocal, csv_path)
+
+    total = sum(len(captured) for captured in recorder.statements.values())
+    regressions = explain(os.path.join(workdir, "jobs.db"), recorder.statements, verbose=args.verbose)
+
+    print(f"🔍 Checked {total} statements from {len(recorder.statements)} checks")
+    if not regressions:
+        print("✅ No unexpected full table scans")
+        return 0
+
+    for check, table, statement, plan in regressions:
+        print(f"\n❌ [{check}] full scan of {table}")
+        print(f"    {' '.join(statement.split())}")
+        for detail in plan:
+            print(f"      {detail}")
+    print(f"\n❌ {len(regressions)} unexpected full table scan(s)")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
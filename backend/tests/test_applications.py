@@ -0,0 +1,63 @@
+import pytest
+from sqlalchemy import event
+import models
+from database import read_engine
+
+@pytest.fixture
+def applicant(db):
+    user = models.User(email="ada@example.com", name="Ada", skills=["Python"])
+    other = models.User(email="bob@example.com", name="Bob", skills=[])
+    jobs = [models.Job(title=f"Role {i}", company=f"Company {i}", location="Singapore") for i in range(6)]
+    db.add_all([user, other, *jobs])
+    db.flush()
+    db.add_all(
+        [models.Application(user_id=user.id, job_id=job.id, status="interview" if i % 2 else "applied")
+         for i, job in enumerate(jobs)]
+        + [models.Application(user_id=other.id, job_id=jobs[0].id)]
+    )
+    db.commit()
+    return user.id, [job.id for job in jobs]
+
+@pytest.fixture
+def select_count():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(read_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(read_engine, "before_cursor_execute", record)
+
+def test_applications_and_their_jobs_come_from_one_query(client, applicant, select_count):
+    user_id, job_ids = applicant
+
+    applications = client.get(f"/api/applications/user/{user_id}").json()
+
+    assert len(select_count) == 1
+    assert [(a["job_id"], a["job_title"], a["company"]) for a in applications] == [
+        (job_id, f"Role {i}", f"Company {i}") for i, job_id in enumerate(job_ids)
+    ]
+    assert set(applications[0]) == {"id", "job_id", "job_title", "company", "status", "applied_at"}
+
+def test_status_filter_and_pagination(client, applicant):
+    user_id, job_ids = applicant
+    url = f"/api/applications/user/{user_id}"
+
+    interviews = client.get(url, params={"status": "interview"}).json()
+    page = client.get(url, params={"skip": 2, "limit": 2}).json()
+
+    assert [a["job_id"] for a in interviews] == job_ids[1::2]
+    assert {a["status"] for a in interviews} == {"interview"}
+    assert [a["job_id"] for a in page] == job_ids[2:4]
+    assert client.get(url, params={"limit": 0}).status_code == 422
+
+def test_application_for_a_deleted_job_is_still_listed(client, db, applicant):
+    user_id, job_ids = applicant
+    db.query(models.Job).filter(models.Job.id == job_ids[0]).delete()
+    db.commit()
+
+    first = client.get(f"/api/applications/user/{user_id}", params={"limit": 1}).json()[0]
+
+    assert (first["job_id"], first["job_title"], first["company"]) == (job_ids[0], "Unknown", "Unknown")
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import pytest
+from sqlalchemy import event
+import models
+from database import engine
+from llm_cache import cache
+
+ROADMAP = {"roadmap": [{"skill": "Docker", "priority": "High", "estimated_time": "2 weeks", "resources": ["Docs"]}], "projects": ["API"]}
+
+@pytest.fixture
+def statements_on_loop():
+    """SQL statements (app database and LLM cache) executed on a thread that is running an event loop"""
+    on_loop = []
+
+    def record_statement(statement):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        on_loop.append(statement)
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        record_statement(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    with cache._lock:
+        cache._connection().set_trace_callback(record_statement)
+    yield on_loop
+    cache._connection().set_trace_callback(None)
+    event.remove(engine, "before_cursor_execute", record)
+
+@pytest.fixture
+def user_and_job(db):
+    user = models.User(email="ada@example.com", name="Ada", skills=["Python"])
+    job = models.Job(title="Backend Engineer", company="Acme", location="Singapore", job_description="Python and Docker")
+    db.add_all([user, job])
+    db.commit()
+    return user.id, job.id
+
+def test_match_skills_extracts_and_saves_off_the_event_loop(client, llm, user_and_job, statements_on_loop):
+    llm.responder = lambda prompt: json.dumps(["Python", "Docker"])
+    user_id, job_id = user_and_job
+
+    response = client.post("/api/ai/match-skills", params={"user_id": user_id, "job_id": job_id})
+
+    assert response.status_code == 200
+    assert response.json()["match_percentage"] == 50
+    assert statements_on_loop == []
+
+def test_extract_job_skills_off_the_event_loop(client, llm, user_and_job, statements_on_loop):
+    llm.responder = lambda prompt: json.dumps(["Docker"])
+    _, job_id = user_and_job
+
+    first = client.post(f"/api/ai/extract-job-skills/{job_id}").json()
+    second = client.post(f"/api/ai/extract-job-skills/{job_id}").json()
+
+    assert first == {"job_id": job_id, "skills": ["Docker"], "cached": False}
+    assert second["cached"] is True
+    assert client.post("/api/ai/extract-job-skills/999999").status_code == 404
+    assert statements_on_loop == []
+
+def test_generate_roadmap_off_the_event_loop(client, llm, user_and_job, statements_on_loop):
+    llm.responder = lambda prompt: json.dumps(ROADMAP) if "learning roadmap" in prompt else json.dumps(["Python", "Docker"])
+    user_id, job_id = user_and_job
+
+    response = client.post("/api/ai/generate-roadmap", params={"user_id": user_id, "job_id": job_id})
+    cached = client.post("/api/ai/generate-roadmap", params={"user_id": user_id, "job_id": job_id})
+
+    assert response.json()["roadmap"] == cached.json()["roadmap"] == ROADMAP["roadmap"]
+    assert llm.calls == 2  # skill extraction and the roadmap, each once
+    assert statements_on_loop == []
+
+def test_roadmap_stream_off_the_event_loop(client, llm, db, user_and_job, statements_on_loop):
+    llm.responder = lambda prompt: json.dumps(ROADMAP)
+    user_id, job_id = user_and_job
+    db.get(models.Job, job_id).required_skills = ["Python", "Docker"]
+    db.commit()
+    params = {"user_id": user_id, "job_id": job_id}
+
+    fresh = client.get("/api/ai/generate-roadmap/stream", params=params)
+    replayed = client.get("/api/ai/generate-roadmap/stream", params=params)
+
+    assert fresh.text == replayed.text and "event: done" in fresh.text
+    assert llm.calls == 1
+    assert statements_on_loop == []
+
+def test_upload_resume_off_the_event_loop(client, llm, statements_on_loop):
+    llm.responder = lambda prompt: json.dumps(["Python", "SQL"])
+    text = b"Grace Hopper\ngrace@example.com\nCompiler engineer with Python and SQL experience for many years."
+
+    response = client.post("/api/upload-resume", files={"file": ("grace.txt", text, "text/plain")})
+
+    assert response.status_code == 200
+    assert response.json()["user"]["email"] == "grace@example.com"
+    assert response.json()["user"]["skills"] == ["Python", "SQL"]
+    assert statements_on_loop == []
+
+def test_batch_upload_off_the_event_loop(client, llm, statements_on_loop):
+    llm.responder = lambda prompt: json.dumps(["Python"])
+    files = [
+        ("files", (f"user{i}.txt", f"Candidate {i}\nuser{i}@example.com\nBackend developer writing Python services daily.".encode(), "text/plain"))
+        for i in range(3)
+    ]
+
+    response = client.post("/api/upload-resumes", files=files)
+
+    assert response.json()["stats"]["users_saved"] == 3
+    assert statements_on_loop == []
+
+def test_bulk_extract_off_the_event_loop(client, llm, make_jobs, statements_on_loop):
+    llm.responder = lambda prompt: json.dumps(["Go"])
+    make_jobs(3)
+
+    response = client.post("/api/ai/bulk-extract-skills", params={"limit": 10, "commit_every": 2})
+
+    assert response.json()["processed"] == 3 and response.json()["failed"] == 0
+    assert statements_on_loop == []
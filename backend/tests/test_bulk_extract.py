@@ -0,0 +1,142 @@
+import asyncio
+import json
+import pytest
+import bulk_extract
+import models
+from bulk_extract import BulkSkillExtractor
+from fake_llm import FakeAsyncLLMClient, FakeRateLimitError
+from llm_guard import CircuitOpenError
+
+class FakeServerError(Exception):
+    status_code = 500
+
+class FakeBadRequest(Exception):
+    status_code = 400
+
+def skills_for(prompt: str):
+    # The prompt embeds the job description, "description <n>"
+    number = prompt.split("description ")[-1].split()[0]
+    return json.dumps([f"Skill {number}"])
+
+def failing_on(descriptions, error=FakeBadRequest):
+    """Responder raising `error` for the given job descriptions"""
+    def respond(prompt):
+        if any(f"description {d}\n" in prompt for d in descriptions):
+            raise error("provider rejected the request")
+        return skills_for(prompt)
+    return respond
+
+def run(extractor, db, **kwargs):
+    return asyncio.run(extractor.run(db, **kwargs))
+
+def stored_skills(db, job_ids):
+    db.expire_all()
+    return {job.id: job.required_skills for job in db.query(models.Job).filter(models.Job.id.in_(job_ids))}
+
+def test_extracts_and_commits_every_job(db, make_jobs):
+    job_ids = make_jobs(5)
+    fake = FakeAsyncLLMClient(skills_for)
+
+    summary = run(BulkSkillExtractor(llm_client=fake, commit_every=2), db)
+
+    assert summary["processed"] == 5 and summary["failed"] == 0
+    assert summary["last_committed_id"] == job_ids[-1]
+    assert stored_skills(db, job_ids) == {job_id: [f"Skill {i}"] for i, job_id in enumerate(job_ids)}
+    assert fake.calls == 5
+
+def test_retries_rate_limits_with_backoff(db, make_jobs):
+    job_ids = make_jobs(3)
+    fake = FakeAsyncLLMClient(skills_for, fail_first=4)
+
+    summary = run(BulkSkillExtractor(llm_client=fake, concurrency=1, base_delay=0.001, max_delay=0.01), db)
+
+    assert summary["failed"] == 0
+    assert fake.calls == 3 + 4
+    assert all(stored_skills(db, job_ids).values())
+
+def test_gives_up_after_max_retries(db, make_jobs):
+    job_ids = make_jobs(1)
+    fake = FakeAsyncLLMClient(failing_on([0], FakeServerError))
+
+    summary = run(BulkSkillExtractor(llm_client=fake, max_retries=2, base_delay=0.001), db)
+
+    assert summary["failed_ids"] == job_ids
+    assert fake.calls == 3
+    assert stored_skills(db, job_ids) == {job_ids[0]: None}
+
+def test_non_retryable_errors_fail_without_retrying(db, make_jobs):
+    make_jobs(1)
+    fake = FakeAsyncLLMClient(failing_on([0]))
+
+    summary = run(BulkSkillExtractor(llm_client=fake, base_delay=0.001), db)
+
+    assert summary["failed"] == 1 and fake.calls == 1
+
+def test_checkpoint_stops_before_first_failed_job(db, make_jobs):
+    job_ids = make_jobs(6)
+    # Job 3 fails in the second group of two; later groups still succeed
+    fake = FakeAsyncLLMClient(failing_on([3]))
+
+    summary = run(BulkSkillExtractor(llm_client=fake, commit_every=2), db)
+
+    assert summary["failed_ids"] == [job_ids[3]]
+    assert summary["last_committed_id"] == job_ids[2]
+    assert bulk_extract.progress["last_committed_id"] == job_ids[2]
+    skills = stored_skills(db, job_ids)
+    assert skills[job_ids[3]] is None
+    assert all(skills[job_id] for job_id in job_ids if job_id != job_ids[3])
+
+def test_resume_from_checkpoint_retries_only_failed_jobs(db, make_jobs):
+    job_ids = make_jobs(6)
+    first = run(BulkSkillExtractor(llm_client=FakeAsyncLLMClient(failing_on([1, 4])), commit_every=2), db)
+    assert first["last_committed_id"] == job_ids[0]
+
+    fake = FakeAsyncLLMClient(skills_for)
+    second = run(BulkSkillExtractor(llm_client=fake, commit_every=2), db, start_after=first["last_committed_id"])
+
+    assert [job["job_id"] for job in second["jobs"]] == [job_ids[1], job_ids[4]]
+    assert second["failed"] == 0 and second["last_committed_id"] == job_ids[4]
+    assert all(stored_skills(db, job_ids).values())
+
+def test_interrupted_run_keeps_committed_groups(db, make_jobs):
+    job_ids = make_jobs(4)
+
+    def respond(prompt):
+        if "description 2\n" in prompt:
+            raise KeyboardInterrupt
+        return skills_for(prompt)
+
+    with pytest.raises(KeyboardInterrupt):
+        run(BulkSkillExtractor(llm_client=FakeAsyncLLMClient(respond), commit_every=2, concurrency=1), db)
+
+    assert bulk_extract.progress["status"] == "interrupted"
+    assert bulk_extract.progress["last_committed_id"] == job_ids[1]
+    skills = stored_skills(db, job_ids)
+    assert skills[job_ids[0]] and skills[job_ids[1]]
+    assert skills[job_ids[2]] is None and skills[job_ids[3]] is None
+
+def test_open_breaker_is_not_retried(db, make_jobs, monkeypatch):
+    make_jobs(2)
+    fake = FakeAsyncLLMClient(lambda prompt: (_ for _ in ()).throw(CircuitOpenError("LLM provider unavailable", 30)))
+    slept = []
+
+    async def no_sleep(seconds):
+        slept.append(seconds)
+
+    monkeypatch.setattr(bulk_extract.asyncio, "sleep", no_sleep)
+
+    summary = run(BulkSkillExtractor(llm_client=fake, max_retries=3), db)
+
+    assert summary["failed"] == 2
+    assert fake.calls == 2 and slept == []
+
+@pytest.mark.parametrize("error, retryable", [
+    (CircuitOpenError("open"), False),
+    (FakeServerError(), True),
+    (FakeBadRequest(), False),
+    (FakeRateLimitError(), True),
+    (asyncio.TimeoutError(), True),
+    (ConnectionResetError(), True),
+])
+def test_what_is_retried(error, retryable):
+    assert bulk_extract.is_retryable(error) is retryable
@@ -0,0 +1,10 @@
+import database
+
+def test_busy_timeout_comes_from_one_setting(tmp_path):
+    engine = database.make_engine(f"sqlite:///{tmp_path / 'busy.db'}")
+    with engine.connect() as conn:
+        busy_timeout = conn.exec_driver_sql("PRAGMA busy_timeout").scalar()
+    engine.dispose()
+
+    assert busy_timeout == database.SQLITE_BUSY_TIMEOUT_MS
+    assert "busy_timeout" not in database.SQLITE_PRAGMAS
@@ -0,0 +1,33 @@
+import zlib
+import numpy as np
+import dedup
+from dedup import NearDuplicateIndex, minhash, shingles
+
+def exact_minhash(shingle_set):
+    """Reference signature computed with Python ints, which cannot overflow"""
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in shingle_set]
+    prime = int(dedup._PRIME)
+    return [min((int(a) * h + int(b)) % prime for h in hashes) for a, b in zip(dedup._A, dedup._B)]
+
+def test_minhash_matches_exact_arithmetic():
+    shingle_set = shingles("Senior Data Engineer", "Acme", "Singapore",
+                           "Build batch and streaming pipelines with Python, Spark and Airflow on AWS")
+
+    assert minhash(shingle_set).tolist() == exact_minhash(shingle_set)
+
+def test_products_stay_below_uint64_range():
+    worst = int(dedup._A.max()) * (2**32 - 1) + int(dedup._B.max())
+    assert worst < 2**64
+    assert dedup._A.dtype == np.uint64
+
+def test_near_duplicate_postings_are_found():
+    description = "Design and maintain REST APIs in Python and FastAPI, deploy with Docker on Kubernetes"
+    index = NearDuplicateIndex()
+    index.add("a", minhash(shingles("Backend Engineer", "Acme", "Singapore", description)), "Backend Engineer")
+
+    repost = minhash(shingles("Backend Engineer", "Acme", "Singapore", description + " today"))
+    other = minhash(shingles("Nurse", "General Hospital", "Singapore",
+                             "Provide patient care on the surgical ward and assist doctors during rounds"))
+
+    assert index.find(repost, "Backend Engineer") == "a"
+    assert index.find(other, "Nurse") is None
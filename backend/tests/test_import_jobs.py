@@ -0,0 +1,43 @@
+import io
+import pandas as pd
+import models
+from import_jobs import import_jobs_from_csv, normalise_chunk
+
+def test_placeholders_only_count_as_missing_for_the_job_id():
+    chunk = pd.DataFrame({
+        "Title": ["Data Analyst", "Backend Engineer"],
+        "Company": ["Acme", "Globex"],
+        "Salary": ["Not Applicable", "NOT FOUND"],
+        "Workplace_Model": ["", "Remote"],
+        "Job_Id": ["NOT FOUND", " 42 "],
+    }, dtype=str)
+
+    frame = normalise_chunk(chunk)
+
+    assert frame["salary"].tolist() == ["Not Applicable", "NOT FOUND"]
+    assert frame["workplace_model"].tolist() == ["", "Remote"]
+    assert frame["job_id"].iloc[0].startswith("generated_")
+    assert frame["job_id"].iloc[1] == "42"
+
+def test_job_id_falls_back_to_the_next_source():
+    chunk = pd.DataFrame({"Title": ["QA"], "Job_Id": ["Not Applicable"], "Jobid": ["7"]}, dtype=str)
+
+    assert normalise_chunk(chunk)["job_id"].tolist() == ["7"]
+
+def test_stats_reconcile_with_rows_read(db):
+    header = "Job_Id,Title,Company,Description\n"
+    rows = [
+        "1,Data Analyst,Acme,SQL and dashboards",
+        "2,Backend Engineer,Globex,Python services",
+        "1,Senior Data Analyst,Acme,SQL and dashboards",  # repeated id, last one wins
+        "3,Backend Engineer,Globex,Python services",      # same posting as id 2
+        "2,Backend Engineer,Globex,Python services",      # repeated in the next chunk: unchanged
+    ]
+
+    stats = import_jobs_from_csv(io.StringIO(header + "\n".join(rows)), chunksize=4, db=db)
+
+    assert stats["duplicates_in_file"] == 1
+    assert (stats["inserted"], stats["merged"], stats["unchanged"]) == (2, 1, 1)
+    counted = ("inserted", "updated", "unchanged", "merged", "duplicates_in_file")
+    assert sum(stats[key] for key in counted) == stats["rows_read"] == 5
+    assert db.query(models.Job.title).filter(models.Job.job_id == "1").scalar() == "Senior Data Analyst"
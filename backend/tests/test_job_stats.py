@@ -0,0 +1,48 @@
+import pytest
+import job_stats
+from main import etag_matches
+
+URL = "/api/jobs/stats/overview"
+
+@pytest.fixture(autouse=True)
+def fresh_payload_cache():
+    # Versions restart at 1 once the db fixture empties the summary table
+    job_stats._payload_cache.clear()
+
+@pytest.mark.parametrize("header, matches", [
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"old", W/"abc"', True),
+    ("*", True),
+    ('"abc-gzip"', False),
+    ('"old"', False),
+    ("", False),
+    (None, False),
+])
+def test_etag_matching(header, matches):
+    assert etag_matches(header, '"abc"') is matches
+
+def test_unchanged_stats_are_a_304(client, db, make_jobs):
+    make_jobs(3)
+    job_stats.refresh_job_stats(db)
+
+    first = client.get(URL)
+    etag = first.headers["etag"]
+    assert first.json()["total_jobs"] == 3
+
+    for header in (etag, f"W/{etag}", f'"stale", {etag}', "*"):
+        cached = client.get(URL, headers={"If-None-Match": header})
+        assert cached.status_code == 304 and cached.content == b""
+        assert cached.headers["etag"] == etag
+
+def test_refreshed_stats_get_a_new_etag(client, db, make_jobs):
+    make_jobs(1)
+    job_stats.refresh_job_stats(db)
+    etag = client.get(URL).headers["etag"]
+
+    make_jobs(2)
+    job_stats.refresh_job_stats(db)
+    fresh = client.get(URL, headers={"If-None-Match": etag})
+
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag and fresh.json()["total_jobs"] == 3
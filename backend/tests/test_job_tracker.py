@@ -0,0 +1,80 @@
+import pytest
+import models
+
+@pytest.fixture
+def users(db):
+    ada = models.User(email="ada@example.com", name="Ada", skills=[])
+    bob = models.User(email="bob@example.com", name="Bob", skills=[])
+    db.add_all([ada, bob])
+    db.commit()
+    return ada.id, bob.id
+
+def track(client, user_id, company, status="Applied"):
+    response = client.post("/api/job-tracker", json={
+        "userId": user_id, "company": company, "position": "Engineer",
+        "status": status, "dateApplied": "2026-01-15"
+    })
+    assert response.status_code == 200
+    return response.json()["id"]
+
+def board(client, user_id, **params):
+    return client.get(f"/api/job-tracker/{user_id}", params=params)
+
+def test_create_update_and_delete(client, users):
+    ada, _ = users
+    entry_id = track(client, ada, "Acme")
+
+    updated = client.put(f"/api/job-tracker/{entry_id}", json={"userId": ada, "status": "Interview", "notes": "Round 2"})
+    assert (updated.json()["status"], updated.json()["notes"], updated.json()["company"]) == ("Interview", "Round 2", "Acme")
+
+    cleared = client.put(f"/api/job-tracker/{entry_id}", json={"userId": ada, "notes": None})
+    assert cleared.json()["notes"] is None and cleared.json()["status"] == "Interview"
+
+    assert client.delete(f"/api/job-tracker/{entry_id}", params={"user_id": ada}).json() == {"deleted": entry_id}
+    assert board(client, ada).json() == []
+    assert client.delete(f"/api/job-tracker/{entry_id}", params={"user_id": ada}).status_code == 404
+    assert client.post("/api/job-tracker", json={
+        "userId": 999999, "company": "Acme", "position": "Engineer", "status": "Applied", "dateApplied": "2026-01-15"
+    }).status_code == 404
+
+@pytest.mark.parametrize("field", ["company", "position", "status"])
+def test_required_fields_cannot_be_nulled(client, users, field):
+    ada, _ = users
+    entry_id = track(client, ada, "Acme")
+
+    response = client.put(f"/api/job-tracker/{entry_id}", json={"userId": ada, field: None})
+
+    assert response.status_code == 422
+    assert board(client, ada).json()[0][field] is not None
+
+def test_entries_of_another_user_are_out_of_reach(client, users):
+    ada, bob = users
+    entry_id = track(client, ada, "Acme")
+
+    assert client.put(f"/api/job-tracker/{entry_id}", json={"userId": bob, "status": "Rejected"}).status_code == 404
+    assert client.put(f"/api/job-tracker/{entry_id}", json={"status": "Rejected"}).status_code == 422
+    assert client.delete(f"/api/job-tracker/{entry_id}", params={"user_id": bob}).status_code == 404
+    assert client.delete(f"/api/job-tracker/{entry_id}").status_code == 422
+    assert client.put("/api/job-tracker/bulk", json={"userId": bob, "ids": [entry_id], "status": "Offer"}).json() == {"updated": 0}
+    assert client.post("/api/job-tracker/bulk-delete", json={"userId": bob, "ids": [entry_id]}).json() == {"deleted": 0}
+    assert [(e["id"], e["status"]) for e in board(client, ada).json()] == [(entry_id, "Applied")]
+
+def test_bulk_changes_board_order_and_counts(client, users):
+    ada, _ = users
+    ids = [track(client, ada, f"Company {i}") for i in range(5)]
+
+    assert client.put("/api/job-tracker/bulk", json={"userId": ada, "ids": ids[:2], "status": "Offer"}).json() == {"updated": 2}
+    assert client.put("/api/job-tracker/bulk", json={"userId": ada, "ids": ids, "status": None}).status_code == 422
+    assert client.post("/api/job-tracker/bulk-delete", json={"userId": ada, "ids": ids[4:]}).json() == {"deleted": 1}
+
+    everything = board(client, ada)
+    offers = board(client, ada, status="Offer").json()
+    page = board(client, ada, limit=1, skip=1)
+
+    assert everything.headers["x-total-count"] == "4"
+    assert [e["id"] for e in everything.json()][:2] == [ids[1], ids[0]]  # most recently updated first
+    assert {e["id"] for e in offers} == set(ids[:2])
+    assert page.headers["x-total-count"] == "4" and len(page.json()) == 1
+    assert client.get(f"/api/job-tracker/{ada}/counts").json() == {
+        "user_id": ada, "total": 4, "counts": {"Applied": 2, "Offer": 2}
+    }
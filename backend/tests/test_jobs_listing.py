@@ -0,0 +1,84 @@
+import pytest
+from sqlalchemy import event
+import schemas
+from database import read_engine
+
+@pytest.fixture
+def job_selects():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if "FROM jobs" in statement and "count(" not in statement:
+            statements.append((statement, parameters))
+
+    event.listen(read_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(read_engine, "before_cursor_execute", record)
+
+def test_cursor_walks_every_page_without_offset(client, make_jobs, job_selects):
+    ids = make_jobs(7)
+
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 3, "fields": "summary", **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/jobs", params=params)
+        assert response.headers["x-total-count"] == "7"
+        pages.append([job["id"] for job in response.json()])
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+
+    assert pages == [ids[0:3], ids[3:6], ids[6:7]]
+    # SQLite always renders OFFSET; later pages seek by id and skip nothing
+    assert len(job_selects) == 3
+    for statement, parameters in job_selects[1:]:
+        assert "jobs.id > ?" in statement and parameters[-1] == 0
+
+def test_summary_leaves_out_the_description(client, make_jobs):
+    make_jobs(1)
+
+    summary = client.get("/api/jobs", params={"fields": "summary"}).json()[0]
+    full = client.get("/api/jobs").json()[0]
+
+    assert "job_description" not in summary
+    assert full["job_description"] == "description 0"
+    assert set(summary) < set(full)
+
+def test_filters_count_matching_jobs_only(client, make_jobs):
+    make_jobs(4)
+    make_jobs(2, employment_type="Contract")
+
+    response = client.get("/api/jobs", params={"employment_type": "Contract", "limit": 1})
+
+    assert response.headers["x-total-count"] == "2"
+    assert len(response.json()) == 1 and response.json()[0]["employment_type"] == "Contract"
+
+def test_search_results_page_with_skip(client, make_jobs):
+    make_jobs(5)
+
+    first = client.get("/api/jobs", params={"search": "description", "limit": 2})
+    second = client.get("/api/jobs", params={"search": "description", "limit": 2, "skip": 2})
+
+    assert "x-next-cursor" not in first.headers
+    assert first.headers["x-total-count"] == "5"
+    ids = [job["id"] for job in first.json() + second.json()]
+    assert len(set(ids)) == 4
+
+def test_large_listings_are_compressed(client, make_jobs):
+    make_jobs(50)
+
+    response = client.get("/api/jobs", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert int(response.headers["content-length"]) < len(response.content)
+
+@pytest.mark.parametrize("fields, schema", [("summary", schemas.JobSummary), ("full", schemas.JobDetail)])
+def test_unvalidated_rows_have_exactly_the_schema_fields(client, make_jobs, fields, schema):
+    # get_jobs skips response_model validation, so the schema only holds if the selected columns match it
+    make_jobs(2, required_skills=["Python"], employment_type="Full Time")
+
+    jobs = client.get("/api/jobs", params={"fields": fields}).json()
+
+    for job in jobs:
+        assert list(job) == list(schema.model_fields)
+        assert schema.model_validate(job).model_dump(mode="json") == job
@@ -0,0 +1,82 @@
+import pytest
+import llm_cache
+from llm_cache import LLMCache
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    return now
+
+def make_cache(tmp_path, **options):
+    options = {"ttl": 60, "max_entries": 2, "evict_every": 1, **options}
+    return LLMCache(str(tmp_path / "cache.db"), **options)
+
+def stored_keys(cache):
+    return {key for (key,) in cache._connection().execute("SELECT key FROM llm_cache")}
+
+def test_entries_expire_after_the_ttl(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    cache.set("a", "reply")
+
+    clock[0] += 60
+    assert cache.get("a") == "reply"
+    clock[0] += 1
+    assert cache.get("a") is None
+    assert stored_keys(cache) == set()
+
+def test_least_recently_used_entry_is_evicted(tmp_path, clock):
+    cache = make_cache(tmp_path, touch_batch=100)
+    cache.set("a", "1")
+    clock[0] += 1
+    cache.set("b", "2")
+    clock[0] += 1
+    assert cache.get("a") == "1"  # only buffered, flushed before evicting
+    clock[0] += 1
+
+    cache.set("c", "3")
+
+    assert stored_keys(cache) == {"a", "c"}
+
+def test_hits_are_written_in_batches(tmp_path, clock):
+    cache = make_cache(tmp_path, touch_batch=2, evict_every=10)
+    cache.set("a", "1")
+    cache.set("b", "2")
+
+    def last_accessed():
+        return dict(cache._connection().execute("SELECT key, last_accessed FROM llm_cache"))
+
+    clock[0] += 5
+    cache.get("a")
+    cache.get("a")
+    assert last_accessed() == {"a": 1000.0, "b": 1000.0}
+    clock[0] += 5
+    cache.get("b")
+    assert last_accessed() == {"a": 1005.0, "b": 1010.0}
+
+def test_eviction_runs_every_few_inserts(tmp_path, clock):
+    cache = make_cache(tmp_path, max_entries=2, evict_every=3)
+    for key in "abc":
+        clock[0] += 1
+        cache.set(key, key)
+    assert len(stored_keys(cache)) == 2
+
+    for key in "def":
+        clock[0] += 1
+        cache.set(key, key)
+        if key != "f":
+            assert len(stored_keys(cache)) > 2
+    assert stored_keys(cache) == {"e", "f"}
+
+def test_hit_and_miss_counters(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.set("a", "1")
+
+    cache.get("a")
+    cache.get("a")
+    cache.get("missing")
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"], stats["entries"]) == (2, 1, 0.6667, 1)
+    cache.clear()
+    assert cache.stats()["hits"] == cache.stats()["entries"] == 0
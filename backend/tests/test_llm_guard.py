@@ -0,0 +1,133 @@
+import asyncio
+import pytest
+import ai_service
+import llm_guard
+import models
+from fake_llm import FakeAsyncLLMClient, FakeLLMClient, FakeRateLimitError
+from llm_guard import CircuitBreaker, GuardedAsyncClient, GuardedClient, LLMGuard
+
+class FakeOutage(Exception):
+    status_code = 503
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+def half_open_guard(requests_per_minute: float = 0) -> LLMGuard:
+    """Guard whose breaker has just reached the end of its reset timeout"""
+    guard = LLMGuard(requests_per_minute=requests_per_minute, tokens_per_minute=0,
+                     breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0))
+    guard.breaker.record(FakeOutage())
+    assert guard.breaker.state == "open"
+    return guard
+
+def open_guard() -> LLMGuard:
+    guard = LLMGuard(requests_per_minute=0, tokens_per_minute=0,
+                     breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60))
+    guard.breaker.record(FakeOutage())
+    return guard
+
+def test_cancelled_while_rate_limited_frees_the_trial_and_quota():
+    guard = half_open_guard(requests_per_minute=60)
+    guard.requests.tokens = 0  # the next call has to wait about a second
+    client = GuardedAsyncClient(FakeAsyncLLMClient(), guard)
+
+    async def run():
+        waiting = asyncio.create_task(client.chat.completions.create(messages=MESSAGES, model="m"))
+        await asyncio.sleep(0.05)
+        assert guard.breaker._trial_running
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+    asyncio.run(run())
+
+    assert not guard.breaker._trial_running
+    assert guard.requests.tokens >= 0  # the reserved request was refunded (it was -1 while waiting)
+    assert client.client.calls == 0
+
+def test_interrupted_sync_wait_frees_the_trial(monkeypatch):
+    guard = half_open_guard(requests_per_minute=60)
+    guard.requests.tokens = 0
+    client = GuardedClient(FakeLLMClient(), guard)
+
+    def interrupted(seconds):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(llm_guard.time, "sleep", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        client.chat.completions.create(messages=MESSAGES, model="m")
+
+    assert not guard.breaker._trial_running
+    assert guard.breaker.before_call() is True  # a new trial may start
+
+def test_stream_closed_before_iterating_settles_the_trial():
+    guard = half_open_guard()
+    client = GuardedAsyncClient(FakeAsyncLLMClient(), guard)
+
+    async def run():
+        stream = await client.chat.completions.create(messages=MESSAGES, model="m", stream=True)
+        await stream.aclose()
+
+    asyncio.run(run())
+
+    assert guard.breaker.state == "closed"
+    assert not guard.breaker._trial_running
+
+def test_sync_stream_dropped_before_iterating_settles_the_trial():
+    guard = half_open_guard()
+    client = GuardedClient(FakeLLMClient(), guard)
+
+    client.chat.completions.create(messages=MESSAGES, model="m", stream=True)
+
+    assert guard.breaker.state == "closed"
+    assert not guard.breaker._trial_running
+
+def test_rate_limits_do_not_open_the_breaker():
+    guard = LLMGuard(requests_per_minute=0, tokens_per_minute=0, breaker=CircuitBreaker(failure_threshold=2))
+
+    for _ in range(3):
+        guard.settle(10, exc=FakeRateLimitError())
+
+    assert guard.breaker.state == "closed"
+    assert guard.metrics.rate_limited == 3
+
+def test_open_breaker_is_a_503_and_nothing_is_saved(client, db, monkeypatch):
+    monkeypatch.setattr(ai_service, "async_client", GuardedAsyncClient(FakeAsyncLLMClient(), open_guard()))
+    user = models.User(email="ada@example.com", name="Ada", skills=["Python"])
+    job = models.Job(title="Backend Engineer", company="Acme", job_description="Python and Docker")
+    db.add_all([user, job])
+    db.commit()
+    params = {"user_id": user.id, "job_id": job.id}
+
+    responses = [
+        client.post("/api/ai/match-skills", params=params),
+        client.post(f"/api/ai/extract-job-skills/{job.id}"),
+        client.post("/api/ai/parse-resume", params={"resume_text": "Python developer"}),
+    ]
+
+    for response in responses:
+        assert response.status_code == 503
+        assert 0 < int(response.headers["retry-after"]) <= 60
+    db.expire_all()
+    assert db.get(models.Job, job.id).required_skills is None
+
+def test_open_breaker_is_a_503_before_the_roadmap_stream_starts(client, db, monkeypatch):
+    monkeypatch.setattr(ai_service, "async_client", GuardedAsyncClient(FakeAsyncLLMClient(), open_guard()))
+    user = models.User(email="ada@example.com", name="Ada", skills=["Python"])
+    job = models.Job(title="Backend Engineer", company="Acme", required_skills=["Python", "Docker"])
+    db.add_all([user, job])
+    db.commit()
+    params = {"user_id": user.id, "job_id": job.id}
+
+    stream = client.get("/api/ai/generate-roadmap/stream", params=params)
+    roadmap = client.post("/api/ai/generate-roadmap", params=params)
+
+    assert stream.status_code == 503 and "retry-after" in stream.headers
+    assert roadmap.status_code == 503
+
+def test_hybrid_extraction_falls_back_to_the_dictionary(client, db, monkeypatch):
+    monkeypatch.setattr(ai_service, "async_client", GuardedAsyncClient(FakeAsyncLLMClient(), open_guard()))
+
+    response = client.post("/api/ai/parse-resume", params={"resume_text": "Python", "mode": "hybrid"})
+
+    assert response.status_code == 200
+    assert response.json()["extracted_skills"] == ["Python"]
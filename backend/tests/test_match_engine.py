@@ -0,0 +1,82 @@
+import random
+import pytest
+import match_engine
+import models
+from ai_service import calculate_skill_match
+from match_engine import SkillMatchIndex
+
+JOBS = [
+    (1, ["Python", "SQL"]),
+    (2, ["python", "Docker", "AWS"]),
+    (3, []),
+    (4, ["Excel"]),
+    (5, ["SQL", "Python"]),
+]
+
+def test_allowed_ids_restrict_the_ranking():
+    index = SkillMatchIndex(JOBS)
+
+    assert index.top_k(["Python", "SQL"], 10) == [(1, 100.0), (5, 100.0), (2, 33.33), (4, 0.0)]
+    assert index.top_k(["Python", "SQL"], 10, allowed_job_ids=[2, 3, 5]) == [(5, 100.0), (2, 33.33)]
+    assert index.top_k(["Python", "SQL"], 10, allowed_job_ids=iter([2, 99])) == [(2, 33.33)]
+
+def test_empty_allowed_set_matches_nothing():
+    index = SkillMatchIndex(JOBS)
+
+    assert index.top_k(["Python"], 10, allowed_job_ids=[]) == []
+    assert index.top_k(["Python"], 0) == []
+
+def test_jobs_without_skills_and_below_min_match_are_skipped():
+    index = SkillMatchIndex(JOBS)
+
+    assert index.top_k(["Excel"], 10) == [(4, 100.0), (1, 0.0), (2, 0.0), (5, 0.0)]
+    assert index.top_k(["Python"], 10, min_match=50) == [(1, 50.0), (5, 50.0)]
+
+def test_top_k_agrees_with_calculate_skill_match():
+    rng = random.Random(7)
+    pool = [f"skill{i}" for i in range(30)]
+    jobs = [(job_id, rng.sample(pool, rng.randint(0, 8))) for job_id in range(1, 301)]
+    index = SkillMatchIndex(jobs)
+
+    for _ in range(20):
+        user_skills = rng.sample(pool, rng.randint(0, 12))
+        expected = sorted(
+            ((job_id, calculate_skill_match(user_skills, skills, "exact")["match_percentage"])
+             for job_id, skills in jobs if skills),
+            key=lambda pair: (-pair[1], pair[0])
+        )
+        assert index.top_k(user_skills, 25, mode="exact") == expected[:25]
+
+def test_cached_index_is_rebuilt_when_invalidated_or_too_old(db, make_jobs, monkeypatch):
+    make_jobs(2, required_skills=["Python"])
+    index = match_engine.get_index(db)
+    make_jobs(1, required_skills=["Go"])
+
+    assert match_engine.get_index(db) is index
+    monkeypatch.setattr(match_engine, "INDEX_MAX_AGE_SECONDS", -1)
+    assert len(match_engine.get_index(db)) == 3
+    monkeypatch.undo()
+
+    index = match_engine.get_index(db)
+    db.query(models.Job).update({models.Job.required_skills: ["Rust"]})
+    db.commit()
+    match_engine.invalidate()
+    assert match_engine.get_index(db) is not index
+    assert match_engine.get_index(db).vocabulary == {"rust": 0}
+
+def test_top_matches_filters_narrow_the_ranking(client, db):
+    user = models.User(email="ada@example.com", name="Ada", skills=["Python"])
+    db.add_all([
+        user,
+        models.Job(title="Backend", company="Acme", location="Singapore", required_skills=["Python"]),
+        models.Job(title="Data", company="Globex", location="Penang", required_skills=["Python", "SQL"]),
+    ])
+    db.commit()
+
+    everything = client.get(f"/api/users/{user.id}/top-matches").json()
+    penang = client.get(f"/api/users/{user.id}/top-matches", params={"location": "Penang"}).json()
+    nowhere = client.get(f"/api/users/{user.id}/top-matches", params={"company": "Initech"}).json()
+
+    assert [(m["job_title"], m["match_percentage"]) for m in everything] == [("Backend", 100.0), ("Data", 50.0)]
+    assert [m["job_title"] for m in penang] == ["Data"]
+    assert nowhere == []
@@ -0,0 +1,53 @@
+import match_engine
+import models
+from match_store import refresh_user_matches
+
+def stored_matches(db, user_id):
+    return {
+        row.job_id: row.match_percentage
+        for row in db.query(models.UserJobMatch).filter(models.UserJobMatch.user_id == user_id)
+    }
+
+def add_user(db, skills):
+    user = models.User(email=f"{'-'.join(skills).lower()}@example.com", name="Lin", skills=skills)
+    db.add(user)
+    db.flush()
+    return user
+
+def test_user_writes_reuse_the_cached_index(db, monkeypatch):
+    jobs = [
+        models.Job(title="Backend", required_skills=["Python", "Docker"]),
+        models.Job(title="Frontend", required_skills=["React"]),
+        models.Job(title="Pending", required_skills=[]),
+    ]
+    db.add_all(jobs)
+    db.commit()
+
+    builds = []
+    real_index = match_engine.SkillMatchIndex
+    monkeypatch.setattr(match_engine, "SkillMatchIndex", lambda rows: builds.append(1) or real_index(rows))
+
+    first = add_user(db, ["Python"])
+    refresh_user_matches(db, [first.id])
+    second = add_user(db, ["React", "Docker"])
+    refresh_user_matches(db, [second.id])
+    db.commit()
+
+    assert len(builds) == 1
+    assert stored_matches(db, first.id) == {jobs[0].id: 50.0}
+    assert stored_matches(db, second.id) == {jobs[0].id: 50.0, jobs[1].id: 100.0}
+
+def test_invalidated_index_sees_new_job_skills(db):
+    job = models.Job(title="Backend", required_skills=["Python"])
+    db.add(job)
+    db.commit()
+    user = add_user(db, ["Go"])
+    refresh_user_matches(db, [user.id])
+    assert stored_matches(db, user.id) == {}
+
+    job.required_skills = ["Go", "Python"]
+    db.commit()
+    match_engine.invalidate()
+    refresh_user_matches(db, [user.id])
+
+    assert stored_matches(db, user.id) == {job.id: 50.0}
@@ -0,0 +1,102 @@
+import threading
+import time
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+import main
+import metrics
+import profiler
+from metrics import RequestMetricsMiddleware
+from profiler import SamplingProfiler, hot_path
+
+def streaming_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestMetricsMiddleware)
+
+    @app.get("/slow/{name}")
+    def slow(name: str):
+        def body():
+            with metrics.stage("llm"):
+                time.sleep(0.05)
+            yield name.encode()
+        return StreamingResponse(body())
+
+    @app.get("/metrics")
+    def scrape():
+        return "ok"
+
+    return app
+
+def test_streamed_responses_are_timed_to_the_last_chunk():
+    before = metrics.http_latency.count(method="GET", route="/slow/{name}")
+
+    with TestClient(streaming_app()) as client:
+        response = client.get("/slow/a")
+
+    assert response.text == "a"
+    # The stage ran after the headers were sent, so only the total shows up in them
+    assert response.headers["server-timing"].startswith("total;dur=")
+    assert metrics.http_latency.count(method="GET", route="/slow/{name}") == before + 1
+    assert metrics.http_stage_seconds.value(route="/slow/{name}", stage="llm") >= 0.05
+
+def test_excluded_and_unmatched_paths():
+    with TestClient(streaming_app()) as client:
+        scraped = client.get("/metrics")
+        missing = client.get("/nowhere")
+
+    assert "server-timing" not in scraped.headers
+    assert missing.status_code == 404
+    assert metrics.http_requests.value(method="GET", route="/metrics", status=200) == 0
+    assert metrics.http_requests.value(method="GET", route="unmatched", status=404) >= 1
+
+def test_requests_are_labelled_by_route_template(client, make_jobs):
+    job_ids = make_jobs(2)
+    before = metrics.http_requests.value(method="GET", route="/api/jobs/{job_id}", status=200)
+
+    for job_id in job_ids:
+        assert client.get(f"/api/jobs/{job_id}").status_code == 200
+    response = client.get("/api/jobs/999999")
+    rendered = client.get("/metrics").text
+
+    assert metrics.http_requests.value(method="GET", route="/api/jobs/{job_id}", status=200) == before + 2
+    assert metrics.http_requests.value(method="GET", route="/api/jobs/{job_id}", status=404) >= 1
+    assert "db;dur=" in response.headers["server-timing"]
+    assert f'route="/api/jobs/{job_ids[0]}"' not in rendered
+    assert 'http_requests_total{method="GET",route="/api/jobs/{job_id}",status="200"}' in rendered
+
+@hot_path("busy")
+def busy(seconds: float):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+def test_hot_path_profiler_keeps_only_marked_samples():
+    idle = threading.Event()
+    sleeper = threading.Thread(target=idle.wait, args=(5,))
+    sleeper.start()
+    try:
+        with SamplingProfiler(0.002, hot_paths_only=True) as sampler:
+            worker = threading.Thread(target=busy, args=(0.2,))
+            worker.start()
+            worker.join()
+    finally:
+        idle.set()
+        sleeper.join()
+
+    assert sampler.ticks > 0
+    assert sampler.samples
+    assert all(stack.startswith("[busy];") for stack in sampler.samples)
+    assert any("test_metrics:busy" in stack for stack in sampler.samples)
+    assert sampler.top()[0]["function"] == "test_metrics:busy"
+    assert profiler._hot_path_profilers == 0
+    assert not profiler._active_paths.get(worker.ident)
+
+def test_profile_endpoint_is_off_by_default(client, monkeypatch):
+    assert client.get("/api/debug/profile", params={"seconds": 0.01}).status_code == 404
+
+    monkeypatch.setattr(main, "PROFILER_ENABLED", True)
+    top = client.get("/api/debug/profile", params={"seconds": 0.05, "interval_ms": 2}).json()
+    collapsed = client.get("/api/debug/profile", params={"seconds": 0.05, "interval_ms": 2, "format": "collapsed"})
+
+    assert top["ticks"] > 0 and top["seconds"] >= 0.05
+    assert collapsed.headers["content-type"].startswith("text/plain")
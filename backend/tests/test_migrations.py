@@ -0,0 +1,44 @@
+import os
+import subprocess
+import sys
+from sqlalchemy import create_engine, text
+import models
+from conftest import BACKEND_DIR
+from database import Base
+from migrations import run_migrations
+
+MIGRATE = """
+import sys
+sys.path.insert(0, {backend!r})
+from migrations import run_migrations
+run_migrations()
+"""
+
+def test_workers_starting_together_migrate_in_turn(tmp_path):
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path / 'jobs.db'}", "LLM_CACHE_PATH": str(tmp_path / "llm_cache.db")}
+    workers = [
+        subprocess.Popen([sys.executable, "-c", MIGRATE.format(backend=BACKEND_DIR)], cwd=tmp_path, env=env,
+                         stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        for _ in range(4)
+    ]
+    results = [(worker.wait(timeout=120), worker.stderr.read()) for worker in workers]
+
+    assert [code for code, _ in results] == [0] * 4, [err for _, err in results]
+    assert os.path.exists(tmp_path / "jobs.db.migrate.lock")
+
+def test_indexes_from_older_schemas_are_replaced(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE INDEX ix_jobs_location ON jobs (location)"))
+        conn.execute(text("DROP INDEX ix_jobs_pending_skills"))
+        conn.execute(text("CREATE INDEX ix_jobs_pending_skills ON jobs (id) "
+                          "WHERE required_skills IS NULL OR required_skills = '[]'"))
+
+    run_migrations(engine)
+
+    with engine.connect() as conn:
+        indexes = dict(conn.execute(text("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = 'jobs'")).all())
+    engine.dispose()
+    assert "ix_jobs_location" not in indexes
+    assert models.PENDING_SKILLS_PREDICATE in indexes["ix_jobs_pending_skills"]
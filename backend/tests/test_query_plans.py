@@ -0,0 +1,18 @@
+from sqlalchemy import event
+import query_plans
+from database import SessionLocal, engine, read_engine
+
+def test_no_unexpected_full_table_scans(client, db):
+    recorder = query_plans.StatementRecorder()
+    for bound in {engine, read_engine}:
+        event.listen(bound, "before_cursor_execute", recorder)
+    try:
+        query_plans.run_checks(client, recorder, SessionLocal, query_plans.DEFAULT_CSV_PATH)
+    finally:
+        for bound in {engine, read_engine}:
+            event.remove(bound, "before_cursor_execute", recorder)
+
+    regressions = query_plans.explain(engine.url.database, recorder.statements)
+
+    assert len(recorder.statements) > 25
+    assert [(check, table, " ".join(statement.split())) for check, table, statement, _ in regressions] == []
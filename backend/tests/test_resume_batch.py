@@ -0,0 +1,81 @@
+import asyncio
+import json
+import zipfile
+import resume_batch
+import resume_processing
+import workers
+from resume_batch import expand_archives, ingest_resumes
+
+PARSE_SECONDS = 0.2
+
+def write_resumes(tmp_path, count):
+    files = []
+    for i in range(count):
+        path = tmp_path / f"candidate_{i}.txt"
+        path.write_text(f"Candidate {i}\ncandidate{i}@example.com\nPython developer with five years of backend experience.")
+        files.append((path.name, str(path)))
+    return files
+
+def test_batch_larger_than_the_pool_does_not_time_out_while_queued(db, llm, tmp_path, monkeypatch):
+    llm.responder = lambda prompt: json.dumps(["Python"])
+    monkeypatch.setattr(workers, "PARSER_WORKERS", 2)
+    # Each parse takes PARSE_SECONDS; 8 resumes on 2 workers queue for far longer than the guard
+    monkeypatch.setattr(resume_processing, "PARSE_GUARD_SECONDS", PARSE_SECONDS * 2)
+
+    pool = {}
+
+    async def slow_pool(func, *args):
+        # Stands in for the 2-process pool and its own queue
+        async with pool.setdefault("workers", asyncio.Semaphore(2)):
+            await asyncio.sleep(PARSE_SECONDS)
+            return func(*args)
+
+    monkeypatch.setattr(resume_processing, "run_cpu_bound", slow_pool)
+
+    summary = asyncio.run(ingest_resumes(db, write_resumes(tmp_path, 8)))
+
+    assert [result["status"] for result in summary["results"]] == ["ok"] * 8
+    assert summary["stats"]["users_saved"] == 8
+
+def test_archives_are_unpacked_off_the_event_loop(db, llm, tmp_path, monkeypatch):
+    llm.responder = lambda prompt: json.dumps(["Python"])
+    archive = tmp_path / "resumes.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        for name, path in write_resumes(tmp_path, 2):
+            zf.write(path, f"cvs/{name}")
+    on_loop = []
+
+    def expand(*args):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            pass
+        return expand_archives(*args)
+
+    monkeypatch.setattr(resume_batch, "expand_archives", expand)
+
+    summary = asyncio.run(ingest_resumes(db, [("resumes.zip", str(archive))]))
+
+    assert on_loop == []
+    assert [result["filename"] for result in summary["results"]] == [
+        "resumes.zip/cvs/candidate_0.txt", "resumes.zip/cvs/candidate_1.txt"
+    ]
+    assert summary["stats"]["users_saved"] == 2
+
+def test_resumes_without_an_email_stay_separate_users(db, llm, tmp_path):
+    llm.responder = lambda prompt: json.dumps(["Python"])
+    files = []
+    for i, text in enumerate(["Ada Lovelace\nAnalytical engine programmer writing Python notes.",
+                              "Alan Turing\nCodebreaker and Python enthusiast building machines."]):
+        path = tmp_path / f"no_email_{i}.txt"
+        path.write_text(text)
+        files.append((path.name, str(path)))
+
+    first = asyncio.run(ingest_resumes(db, files))
+    again = asyncio.run(ingest_resumes(db, files[:1]))
+
+    emails = [result["user"]["email"] for result in first["results"]]
+    assert first["stats"]["users_saved"] == 2 and len(set(emails)) == 2
+    assert all(email.endswith("@no-email.invalid") for email in emails)
+    assert again["results"][0]["user"]["id"] == first["results"][0]["user"]["id"]
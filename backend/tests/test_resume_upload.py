@@ -0,0 +1,75 @@
+import functools
+import os
+import pytest
+import file_utils
+import main
+from file_utils import ExtractionTimeoutError, extract_text_from_pdf, extract_text_from_txt
+from task_queue import QueueFullError
+
+def make_pdf(pages):
+    """Minimal PDF with one line of Helvetica text per page"""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    pdf, offsets = b"%PDF-1.4\n", []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n{body}\nendobj\n".encode()
+    xref = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    pdf += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return pdf
+
+def test_pdf_pages_are_read_up_to_the_caps(tmp_path):
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(make_pdf([f"Page {i}" for i in range(5)]))
+
+    assert extract_text_from_pdf(str(path)) == "\n".join(f"Page {i}" for i in range(5))
+    assert extract_text_from_pdf(str(path), max_pages=2) == "Page 0\nPage 1"
+    assert extract_text_from_pdf(str(path), max_chars=9) == "Page 0\nPag"
+    with pytest.raises(ExtractionTimeoutError):
+        extract_text_from_pdf(str(path), timeout=-1)
+
+def test_text_files_are_read_up_to_the_cap(tmp_path):
+    path = tmp_path / "resume.txt"
+    path.write_text("é" * 100, encoding="utf-8")
+
+    assert extract_text_from_txt(str(path), max_chars=10) == "é" * 10
+    assert extract_text_from_txt("naïve".encode("latin-1")) == "naïve"
+
+def spooled_files():
+    return os.listdir(main.resume_queue.upload_dir)
+
+def test_oversized_upload_is_rejected_without_leftovers(client, monkeypatch):
+    monkeypatch.setattr(main, "save_upload", functools.partial(file_utils.save_upload, max_bytes=1024))
+
+    response = client.post("/api/upload-resume/async", files={"file": ("big.txt", b"x" * 4096, "text/plain")})
+
+    assert response.status_code == 413
+    assert spooled_files() == []
+
+def test_full_queue_is_a_503_and_the_spooled_file_is_removed(client, monkeypatch):
+    def full(filename, path):
+        raise QueueFullError("Queue is full (50 tasks waiting)")
+
+    monkeypatch.setattr(main.resume_queue, "submit_file", full)
+
+    response = client.post("/api/upload-resume/async", files={"file": ("cv.txt", b"Python developer", "text/plain")})
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "5"
+    assert spooled_files() == []
+
+def test_unsupported_files_are_refused_before_spooling(client):
+    response = client.post("/api/upload-resume/async", files={"file": ("cv.docx", b"PK", "application/zip")})
+
+    assert response.status_code == 400
+    assert spooled_files() == []
@@ -0,0 +1,113 @@
+import asyncio
+import json
+import re
+import pytest
+import models
+from ai_service import stream_upskilling_roadmap_async
+from roadmap_stream import RoadmapStreamParser
+
+ITEMS = [
+    {"skill": 'C "sharp" {fundamentals}', "priority": "High", "estimated_time": "2 weeks", "resources": ["docs [v2]", "a \\ b"]},
+    {"skill": "Docker", "priority": "Medium", "estimated_time": "1 week", "resources": ["{roadmap: [}"]},
+]
+PROJECTS = ["Ship a \"real\" API }", "Containerise it ]"]
+REPLY = "```json\n" + json.dumps({"roadmap": ITEMS, "projects": PROJECTS}) + "\n```"
+
+def feed_all(chunks):
+    parser = RoadmapStreamParser()
+    events = [event for chunk in chunks for event in parser.feed(chunk)]
+    return parser, events
+
+def sse_events(text):
+    return [(event, json.loads(data)) for event, data in re.findall(r"event: (\w+)\ndata: (.*)\n\n", text)]
+
+def test_escaped_quotes_and_brackets_inside_strings():
+    parser, events = feed_all([REPLY])
+
+    assert events == [("item", ITEMS[0]), ("item", ITEMS[1]), ("projects", PROJECTS)]
+    assert parser.result() == {"roadmap": ITEMS, "projects": PROJECTS}
+
+@pytest.mark.parametrize("split", range(1, len(REPLY)))
+def test_any_split_point_gives_the_same_events(split):
+    # Covers chunks ending mid-escape ("\ | ""), mid-key ("road | map") and mid-value
+    _, events = feed_all([REPLY[:split], REPLY[split:]])
+
+    assert events == [("item", ITEMS[0]), ("item", ITEMS[1]), ("projects", PROJECTS)]
+
+def test_one_character_at_a_time():
+    _, events = feed_all(REPLY)
+
+    assert [event for event, _ in events] == ["item", "item", "projects"]
+
+def test_truncated_reply_keeps_completed_items():
+    cut = REPLY.index('"Docker"')
+    parser, events = feed_all([REPLY[:cut]])
+
+    assert events == [("item", ITEMS[0])]
+    assert parser.result() == {"roadmap": [ITEMS[0]], "projects": []}
+
+def test_nested_objects_are_not_items():
+    reply = json.dumps({"meta": {"roadmap": [{"skill": "nested"}]}, "roadmap": [{"skill": "Go", "extra": {"a": 1}}]})
+    _, events = feed_all([reply])
+
+    assert events == [("item", {"skill": "Go", "extra": {"a": 1}})]
+
+def collect(stream):
+    async def run():
+        return [event async for event in stream]
+    return asyncio.run(run())
+
+def test_cached_reply_is_replayed_without_calling_the_llm(db, llm):
+    llm.responder = lambda prompt: REPLY
+
+    fresh = collect(stream_upskilling_roadmap_async(["Python"], ["Docker"], "Backend Engineer"))
+    replayed = collect(stream_upskilling_roadmap_async(["Python"], ["Docker"], "Backend Engineer"))
+
+    assert llm.calls == 1
+    assert fresh == replayed
+    assert replayed[-1] == ("done", {"roadmap": ITEMS, "projects": PROJECTS})
+
+def test_truncated_stream_is_not_cached(db, llm):
+    llm.responder = lambda prompt: REPLY[:REPLY.index('"Docker"')]
+
+    first = collect(stream_upskilling_roadmap_async(["Python"], ["Docker"], "Backend Engineer"))
+    collect(stream_upskilling_roadmap_async(["Python"], ["Docker"], "Backend Engineer"))
+
+    assert first[-1] == ("done", {"roadmap": [ITEMS[0]], "projects": []})
+    assert llm.calls == 2
+
+@pytest.fixture
+def roadmap_params(db):
+    def make(required_skills):
+        user = models.User(email="grace@example.com", name="Grace", skills=["Python"])
+        job = models.Job(title="Backend Engineer", company="Acme", location="Singapore",
+                         job_description="Python and Docker", required_skills=required_skills)
+        db.add_all([user, job])
+        db.commit()
+        return {"user_id": user.id, "job_id": job.id}
+    return make
+
+def test_stream_endpoint_event_sequence(client, llm, roadmap_params):
+    llm.responder = lambda prompt: REPLY
+    params = roadmap_params(["Python", "Docker"])
+
+    response = client.get("/api/ai/generate-roadmap/stream", params=params)
+    events = sse_events(response.text)
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert [event for event, _ in events] == ["meta", "item", "item", "projects", "done"]
+    meta = {"job_title": "Backend Engineer", "job_company": "Acme", "match_percentage": 50}
+    assert events[0][1] == meta
+    assert [data for event, data in events if event == "item"] == ITEMS
+    assert events[-1][1] == {"roadmap": ITEMS, "projects": PROJECTS, **meta}
+
+def test_stream_endpoint_does_not_extract_skills(client, llm, db, roadmap_params):
+    params = roadmap_params([])
+
+    response = client.get("/api/ai/generate-roadmap/stream", params=params)
+
+    assert response.status_code == 409
+    assert llm.calls == 0
+    db.expire_all()
+    assert db.get(models.Job, params["job_id"]).required_skills == []
+    assert client.get("/api/ai/generate-roadmap/stream", params={**params, "job_id": 999999}).status_code == 404
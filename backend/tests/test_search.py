@@ -0,0 +1,97 @@
+import os
+import subprocess
+import sys
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+import models
+import search
+from conftest import BACKEND_DIR
+from database import Base
+from search import apply_search, build_match_query
+
+def add_jobs(db, *jobs):
+    rows = [models.Job(company="Acme", location="Singapore", **fields) for fields in jobs]
+    db.add_all(rows)
+    db.commit()
+    return rows
+
+def titles(db, text):
+    return [job.title for job in apply_search(db.query(models.Job), text, models.Job)]
+
+def test_every_term_is_a_required_prefix():
+    assert build_match_query('soft "eng"; DROP') == '"soft"* "eng"* "DROP"*'
+    assert build_match_query("  --  ") is None
+
+def test_title_matches_rank_above_description_matches(db):
+    add_jobs(
+        db,
+        {"title": "Data Analyst", "job_description": "Support the software engineering team with reports"},
+        {"title": "Software Engineer", "job_description": "Build services"},
+        {"title": "Nurse", "job_description": "Ward duties"},
+    )
+
+    assert titles(db, "soft eng") == ["Software Engineer", "Data Analyst"]
+
+def test_triggers_keep_the_index_in_sync(db):
+    job, = add_jobs(db, {"title": "Kotlin Developer", "job_description": "Android apps"})
+    assert titles(db, "kotlin") == ["Kotlin Developer"]
+
+    job.title = "Swift Developer"
+    db.commit()
+    assert titles(db, "kotlin") == []
+    assert titles(db, "swift") == ["Swift Developer"]
+
+    job.job_description = "iOS apps"
+    db.commit()
+    assert titles(db, "android") == [] and titles(db, "ios") == ["Swift Developer"]
+
+    db.delete(job)
+    db.commit()
+    assert titles(db, "swift") == []
+
+def test_like_fallback_without_the_index(db, monkeypatch):
+    add_jobs(db, {"title": "Software Engineer", "job_description": "Build services"})
+    monkeypatch.setattr(search, "_fts_enabled", False)
+
+    assert titles(db, "ware Eng") == ["Software Engineer"]
+    # Without FTS there is no prefix matching across words
+    assert titles(db, "soft eng") == []
+
+SEARCH_WITHOUT_MIGRATING = """
+import sys
+sys.path.insert(0, {backend!r})
+from fastapi.testclient import TestClient
+import main, models, search
+from database import SessionLocal
+
+with SessionLocal() as db:
+    db.add(models.Job(title="Software Engineer", company="Acme", job_description="Build services"))
+    db.commit()
+with TestClient(main.app) as client:
+    jobs = client.get("/api/jobs", params={{"search": "soft eng"}}).json()
+print([job["title"] for job in jobs], search._fts_enabled)
+"""
+
+def test_index_is_found_without_startup_migrations(tmp_path):
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path / 'jobs.db'}",
+           "LLM_CACHE_PATH": str(tmp_path / "llm_cache.db")}
+    subprocess.run([sys.executable, os.path.join(BACKEND_DIR, "migrations.py")],
+                   cwd=tmp_path, env=env, check=True, capture_output=True)
+
+    worker = subprocess.run([sys.executable, "-c", SEARCH_WITHOUT_MIGRATING.format(backend=BACKEND_DIR)],
+                            cwd=tmp_path, env={**env, "MIGRATE_ON_STARTUP": "0"}, capture_output=True, text=True)
+
+    assert worker.returncode == 0, worker.stderr
+    # Prefix matching only exists in the FTS path; LIKE '%soft eng%' finds nothing
+    assert worker.stdout.strip() == "['Software Engineer'] True"
+
+def test_like_fallback_when_the_index_is_missing(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'plain.db'}")
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(search, "_fts_enabled", None)
+    with Session(engine) as session:
+        add_jobs(session, {"title": "Software Engineer", "job_description": "Build services"})
+
+        assert titles(session, "ware Eng") == ["Software Engineer"]
+        assert search._fts_enabled is False
+    engine.dispose()
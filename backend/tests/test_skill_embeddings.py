@@ -0,0 +1,41 @@
+import numpy as np
+import models
+import skill_embeddings
+from ai_service import calculate_skill_match
+from match_engine import SkillMatchIndex
+from skill_embeddings import VectorIndex, embedder, semantic_matches
+
+def test_empty_index_finds_nothing():
+    index = VectorIndex([], embedder.embed_many([]))
+    queries = embedder.embed_many(["Python", "SQL"])
+
+    nearest, similarities = index.search(queries, k=3)
+
+    assert len(index) == 0 and index.matrix.shape == (0, embedder.dim)
+    assert nearest.shape == similarities.shape == (2, 0)
+    assert index.covered_by(queries, 0.5).shape == (0,)
+    assert VectorIndex([], np.zeros(0)).matrix.shape[0] == 0
+
+def test_semantic_matching_without_user_skills():
+    assert semantic_matches(["Python", "SQL"], []) == [False, False]
+    assert calculate_skill_match([], ["Python"], "semantic") == {
+        "match_percentage": 0.0, "matched_skills": [], "missing_skills": ["Python"]
+    }
+
+def test_semantic_scoring_over_jobs_without_skills():
+    index = SkillMatchIndex([(1, []), (2, None)])
+
+    assert index.score(["Python"], mode="semantic").tolist() == [0.0, 0.0]
+    assert index.top_k(["Python"], 5, mode="semantic") == []
+    assert SkillMatchIndex([]).top_k(["Python"], 5, mode="semantic") == []
+
+def test_semantic_mode_endpoints_with_no_skills_anywhere(client, db, monkeypatch):
+    monkeypatch.setattr(skill_embeddings, "MATCH_MODE", "semantic")
+    db.add(models.Job(title="Backend Engineer", company="Acme", required_skills=[]))
+    db.commit()
+
+    created = client.post("/api/users", json={"name": "Ada", "email": "ada@example.com", "skills": []})
+    matches = client.get(f"/api/users/{created.json()['id']}/top-matches")
+
+    assert created.status_code == 200
+    assert matches.status_code == 200 and matches.json() == []
@@ -0,0 +1,70 @@
+import asyncio
+import os
+import subprocess
+import sys
+import pytest
+import skill_extractor
+from conftest import BACKEND_DIR
+from skill_extractor import AhoCorasick, extract_skills, extract_skills_async, extractor
+
+def test_automaton_finds_overlapping_patterns():
+    matcher = AhoCorasick(["he", "she", "his", "hers"])
+
+    assert sorted(matcher.iter_matches("ushers")) == [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")]
+
+@pytest.mark.parametrize("text, skills", [
+    ("Strong JavaScript, some Java SE", ["JavaScript", "Java"]),
+    ("SQL Server and plain SQL", ["Microsoft SQL Server", "SQL"]),
+    ("python3,k8s;C++ (CPP)", ["Python", "Kubernetes", "C++"]),
+    ("Pythonic code in Javanese", []),
+    ("Written in Go, we go fast", ["Go"]),
+    ("excel at teamwork; advanced Excel", ["Excel"]),
+    ("Node\n\tJS   and JS", ["Node.js", "JavaScript"]),
+])
+def test_dictionary_matches_on_word_boundaries(text, skills):
+    assert extractor.extract(text) == skills
+
+def test_modes_decide_when_the_llm_is_asked():
+    calls = []
+
+    def llm(text):
+        calls.append(text)
+        return ["docker", "Terraform"]
+
+    rich, sparse = "Python, SQL and AWS", "Python only"
+
+    assert extract_skills(sparse, llm, mode="local") == ["Python"]
+    assert extract_skills(rich, llm, mode="hybrid") == ["Python", "SQL", "Amazon Web Services"]
+    assert calls == []
+    assert extract_skills(sparse, llm, mode="hybrid") == ["Docker", "Terraform", "Python"]
+    assert extract_skills(rich, llm, mode="llm") == ["docker", "Terraform"]
+    assert calls == [sparse, rich]
+    with pytest.raises(ValueError):
+        extract_skills(rich, llm, mode="regex")
+
+def test_hybrid_falls_back_to_the_dictionary_on_llm_errors():
+    async def failing(text):
+        raise TimeoutError
+
+    assert asyncio.run(extract_skills_async("Python", failing, mode="hybrid")) == ["Python"]
+    with pytest.raises(TimeoutError):
+        asyncio.run(extract_skills_async("Python", failing, mode="hybrid", fallback_on_error=False))
+    with pytest.raises(TimeoutError):
+        asyncio.run(extract_skills_async("Python, SQL and AWS", failing, mode="llm"))
+
+def test_default_mode_is_llm_and_uses_the_environment(monkeypatch):
+    def default_mode(**env):
+        environment = {k: v for k, v in os.environ.items() if k != "SKILL_EXTRACTION_MODE"}
+        result = subprocess.run(
+            [sys.executable, "-c", "import skill_extractor; print(skill_extractor.EXTRACTION_MODE)"],
+            cwd=BACKEND_DIR, env={**environment, **env}, capture_output=True, text=True
+        )
+        return result.stdout.strip() or result.stderr.strip().splitlines()[-1]
+
+    assert default_mode() == "llm"
+    assert default_mode(SKILL_EXTRACTION_MODE="hybrid") == "hybrid"
+    assert "must be one of" in default_mode(SKILL_EXTRACTION_MODE="regex")
+
+    calls = []
+    monkeypatch.setattr(skill_extractor, "EXTRACTION_MODE", "local")
+    assert extract_skills("Python", calls.append) == ["Python"] and calls == []
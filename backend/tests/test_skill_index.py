@@ -0,0 +1,42 @@
+from sqlalchemy import event
+import models
+from database import SessionLocal, engine
+from skill_index import resolve_skills, seed_curated_skills
+
+def test_resolve_creates_a_skill_once_per_spelling(db):
+    first = resolve_skills(db, ["Rust Lang", "rust  lang"])
+    db.commit()
+
+    assert list(first) == ["rust lang"]
+    assert resolve_skills(db, ["RUST LANG"]) == first
+    assert db.query(models.Skill).filter(models.Skill.name == "Rust Lang").count() == 1
+
+def test_resolve_tolerates_a_writer_that_created_the_skill_first(db):
+    # Another worker commits the skill right after our alias lookup found nothing
+    winner = {}
+    raced = []
+
+    def race(conn, cursor, statement, parameters, context, executemany):
+        if not raced and "FROM skill_aliases" in statement:
+            raced.append(True)
+            other = SessionLocal()
+            winner.update(resolve_skills(other, ["Zig"]))
+            other.commit()
+            other.close()
+
+    event.listen(engine, "after_cursor_execute", race)
+    try:
+        resolved = resolve_skills(db, ["Zig"])
+        db.commit()
+    finally:
+        event.remove(engine, "after_cursor_execute", race)
+
+    assert resolved == winner
+    assert db.query(models.Skill).filter(models.Skill.name == "Zig").count() == 1
+
+def test_seeding_again_adds_nothing(db):
+    aliases = db.query(models.SkillAlias).count()
+
+    assert seed_curated_skills(db) == 0
+    assert db.query(models.SkillAlias).count() == aliases
+    assert resolve_skills(db, ["k8s"], create=False)["k8s"] == resolve_skills(db, ["Kubernetes"], create=False)["kubernetes"]
@@ -0,0 +1,120 @@
+import asyncio
+import json
+import os
+import time
+import pytest
+from task_queue import QueueFullError, TaskQueue
+
+def spool(tmp_path, name, text="resume"):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+def test_tasks_move_from_queued_to_running_to_done(tmp_path):
+    async def run():
+        release = asyncio.Event()
+
+        async def handler(filename, path, report):
+            report("parsing")
+            await release.wait()
+            with open(path) as f:
+                return {"filename": filename, "text": f.read()}
+
+        queue = TaskQueue(handler, workers=1, upload_dir=str(tmp_path / "spool"))
+        await queue.start()
+        first = queue.submit_file("a.txt", spool(tmp_path, "a.txt", "first"))
+        second = queue.submit_file("b.txt", spool(tmp_path, "b.txt", "second"))
+        assert [queue.get(first)["queue_position"], queue.get(second)["queue_position"]] == [1, 2]
+
+        await asyncio.sleep(0.01)
+        assert (queue.get(first)["status"], queue.get(first)["stage"]) == ("running", "parsing")
+        assert queue.get(second)["queue_position"] == 1
+
+        release.set()
+        await queue._queue.join()
+        await queue.stop()
+        return queue, first, second
+
+    queue, first, second = asyncio.run(run())
+
+    for task_id, text in ((first, "first"), (second, "second")):
+        task = queue.get(task_id)
+        assert task["status"] == "done" and task["stage"] is None
+        assert task["result"]["text"] == text
+        assert task["submitted_at"] <= task["started_at"] <= task["finished_at"]
+    assert os.listdir(tmp_path / "spool") == []
+
+def test_handler_errors_mark_the_task_failed(tmp_path):
+    async def handler(filename, path, report):
+        raise ValueError(f"{filename} is not a resume")
+
+    async def run():
+        queue = TaskQueue(handler, upload_dir=str(tmp_path / "spool"))
+        await queue.start()
+        task_id = queue.submit_file("cat.jpg", spool(tmp_path, "cat.jpg"))
+        snapshots = [snapshot async for snapshot in queue.events(task_id)]
+        await queue.stop()
+        return snapshots
+
+    snapshots = asyncio.run(run())
+
+    assert [s["status"] for s in snapshots][-1] == "failed"
+    assert snapshots[-1]["error"] == "cat.jpg is not a resume"
+
+def test_full_queue_refuses_new_tasks(tmp_path):
+    async def run():
+        blocked = asyncio.Event()
+
+        async def handler(filename, path, report):
+            await blocked.wait()
+
+        queue = TaskQueue(handler, workers=1, max_depth=1, upload_dir=str(tmp_path / "spool"))
+        with pytest.raises(RuntimeError):
+            queue.submit_file("early.txt", spool(tmp_path, "early.txt"))
+        await queue.start()
+        queue.submit_file("running.txt", spool(tmp_path, "running.txt"))
+        await asyncio.sleep(0.01)
+        queue.submit_file("waiting.txt", spool(tmp_path, "waiting.txt"))
+        with pytest.raises(QueueFullError):
+            queue.submit_file("rejected.txt", spool(tmp_path, "rejected.txt"))
+        assert queue.depth == 1
+        await queue.stop()
+
+    asyncio.run(run())
+
+def test_only_the_newest_finished_tasks_are_kept(tmp_path):
+    async def handler(filename, path, report):
+        return filename
+
+    async def run():
+        queue = TaskQueue(handler, max_finished=2, upload_dir=str(tmp_path / "spool"))
+        await queue.start()
+        ids = [queue.submit_file(f"{i}.txt", spool(tmp_path, f"{i}.txt")) for i in range(4)]
+        await queue._queue.join()
+        await queue.stop()
+        return queue, ids
+
+    queue, ids = asyncio.run(run())
+
+    assert list(queue.tasks) == ids[2:]
+    assert queue.get(ids[0]) is None
+
+def test_upload_returns_at_once_and_the_status_can_be_polled(client, llm):
+    llm.responder = lambda prompt: json.dumps(["Python", "SQL"])
+    text = b"Grace Hopper\ngrace@example.com\nCompiler engineer with Python and SQL experience for many years."
+
+    accepted = client.post("/api/upload-resume/async", files={"file": ("grace.txt", text, "text/plain")})
+    assert accepted.status_code == 202
+    status_url = accepted.json()["status_url"]
+
+    deadline = time.monotonic() + 5
+    while (task := client.get(status_url).json())["status"] in ("queued", "running"):
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+
+    assert task["status"] == "done"
+    assert task["result"]["user"]["email"] == "grace@example.com"
+    assert task["result"]["user"]["skills"] == ["Python", "SQL"]
+    events = client.get(accepted.json()["events_url"]).text
+    assert events.startswith("event: done")
+    assert client.get("/api/tasks/unknown").status_code == 404
@@ -0,0 +1,65 @@
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+from file_utils import MAX_UPLOAD_BYTES
+
+# Room for multipart boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+class RequestBodyTooLarge(HTTPException):
+    def __init__(self, max_bytes: int):
+        super().__init__(status_code=413, detail=f"Request body is larger than {max_bytes} bytes")
+
+class BodySizeLimitMiddleware:
+    """
+    Reject request bodies over `max_bytes` on the given path prefixes with 413
+    before the multipart parser spools them to disk. Content-Length is checked
+    up front, and bytes are counted as they arrive for chunked uploads.
+    """
+
+    def __init__(self, app, path_prefixes, max_bytes: int = MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES):
+        self.app = app
+        self.path_prefixes = tuple(path_prefixes)
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._applies_to(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > self.max_bytes:
+            await self._reject(scope, receive, send)
+            return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise RequestBodyTooLarge(self.max_bytes)
+            return message
+
+        async def tracking_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except RequestBodyTooLarge:
+            # Only reached if nothing inside turned the error into a response
+            if not response_started:
+                await self._reject(scope, receive, send)
+
+    def _applies_to(self, path: str) -> bool:
+        # "/api/upload-resume" covers "/api/upload-resume/async" but not "/api/upload-resumes"
+        return any(path == prefix or path.startswith(prefix.rstrip("/") + "/") for prefix in self.path_prefixes)
+
+    async def _reject(self, scope, receive, send):
+        response = JSONResponse({"detail": f"Request body is larger than {self.max_bytes} bytes"}, status_code=413)
+        await response(scope, receive, send)
@@ -0,0 +1,67 @@
+import asyncio
+import os
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Optional
+
+# CPU-bound work (PDF parsing) runs here so it never blocks the event loop
+PARSER_WORKERS = int(os.getenv("PARSER_WORKERS", max(1, (os.cpu_count() or 2) - 1)))
+# Optional address-space cap per parser process, so a decompression bomb fails
+# with MemoryError in the worker instead of exhausting the host (Unix only)
+PARSER_MAX_MEMORY_MB = int(os.getenv("PARSER_MAX_MEMORY_MB", 0))
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+# One semaphore per event loop (asyncio primitives are bound to the loop that uses them)
+_pool_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+def _limit_worker_memory(max_bytes: int):
+    try:
+        import resource
+    except ImportError:
+        return
+    resource.setrlimit(resource.RLIMIT_AS, (max_bytes, max_bytes))
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Create the shared process pool on first use"""
+    global _process_pool
+    if _process_pool is None:
+        if PARSER_MAX_MEMORY_MB > 0:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=PARSER_WORKERS,
+                initializer=_limit_worker_memory,
+                initargs=(PARSER_MAX_MEMORY_MB * 1024 * 1024,)
+            )
+        else:
+            _process_pool = ProcessPoolExecutor(max_workers=PARSER_WORKERS)
+    return _process_pool
+
+async def run_cpu_bound(func, *args, **kwargs):
+    """Run a picklable, CPU-bound callable in the process pool and await its result"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_process_pool(), partial(func, *args, **kwargs))
+
+def pool_slot() -> asyncio.Semaphore:
+    """
+    Semaphore with one slot per process-pool worker. Hold it around
+    run_cpu_bound when timing the call, so a timeout only starts counting once
+    a worker is free rather than while the job is queued behind others.
+    """
+    loop = asyncio.get_running_loop()
+    slots = _pool_slots.get(loop)
+    if slots is None:
+        slots = _pool_slots[loop] = asyncio.Semaphore(PARSER_WORKERS)
+    return slots
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    Run blocking I/O (SQLAlchemy queries and commits) in a worker thread and
+    await its result, so a locked database never stalls the event loop
+    """
+    return await asyncio.to_thread(func, *args, **kwargs)
+
+def shutdown_pools():
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
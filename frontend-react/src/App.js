@@ -78,7 +78,9 @@ function App() {
       const fileType = uploadRes.data.file_type;
       console.log(`Successfully processed ${fileType} file with ${uploadRes.data.extracted_skills.length} skills extracted`);
 
-      const jobsRes = await axios.get(`${API_URL}/api/jobs`);
+      const jobsRes = await axios.get(`${API_URL}/api/jobs`, {
+        params: { fields: 'summary' }
+      });
       const jobs = jobsRes.data;
       
       const matches = {};
@@ -102,7 +102,9 @@ function JobTracker({ currentUser }) {
     
     setLoading(true);
     try {
-      await axios.delete(`${API_URL}/api/job-tracker/${jobId}`);
+      await axios.delete(`${API_URL}/api/job-tracker/${jobId}`, {
+        params: { user_id: currentUser.id }
+      });
       alert('Job deleted successfully!');
       await loadTrackedJobs();
     } catch (error) {